@@ -0,0 +1,87 @@
+"""
+Excel 輸出速度測試
+比較原本的 pandas 寫檔 + 逐格設定樣式，與 StreamingExcelWriter (write_only、依欄設定樣式)
+
+用法: python benchmarks/bench_excel.py [--articles 5000] [--chars 4000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+from openpyxl.styles import Alignment, Font
+
+from scraper_core.excel import ExcelColumn, write_excel
+
+COLUMNS = [
+    ExcelColumn("日期", 20), ExcelColumn("作者", 15), ExcelColumn("標題", 50),
+    ExcelColumn("副標題", 30), ExcelColumn("內文", 80, wrap=True),
+    ExcelColumn("網址", 60, link=True), ExcelColumn("下載時間", 20),
+]
+
+
+def make_records(n, chars, seed=0):
+    rng = random.Random(seed)
+    text = "中央社記者台北報導，" * (chars // 10)
+    for i in range(n):
+        yield {
+            "日期": "2026/10/18 10:00", "作者": "記者", "標題": f"標題 {i}", "副標題": None,
+            "內文": text[:rng.randint(chars // 2, chars)],
+            "網址": f"https://www.cna.com.tw/news/aipl/{i}.aspx", "下載時間": "2026-10-18 10:00:00",
+        }
+
+
+def old_way(records, path):
+    """ 原本 save_optimized_excel 的作法 """
+    data_list = list(records)
+    df = pd.DataFrame(data_list)
+    writer = pd.ExcelWriter(path, engine='openpyxl')
+    df.to_excel(writer, index=False, sheet_name='今日新聞')
+    worksheet = writer.sheets['今日新聞']
+    for col_letter, width in {'A': 20, 'B': 15, 'C': 50, 'D': 30, 'E': 80, 'F': 60, 'G': 20}.items():
+        worksheet.column_dimensions[col_letter].width = width
+    for row in range(2, len(data_list) + 2):
+        cell = worksheet.cell(row=row, column=6)
+        if cell.value:
+            cell.hyperlink = cell.value
+            cell.font = Font(color="0000FF", underline="single")
+    for row in range(2, len(data_list) + 2):
+        worksheet.cell(row=row, column=5).alignment = Alignment(wrap_text=True, vertical='top')
+    writer.close()
+
+
+def streaming_way(records, path):
+    write_excel(path, '今日新聞', COLUMNS, records)
+
+
+def run(label, func, args, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    func(make_records(args.articles, args.chars), path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<10} {elapsed:8.2f} 秒  記憶體峰值 {peak / 1024 / 1024:8.1f} MB  "
+          f"檔案 {os.path.getsize(path) / 1024 / 1024:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Excel 輸出速度測試")
+    parser.add_argument('--articles', type=int, default=5000)
+    parser.add_argument('--chars', type=int, default=4000, help='每篇內文最多幾個字')
+    args = parser.parse_args()
+
+    print(f"{args.articles} 篇文章，內文最多 {args.chars} 字")
+    with tempfile.TemporaryDirectory() as tmp:
+        run("原本", old_way, args, os.path.join(tmp, "old.xlsx"))
+        run("串流", streaming_way, args, os.path.join(tmp, "stream.xlsx"))
+
+
+if __name__ == '__main__':
+    main()
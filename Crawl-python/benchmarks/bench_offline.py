@@ -0,0 +1,191 @@
+"""
+離線端到端效能測試 (不連網、不會被網站封鎖)
+- 每個來源的頁面存檔 (benchmarks/fixtures.py 錄製或合成) 由本機模擬伺服器重播，
+  可加上延遲、503 與斷線，翻譯改用 stub 引擎 (可設定每次請求的延遲)
+- 每個來源在獨立的子行程、全新的輸出資料夾執行完整流程 (列表 → 抓取 → 解析 → 整理 → 翻譯 → 寫出)，
+  量測篇數/秒、每篇文章從開始抓取到寫出的 p50 / p99 延遲、子行程的峰值記憶體 (RSS)
+- 來源的網址改指向模擬伺服器，並取消每頁篇數上限與日期過濾 (存檔的日期通常不是今天)
+- TASS 的列表需要 Chrome，不在 sources/ 的來源之列，這裡不測
+
+用法:
+  python benchmarks/bench_offline.py                                   # 全部來源，沒有存檔時自動合成 200 篇
+  python benchmarks/bench_offline.py cna ng --latency 0.1 --error-rate 0.05 --translate-latency 0.2
+  python benchmarks/bench_offline.py --runs 3 --output before.json     # 結果存成 JSON，改版前後比較
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+from fixtures import FIXTURES_DIR, FixtureStore, synthesize  # noqa: E402
+from mockserver import MockServer  # noqa: E402
+
+# 子行程把結果印在這個標記後面 (一行 JSON)
+RESULT_MARKER = "BENCH_RESULT "
+
+
+def offline_source(source, server_url, polite=False):
+    """ 來源的網址改指向模擬伺服器；polite 為 False 時不套用來源的限速 (只測處理速度) """
+    original = source.base_url
+    base = type(source)
+
+    class OfflineSource(base):
+        base_url = server_url
+        listings = {category: url.replace(original, server_url, 1) for category, url in base.listings.items()}
+        headers = {key: value.replace(original, server_url) for key, value in base.headers.items()}
+        max_per_listing = None
+        stop_after_rejects = None
+        rate = base.rate if polite else 1000.0
+        burst = base.burst if polite else 1000
+
+        def earliest(self):
+            return None
+
+        def accept(self, record):
+            return True
+
+        def accept_link(self, url):
+            # 指向其他網站的連結不在存檔裡，也不能真的連出去
+            return url.startswith(server_url) and super().accept_link(url)
+
+    OfflineSource.__name__ = f"Offline{base.__name__}"
+    return OfflineSource()
+
+
+def peak_rss_mb():
+    """ 這個行程的峰值記憶體 (MB)；Windows 沒有 resource 模組時回傳 None """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 為單位，macOS 以 byte 為單位
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def run_worker(name, server_url, save_dir, pages, polite):
+    """ 子行程: 執行一個來源並印出結果 """
+    from scraper_core.metrics import METRICS
+    from scraper_core.runner import SourceRunner
+    from sources import get_source
+
+    source = offline_source(get_source(name), server_url, polite)
+    with SourceRunner(save_dir) as runner:
+        result = runner.run(source, pages=pages)
+    snapshot = METRICS.snapshot()
+    latency = snapshot["histograms"].get("article.latency", {}).get(name, {})
+    fetch = snapshot["histograms"].get("fetch.latency", {})
+    print(RESULT_MARKER + json.dumps({
+        "source": name,
+        "status": result.status,
+        "articles": result.articles,
+        "duration": round(result.duration, 3),
+        "articles_per_sec": round(result.articles / result.duration, 2) if result.duration else None,
+        "p50": latency.get("p50"),
+        "p99": latency.get("p99"),
+        "peak_rss_mb": peak_rss_mb(),
+        "requests": sum(h["count"] for h in fetch.values()),
+        "retries": sum(snapshot["counters"].get("fetch.retries", {}).values()),
+    }, ensure_ascii=False), flush=True)
+
+
+def run_source(name, store, args):
+    """ 啟動模擬伺服器，在子行程執行一次來源，回傳結果 (失敗時回傳 None) """
+    save_dir = tempfile.mkdtemp(prefix=f"bench_{name}_")
+    env = dict(os.environ, TRANSLATOR_BACKEND="stub", TRANSLATOR_STUB_LATENCY=str(args.translate_latency),
+               PYTHONIOENCODING="utf-8")
+    if args.no_excel:
+        env["SCRAPER_EXCEL"] = "0"
+    try:
+        with MockServer(store, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        reset_rate=args.reset_rate) as server:
+            command = [sys.executable, os.path.abspath(__file__), '--worker', name, '--server', server.url,
+                       '--save-dir', save_dir, '--pages', str(args.pages)]
+            if args.polite:
+                command.append('--polite')
+            proc = subprocess.run(command, capture_output=True, text=True, encoding='utf-8', errors='replace',
+                                  env=env, timeout=args.timeout)
+            if args.verbose:
+                print(proc.stdout)
+                print(server.report())
+    finally:
+        shutil.rmtree(save_dir, ignore_errors=True)
+
+    for line in proc.stdout.splitlines():
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    print(f"[{name}] 執行失敗 (結束碼 {proc.returncode}):")
+    print("\n".join((proc.stdout + proc.stderr).splitlines()[-20:]))
+    return None
+
+
+def print_row(r):
+    def fmt(value, spec):
+        return "-" if value is None else format(value, spec)
+    print(f"{r['source']:<18}{r['articles']:>6}{r['duration']:>9.2f}{fmt(r['articles_per_sec'], '.1f'):>9}"
+          f"{fmt(r['p50'], '.3f'):>9}{fmt(r['p99'], '.3f'):>9}{fmt(r['peak_rss_mb'], '.0f'):>9}"
+          f"{r['requests']:>7}{r['retries']:>6}")
+
+
+def main():
+    from sources import SOURCES
+
+    parser = argparse.ArgumentParser(description="離線端到端效能測試")
+    parser.add_argument('sources', nargs='*', help=f"來源代號 ({', '.join(SOURCES)})，預設全部")
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='頁面存檔資料夾')
+    parser.add_argument('--articles', type=int, default=200, help='沒有存檔時合成幾篇文章')
+    parser.add_argument('--pages', type=int, default=100, help='每個分類最多讀幾頁列表')
+    parser.add_argument('--runs', type=int, default=1, help='每個來源執行幾次')
+    parser.add_argument('--latency', type=float, default=0.0, help='模擬伺服器每個請求的平均延遲 (秒)')
+    parser.add_argument('--jitter', type=float, default=0.5, help='延遲浮動比例')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='回 503 的比例')
+    parser.add_argument('--reset-rate', type=float, default=0.0, help='直接斷線的比例')
+    parser.add_argument('--translate-latency', type=float, default=0.0, help='stub 翻譯每次請求的延遲 (秒)')
+    parser.add_argument('--polite', action='store_true', help='套用來源原本的限速')
+    parser.add_argument('--no-excel', action='store_true', help='不輸出 Excel (只測到 Parquet)')
+    parser.add_argument('--timeout', type=float, default=600, help='單次執行的時限 (秒)')
+    parser.add_argument('--output', help='結果另存成 JSON')
+    parser.add_argument('--verbose', action='store_true', help='印出子行程的完整輸出')
+    # 子行程用
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--server', help=argparse.SUPPRESS)
+    parser.add_argument('--save-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args.worker, args.server, args.save_dir, args.pages, args.polite)
+        return
+
+    from sources import get_source
+    names = args.sources or list(SOURCES)
+    results = []
+    print(f"{'來源':<16}{'篇數':>6}{'秒數':>9}{'篇/秒':>8}{'p50(秒)':>9}{'p99(秒)':>9}{'RSS(MB)':>9}"
+          f"{'請求':>5}{'重試':>4}")
+    for name in names:
+        store = FixtureStore.for_source(name, args.fixtures)
+        if not len(store):
+            synthesize(get_source(name), store, args.articles)
+            print(f"({name} 沒有頁面存檔，已合成 {args.articles} 篇: {store.directory})")
+        for _ in range(args.runs):
+            result = run_source(name, store, args)
+            if result is not None:
+                print_row(result)
+                results.append(result)
+
+    if args.output:
+        settings = {k: getattr(args, k) for k in ('latency', 'jitter', 'error_rate', 'reset_rate',
+                                                   'translate_latency', 'polite', 'no_excel')}
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"settings": settings, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"結果已存到 {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+"""
+HTML 解析效能比較
+比較 html.parser / lxml 完整解析與只建出選擇器子樹 (make_soup) 的速度，並確認抓出來的文字一致
+
+用法:
+  python benchmarks/bench_parsing.py                       # 使用合成的新聞頁
+  python benchmarks/bench_parsing.py --pages 存檔資料夾 \
+      --selector '.updatetime span' --selector '.paragraph'  # 使用存下來的 .html 頁面
+"""
+import argparse
+import glob
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup
+
+from scraper_core.parsing import DEFAULT_PARSER, make_soup
+
+# 預設以中央社文章頁的選擇器測試
+DEFAULT_SELECTORS = ['.updatetime span', '.centralContent h1 span', '.paragraph']
+
+
+def synthetic_page(seed):
+    """ 產生結構類似新聞網站的頁面: 大量導覽、側欄、推薦連結，真正需要的內文只佔一小部分 """
+    rng = random.Random(seed)
+    nav = "".join(f'<li class="nav-item"><a href="/list/{i}.aspx">分類{i}</a></li>' for i in range(80))
+    side = "".join(
+        f'<div class="card"><a href="/news/{rng.randint(1, 10**6)}.aspx"><img src="x.jpg"><span>推薦新聞 {i}</span></a></div>'
+        for i in range(120)
+    )
+    paragraphs = "".join(f"<p>第 {i} 段內文，" + "新聞內容" * rng.randint(20, 60) + "。</p>" for i in range(12))
+    scripts = "".join(f"<script>var x{i} = {{a: {i}}};</script>" for i in range(30))
+    return f"""<!DOCTYPE html><html><head><title>測試</title>{scripts}</head><body>
+<header><ul class="nav">{nav}</ul></header>
+<div class="centralContent"><h1><span>合成標題 {seed}</span></h1>
+<div class="updatetime"><span>2026/01/01 10:00</span></div>
+<div class="paragraph"><p><strong>副標題</strong></p>{paragraphs}</div></div>
+<aside>{side}</aside><footer>{nav}</footer></body></html>"""
+
+
+def extract(soup, selectors):
+    """ 依選擇器取出文字，用來確認各種解析方式結果相同 """
+    return [[el.get_text(" ", strip=True) for el in soup.select(sel)] for sel in selectors]
+
+
+def bench(label, pages, selectors, build, repeat):
+    start = time.perf_counter()
+    results = None
+    for _ in range(repeat):
+        results = [extract(build(html), selectors) for html in pages]
+    elapsed = time.perf_counter() - start
+    per_page = elapsed / (repeat * len(pages)) * 1000
+    print(f"{label:<28} {per_page:8.2f} 毫秒/頁")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML 解析效能比較")
+    parser.add_argument('--pages', help='存放 .html 頁面的資料夾 (未指定則使用合成頁面)')
+    parser.add_argument('--selector', action='append', help='要抽取的 CSS 選擇器，可重複指定')
+    parser.add_argument('--count', type=int, default=50, help='合成頁面數量')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    selectors = args.selector or DEFAULT_SELECTORS
+    if args.pages:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(args.pages, '*.html'))):
+            with open(path, encoding='utf-8', errors='replace') as f:
+                pages.append(f.read())
+    else:
+        pages = [synthetic_page(i) for i in range(args.count)]
+    if not pages:
+        sys.exit("找不到任何頁面")
+
+    print(f"{len(pages)} 頁，平均 {sum(map(len, pages)) // len(pages)} 字元，選擇器: {selectors}")
+    candidates = [
+        ("html.parser (原本)", lambda html: BeautifulSoup(html, 'html.parser')),
+        ("html.parser + 子樹過濾", lambda html: make_soup(html, selectors, parser='html.parser')),
+    ]
+    if DEFAULT_PARSER == 'lxml':
+        candidates += [
+            ("lxml", lambda html: BeautifulSoup(html, 'lxml')),
+            ("lxml + 子樹過濾 (make_soup)", lambda html: make_soup(html, selectors, parser='lxml')),
+        ]
+    else:
+        print("(未安裝 lxml，略過 lxml 測試)")
+
+    baseline = None
+    for label, build in candidates:
+        results = bench(label, pages, selectors, build, args.repeat)
+        if baseline is None:
+            baseline = results
+        elif results != baseline:
+            print(f"  !! {label} 抽取結果與 html.parser 不一致")
+
+
+if __name__ == '__main__':
+    main()
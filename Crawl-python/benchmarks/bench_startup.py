@@ -0,0 +1,104 @@
+"""
+啟動時間測試 (python -X importtime)
+每個進入點各開一個新的直譯器，只載入腳本 (不執行 main)，統計 import 花費的時間
+(扣掉直譯器本身啟動的部分，例如 site)，並檢查啟動時有沒有載入不該載入的重量級套件 (pandas、openpyxl、selenium ...)
+
+用法: python benchmarks/bench_startup.py [--repeat 5] [--check]
+  --check: 超過預算或載入了禁用的套件就以結束碼 1 結束 (可放進 CI 當作回歸檢查)
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 啟動時不應該載入的套件 (只在用到的程式路徑上才載入)
+HEAVY_MODULES = ("pandas", "numpy", "openpyxl", "pyarrow", "selenium", "deep_translator",
+                 "argostranslate", "aiohttp", "bs4", "lxml")
+
+# 各進入點的 import 時間預算 (毫秒) 與允許在啟動時載入的重量級套件
+BUDGETS = {
+    "run_all.py": (60, ()),
+    "Interfax-Ukraine.py": (120, ()),
+    "NG full scrape.py": (120, ()),
+    "crawl CNA.py": (120, ()),
+    "kiev_independent.py": (120, ()),
+    # TASS 的解析函式直接用 bs4
+    "tass_20_OK.py": (250, ("bs4", "lxml")),
+}
+
+# import time:       self [us] |  cumulative | imported package
+_LINE_RE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( +)(\S+)')
+
+
+def measure(script=None):
+    """ 回傳 (import 總時間毫秒, 載入的模組集合, 最耗時的頂層 import)；script 為 None 時只量直譯器本身 """
+    code = f"import runpy, sys; sys.path.insert(0, {BASE_DIR!r})"
+    if script:
+        code += f"; runpy.run_path({os.path.join(BASE_DIR, script)!r})"
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          capture_output=True, text=True, cwd=BASE_DIR)
+    if proc.returncode != 0:
+        raise RuntimeError(f"{script} 載入失敗:\n{proc.stderr[-2000:]}")
+    total = 0
+    modules = set()
+    top_level = []
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), len(match.group(3)), match.group(4)
+        modules.add(name)
+        # 縮排只有一格的是頂層 import (巢狀的已算在 cumulative 裡)
+        if indent == 1:
+            total += cumulative
+            top_level.append((cumulative, name))
+    top_level.sort(reverse=True)
+    return total / 1000, modules, top_level[:5]
+
+
+def heavy_loaded(modules):
+    return sorted(m for m in HEAVY_MODULES if any(n == m or n.startswith(m + ".") for n in modules))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="啟動時間測試")
+    parser.add_argument('--repeat', type=int, default=5, help='每個進入點量幾次 (取最小值)')
+    parser.add_argument('--check', action='store_true', help='超過預算時以結束碼 1 結束')
+    args = parser.parse_args()
+
+    baseline = min(measure()[0] for _ in range(args.repeat))
+    print(f"直譯器本身的 import: {baseline:.1f} ms (以下數字已扣除)\n")
+
+    failures = []
+    print(f"{'進入點':<24}{'import(ms)':>12}{'預算(ms)':>10}  重量級套件")
+    for script, (budget, allowed) in BUDGETS.items():
+        runs = [measure(script) for _ in range(args.repeat)]
+        best, modules, top = min(runs, key=lambda r: r[0])
+        best = max(0.0, best - baseline)
+        heavy = heavy_loaded(modules)
+        print(f"{script:<24}{best:>12.1f}{budget:>10}  {', '.join(heavy) or '-'}")
+        for cumulative, name in top:
+            if name in ('site', 'encodings', 'runpy'):
+                continue
+            print(f"{'':<8}{cumulative / 1000:>8.1f} ms  {name}")
+        if best > budget:
+            failures.append(f"{script}: {best:.1f} ms 超過預算 {budget} ms")
+        forbidden = [m for m in heavy if m not in allowed]
+        if forbidden:
+            failures.append(f"{script}: 啟動時載入了 {', '.join(forbidden)}")
+
+    if failures:
+        print("\n未通過:")
+        for failure in failures:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+    else:
+        print("\n全部在預算內")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+翻譯吞吐量測試 (不連網)
+用 stub 引擎模擬每次請求的延遲，比較逐篇翻譯與批次翻譯需要的請求數與時間
+
+用法: python benchmarks/bench_translate.py [--articles 200] [--latency 0.05] [--backend stub]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scraper_core.backends import get_backend
+from scraper_core.translate import CachedTranslator
+
+WORDS = "война мир экономика президент правительство санкции армия рынок банк договор".split()
+
+
+def make_articles(n, seed=0):
+    rng = random.Random(seed)
+
+    def sentence():
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 18))).capitalize() + "."
+
+    articles = []
+    for _ in range(n):
+        title = sentence()
+        paragraphs = [" ".join(sentence() for _ in range(rng.randint(2, 6))) for _ in range(rng.randint(3, 15))]
+        articles.append((title, "\n".join(paragraphs)))
+    return articles
+
+
+def run(label, backend_name, latency, articles, batched):
+    kwargs = {"latency": latency} if backend_name == "stub" else {}
+    backend = get_backend(backend_name, source='ru', target='zh-TW', **kwargs)
+    translator = CachedTranslator(backend)
+    start = time.perf_counter()
+    if batched:
+        translator.translate_many([t for t, _ in articles] + [b for _, b in articles])
+    else:
+        for title, body in articles:
+            translator.translate(title)
+            translator.translate(body)
+    elapsed = time.perf_counter() - start
+    requests = getattr(backend, 'requests', None)
+    translator.close()
+    print(f"{label:<10} {elapsed:8.2f} 秒  {len(articles) / elapsed:8.1f} 篇/秒  請求數 {requests}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="翻譯吞吐量測試")
+    parser.add_argument('--articles', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.05, help='stub 每次請求的模擬延遲 (秒)')
+    parser.add_argument('--backend', default='stub')
+    args = parser.parse_args()
+
+    articles = make_articles(args.articles)
+    print(f"{args.articles} 篇文章，引擎 {args.backend}")
+    run("逐篇", args.backend, args.latency, articles, batched=False)
+    run("批次", args.backend, args.latency, articles, batched=True)
+
+
+if __name__ == '__main__':
+    main()
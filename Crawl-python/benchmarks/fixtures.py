@@ -0,0 +1,234 @@
+"""
+離線效能測試用的頁面存檔 (fixtures)
+- record: 依來源設定實際抓一次列表頁與文章頁 (照來源的限速)，原樣存成 gzip，之後不必再連網
+- synth: 依來源的選擇器產生結構相同的合成頁面 (沒有網路、或要固定篇數時使用)
+- 每個來源一個資料夾: index.json 記錄原網址的路徑 → 檔案，頁面內容存成 <雜湊>.html.gz
+- 存下來的是網站的內容，只供本機測試，不進版本控制 (benchmarks/.gitignore)
+
+用法:
+  python benchmarks/fixtures.py record cna interfax [--pages 2] [--articles 30]
+  python benchmarks/fixtures.py synth all [--articles 200] [--pages 2]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import sys
+from datetime import datetime
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+INDEX_FILENAME = "index.json"
+
+# 合成頁面的文字 (依來源語言)
+WORDS = {
+    'ru': "война мир экономика президент правительство санкции армия рынок банк договор".split(),
+    'en': "war peace economy president government sanctions army market bank treaty".split(),
+    'zh-TW': "立法院 行政院 經濟 總統 政府 制裁 國防 市場 銀行 協議".split(),
+}
+
+
+def page_key(url):
+    """ fixture 以原網址的路徑 (含查詢字串) 為鍵，模擬伺服器依請求路徑找回頁面 """
+    parts = urlsplit(url)
+    return parts.path + (f"?{parts.query}" if parts.query else "")
+
+
+class FixtureStore:
+    """ 一個來源的頁面存檔 """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.base_url = None
+        self.pages = {}
+        path = os.path.join(directory, INDEX_FILENAME)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                index = json.load(f)
+            self.base_url = index["base_url"]
+            self.pages = index["pages"]
+
+    @classmethod
+    def for_source(cls, name, root=FIXTURES_DIR):
+        return cls(os.path.join(root, name))
+
+    def clear(self):
+        """ 刪掉原有的存檔 (重新錄製或合成前) """
+        for filename in os.listdir(self.directory) if os.path.isdir(self.directory) else []:
+            if filename.endswith(".html.gz") or filename == INDEX_FILENAME:
+                os.remove(os.path.join(self.directory, filename))
+        self.pages = {}
+
+    def add(self, url, text, content_type="text/html; charset=utf-8"):
+        os.makedirs(self.directory, exist_ok=True)
+        key = page_key(url)
+        filename = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16] + ".html.gz"
+        with gzip.open(os.path.join(self.directory, filename), 'wt', encoding='utf-8') as f:
+            f.write(text)
+        self.pages[key] = {"file": filename, "content_type": content_type}
+
+    def load(self, key):
+        with gzip.open(os.path.join(self.directory, self.pages[key]["file"]), 'rt', encoding='utf-8') as f:
+            return f.read()
+
+    def save(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, INDEX_FILENAME), 'w', encoding='utf-8') as f:
+            json.dump({"base_url": self.base_url, "pages": self.pages}, f, ensure_ascii=False, indent=1)
+
+    def __len__(self):
+        return len(self.pages)
+
+
+# ---------- 實際抓取存檔 ----------
+
+def record(source, store, pages=1, max_articles=30):
+    """ 照來源設定 (標頭、限速) 抓列表頁與文章頁存檔，回傳存下的頁數 """
+    from scraper_core.fetcher import AsyncFetcher
+
+    store.clear()
+    store.base_url = source.base_url
+    articles = []
+    with AsyncFetcher(rate=source.rate, burst=source.burst, per_host=2) as fetcher:
+        for category, url in source.listing_pages():
+            origin = url
+            for page in range(pages):
+                response = fetcher.fetch(url, headers=source.headers)
+                if not response.ok:
+                    print(f"  [{source.name}] 列表頁抓取失敗 {url}: {response.error or response.status}")
+                    break
+                store.add(url, response.text, response.headers.get('Content-Type', "text/html; charset=utf-8"))
+                jobs, url = source.parse_listing(response, category, page, origin)
+                articles += [job.url for job in jobs if job.url not in articles]
+                if not url:
+                    break
+        articles = articles[:max_articles]
+        for response in fetcher.fetch_many(articles, headers=source.headers):
+            if response.ok:
+                store.add(response.url, response.text,
+                          response.headers.get('Content-Type', "text/html; charset=utf-8"))
+    store.save()
+    return len(store)
+
+
+# ---------- 合成頁面 ----------
+
+_COMPOUND_RE = re.compile(r'^([a-zA-Z][a-zA-Z0-9]*)?((?:\.[\w-]+)*)$')
+
+
+def _element(selector, inner, attrs="", sibling=""):
+    """
+    簡單的 CSS 選擇器 (後代選擇器串起來的 tag / .class，逗號分隔時取第一個) 轉成對應的巢狀 HTML
+    例如 '.mainList li a' → <div class="mainList"><li><a ...>inner</a></li></div>
+    attrs 加在最內層的元素上，sibling 緊接在最內層元素之後 (同一個父元素內)
+    """
+    parts = selector.split(',')[0].split()
+    html = inner
+    for i, part in enumerate(reversed(parts)):
+        match = _COMPOUND_RE.match(part)
+        if match is None:
+            raise ValueError(f"合成頁面不支援這個選擇器: {selector}")
+        tag = match.group(1) or "div"
+        classes = " ".join(c for c in match.group(2).split('.') if c)
+        extra = attrs if i == 0 else ""
+        class_attr = f' class="{classes}"' if classes else ""
+        html = f"<{tag}{class_attr}{extra}>{html}</{tag}>"
+        if i == 0:
+            html += sibling
+    return html
+
+
+def _sentence(rng, words):
+    joiner = "" if words is WORDS['zh-TW'] else " "
+    text = joiner.join(rng.choice(words) for _ in range(rng.randint(6, 16)))
+    return text + ("。" if not joiner else ".")
+
+
+def synth_listing(source, links, next_href=None):
+    """ 列表頁: 每篇一個項目 (<article> 內放連結與發布時間)，有下一頁時加上 rel="next" """
+    now = datetime.now()
+    items = []
+    for href, title in links:
+        date = ""
+        if source.listing_date_selector:
+            date = _element(source.listing_date_selector, f"{now:%Y/%m/%d %H:%M}",
+                            f' datetime="{now.isoformat(timespec="minutes")}"')
+        link = _element(source.link_selector, title, f' href="{href}"', date)
+        items.append(f"<article>{link}</article>")
+    nav = f'<a rel="next" href="{next_href}">下一頁</a>' if next_href else ""
+    return f"<!DOCTYPE html><html><head><title>{source.label}</title></head><body>{''.join(items)}{nav}</body></html>"
+
+
+def synth_article(source, title, rng):
+    """ 文章頁: 依 article_selectors 放入標題、日期與多段內文 """
+    words = WORDS.get(source.language, WORDS['en'])
+    paragraphs = ["".join(_sentence(rng, words) for _ in range(rng.randint(2, 6))) for _ in range(rng.randint(4, 14))]
+    if source.name == "cna":
+        # 中央社的作者從內文開頭的「（中央社記者○○台北1日電）」取出
+        paragraphs[0] = f"（中央社記者王小明台北{datetime.now().day}日電）" + paragraphs[0]
+    values = {
+        'title': title,
+        'published': f"{datetime.now():%Y/%m/%d %H:%M}",
+        'content': "".join(f"<p>{p}</p>" for p in paragraphs),
+    }
+    body = "".join(_element(selector, values.get(field, title)) for field, selector in source.article_selectors.items())
+    # 側欄等雜訊，讓解析的負擔接近真實頁面
+    noise = "".join(f'<li class="nav-item"><a href="/list/{i}">{rng.choice(words)}</a></li>' for i in range(60))
+    return f"<!DOCTYPE html><html><head><title>{title}</title></head><body><ul>{noise}</ul>{body}</body></html>"
+
+
+def synthesize(source, store, articles=100, pages=1, seed=0):
+    """ 每個分類產生 pages 頁列表，總共 articles 篇文章 (平均分到各頁) """
+    rng = random.Random(seed)
+    words = WORDS.get(source.language, WORDS['en'])
+    store.clear()
+    store.base_url = source.base_url
+    listings = source.listing_pages()
+    per_page = max(1, articles // (len(listings) * pages))
+    n = 0
+    for category, url in listings:
+        for page in range(pages):
+            page_url = url if page == 0 else f"{url}?page={page + 1}"
+            links = []
+            for _ in range(per_page):
+                n += 1
+                href = f"/news/bench-{n}.html"
+                title = _sentence(rng, words)
+                links.append((href, title))
+                store.add(source.base_url + href, synth_article(source, title, rng))
+            next_href = f"{urlsplit(url).path}?page={page + 2}" if page + 1 < pages else None
+            store.add(page_url, synth_listing(source, links, next_href))
+    store.save()
+    return n
+
+
+def main():
+    from sources import SOURCES, get_source
+
+    parser = argparse.ArgumentParser(description="離線效能測試用的頁面存檔")
+    parser.add_argument('mode', choices=('record', 'synth'), help='record: 實際抓取存檔；synth: 產生合成頁面')
+    parser.add_argument('sources', nargs='+', help=f"來源代號 ({', '.join(SOURCES)}) 或 all")
+    parser.add_argument('--pages', type=int, default=1, help='每個分類幾頁列表')
+    parser.add_argument('--articles', type=int, default=None, help='文章篇數 (record 預設 30，synth 預設 200)')
+    parser.add_argument('--root', default=FIXTURES_DIR, help='存檔資料夾')
+    args = parser.parse_args()
+
+    names = list(SOURCES) if 'all' in args.sources else args.sources
+    for name in names:
+        source = get_source(name)
+        store = FixtureStore.for_source(name, args.root)
+        if args.mode == 'record':
+            count = record(source, store, args.pages, args.articles or 30)
+        else:
+            synthesize(source, store, args.articles or 200, args.pages)
+            count = len(store)
+        print(f"{name}: 存下 {count} 頁 → {store.directory}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+在本機重播頁面存檔的 HTTP 伺服器 (離線效能測試用)
+- 依請求路徑找回 fixtures 的頁面；頁面中指向原網站的絕對網址改寫成本機位址，連結不會跑出去
+- 可設定每個請求的延遲 (平均值與抖動)、回 503 的比例、不回應直接斷線的比例，模擬慢速或不穩的網站
+- 回應帶 ETag，收到相同的 If-None-Match 時回 304 (重跑時可測條件式請求)
+- 以背景執行緒執行，start() 之後 url 為伺服器位址
+
+用法 (單獨啟動，手動測試): python benchmarks/mockserver.py cna [--port 8800] [--latency 0.2] [--error-rate 0.05]
+"""
+import argparse
+import hashlib
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import FixtureStore  # noqa: E402
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # keep-alive，與真實網站一樣重用連線
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server.mock
+        delay = server.delay()
+        if delay:
+            time.sleep(delay)
+        fault = server.fault()
+        if fault == "reset":
+            # 不送出任何回應直接斷線
+            self.close_connection = True
+            return
+        if fault == "error":
+            self._send(503, b"Service Unavailable", "text/plain")
+            return
+        page = server.pages.get(self.path)
+        if page is None:
+            server.count("not_found")
+            self._send(404, b"Not Found", "text/plain")
+            return
+        body, content_type, etag = page
+        if self.headers.get('If-None-Match') == etag:
+            server.count("not_modified")
+            self._send(304, b"", content_type, etag)
+            return
+        server.count("ok")
+        self._send(200, body, content_type, etag)
+
+    def _send(self, status, body, content_type, etag=None):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        self.end_headers()
+        if status != 304:
+            self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockServer:
+    def __init__(self, store: FixtureStore, port=0, latency=0.0, jitter=0.5, error_rate=0.0, reset_rate=0.0,
+                 seed=0):
+        """
+        latency: 每個請求的平均延遲 (秒)；jitter: 延遲上下浮動的比例 (0.5 表示 ±50%)
+        error_rate: 回 503 的比例；reset_rate: 直接斷線的比例
+        """
+        self.store = store
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.reset_rate = reset_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"ok": 0, "not_modified": 0, "not_found": 0, "error": 0, "reset": 0}
+        self.pages = {}
+        self._server = None
+        self._thread = None
+        self.url = None
+
+    def delay(self):
+        if not self.latency:
+            return 0.0
+        with self._lock:
+            return max(0.0, self.latency * (1 + self._rng.uniform(-self.jitter, self.jitter)))
+
+    def fault(self):
+        """ 依設定的比例決定這個請求要不要出錯 ("error" / "reset" / None) """
+        with self._lock:
+            roll = self._rng.random()
+        if roll < self.reset_rate:
+            self.count("reset")
+            return "reset"
+        if roll < self.reset_rate + self.error_rate:
+            self.count("error")
+            return "error"
+        return None
+
+    def count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.mock = self
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        # 頁面先讀進記憶體並改寫網址，伺服器本身不成為瓶頸
+        original = (self.store.base_url or "").rstrip('/')
+        for key in self.store.pages:
+            text = self.store.load(key)
+            if original:
+                text = text.replace(original, self.url)
+            body = text.encode('utf-8')
+            etag = '"' + hashlib.sha1(body).hexdigest()[:16] + '"'
+            self.pages[key] = (body, self.store.pages[key]["content_type"], etag)
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def report(self):
+        s = self.stats
+        return (f"模擬伺服器: 回應 {s['ok']}、304 {s['not_modified']}、找不到 {s['not_found']}、"
+                f"注入 503 {s['error']} 次、斷線 {s['reset']} 次")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="重播頁面存檔的本機 HTTP 伺服器")
+    parser.add_argument('source', help='來源代號 (benchmarks/fixtures/ 底下的資料夾名稱)')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--latency', type=float, default=0.0, help='每個請求的平均延遲 (秒)')
+    parser.add_argument('--jitter', type=float, default=0.5, help='延遲浮動比例')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='回 503 的比例')
+    parser.add_argument('--reset-rate', type=float, default=0.0, help='直接斷線的比例')
+    args = parser.parse_args()
+
+    store = FixtureStore.for_source(args.source)
+    if not len(store):
+        sys.exit(f"找不到 {args.source} 的頁面存檔，請先執行 benchmarks/fixtures.py")
+    with MockServer(store, args.port, args.latency, args.jitter, args.error_rate, args.reset_rate) as server:
+        print(f"{args.source}: {len(store)} 頁，{store.base_url} → {server.url} (Ctrl+C 結束)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            print(server.report())
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,6 @@
-import os, glob, subprocess, sys
+import os, glob, subprocess, sys, time, re, argparse, threading, json, importlib.util
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 # 爬蟲跟 run_all.py 放一起
@@ -6,11 +8,345 @@ DATA_DIR = os.path.join(BASE_DIR, "data")
 if not os.path.exists(DATA_DIR): os.makedirs(DATA_DIR)
 
 python_cmd = 'python3' if sys.platform != 'win32' else 'python'
-files = glob.glob(os.path.join(BASE_DIR, "*.py"))
 
-for f in files:
-    name = os.path.basename(f)
-    if name == 'run_all.py': continue
-    print(f">>> 執行: {name}")
+# 每次執行的指標 JSON 與效能剖析結果
+METRICS_DIR = os.path.join(DATA_DIR, "metrics")
+PROFILE_DIR = os.path.join(DATA_DIR, "profiles")
+# 子行程寫出指標的檔案 (與 scraper_core.metrics.METRICS_ENV 相同，這裡不為此載入 scraper_core)
+METRICS_ENV = "SCRAPER_METRICS"
+PROFILERS = ("cprofile", "pyinstrument")
+# 常駐模式下在這個行程內重複執行的腳本 (提供 open_session(資料夾)，瀏覽器等資源不必每次重開)
+RESIDENT_SCRIPTS = ("tass_20_OK.py",)
+
+# 各爬蟲結尾會印出「共 N 篇」/「共抓取 N 篇」，用來統計篇數
+ARTICLE_COUNT_RE = re.compile(r'共\s*(?:抓取\s*)?(\d+)\s*篇')
+
+# 多個爬蟲同時輸出時避免同一行被截斷
+print_lock = threading.Lock()
+
+
+def find_scrapers():
+    files = sorted(glob.glob(os.path.join(BASE_DIR, "*.py")))
+    return [f for f in files if os.path.basename(f) != 'run_all.py']
+
+
+def log(prefix, line):
+    with print_lock:
+        print(f"[{prefix}] {line}", flush=True)
+
+
+def wants_profile(names, *keys):
+    """ --profile 指定的名稱 (腳本檔名、不含副檔名的檔名或來源名稱，或 all) 是否包含這個爬蟲 """
+    return bool(names) and ("all" in names or any(k in names for k in keys))
+
+
+def scraper_command(path, stamp, profiler=None, extra_args=()):
+    """ 子行程的命令列；要剖析時改以 cProfile / pyinstrument 包起來，回傳 (命令, 剖析結果檔) """
+    if profiler is None:
+        return [python_cmd, path, DATA_DIR, *extra_args], None
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    prefix = os.path.splitext(os.path.basename(path))[0].replace(" ", "_")
+    if profiler == "pyinstrument":
+        output = os.path.join(PROFILE_DIR, f"{prefix}_{stamp}.html")
+        return [python_cmd, '-m', 'pyinstrument', '-r', 'html', '-o', output, path, DATA_DIR, *extra_args], output
+    output = os.path.join(PROFILE_DIR, f"{prefix}_{stamp}.prof")
+    return [python_cmd, '-m', 'cProfile', '-o', output, path, DATA_DIR, *extra_args], output
+
+
+def run_scraper(path, timeout, deadline, stamp, profiler=None, extra_args=()):
+    """ 以子行程執行單一爬蟲，輸出加上前綴即時轉印，並回傳執行結果 """
+    name = os.path.basename(path)
+    prefix = os.path.splitext(name)[0]
+    result = {"name": name, "status": "skipped", "returncode": None, "duration": 0.0, "articles": None}
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        log(prefix, "已超過整體時間預算，略過。")
+        return result
+    limit = min(timeout, remaining)
+
+    log(prefix, f">>> 執行: {name} (時限 {limit:.0f} 秒)" + (f"，以 {profiler} 剖析" if profiler else ""))
+    metrics_path = os.path.join(METRICS_DIR, f"{prefix.replace(' ', '_')}_{stamp}.json")
+    env = dict(os.environ, PYTHONUNBUFFERED="1", PYTHONIOENCODING="utf-8", **{METRICS_ENV: metrics_path})
     # 傳入 data 資料夾路徑當作參數
-    subprocess.run([python_cmd, f, DATA_DIR])
+    command, profile_path = scraper_command(path, stamp, profiler, extra_args)
+    start = time.monotonic()
+    proc = subprocess.Popen(
+        command,
+        stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+        text=True, encoding='utf-8', errors='replace', env=env
+    )
+
+    def pump():
+        for line in proc.stdout:
+            line = line.rstrip()
+            match = ARTICLE_COUNT_RE.search(line)
+            if match:
+                result["articles"] = int(match.group(1))
+            log(prefix, line)
+
+    reader = threading.Thread(target=pump, daemon=True)
+    reader.start()
+
+    try:
+        proc.wait(timeout=limit)
+        result["status"] = "ok" if proc.returncode == 0 else "failed"
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+        result["status"] = "timeout"
+        log(prefix, f"超過時限 {limit:.0f} 秒，已強制結束。")
+
+    reader.join(timeout=5)
+    result["returncode"] = proc.returncode
+    result["duration"] = time.monotonic() - start
+    # 子行程寫出的指標 (逾時被強制結束時沒有)
+    result["metrics"] = load_metrics(metrics_path)
+    if profile_path and os.path.exists(profile_path):
+        result["profile"] = profile_path
+        log(prefix, f"剖析結果: {profile_path}")
+    return result
+
+
+def load_metrics(path):
+    """ 讀回子行程的指標檔並刪除 (內容會併入整體報表) """
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except ValueError:
+        return None
+    finally:
+        os.remove(path)
+
+
+def run_in_process(sources, timeout, deadline, workers, resume=False):
+    """ 在這個行程內執行多個來源，共用連線池、翻譯快取與輸出 """
+    from scraper_core.runner import SourceRunner
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return [{"name": s.script or s.name, "status": "skipped", "returncode": None,
+                 "duration": 0.0, "articles": None} for s in sources]
+    with SourceRunner(DATA_DIR) as runner:
+        results = runner.run_many(sources, workers=workers, time_limit=min(timeout, remaining), resume=resume)
+    return [{"name": s.script or s.name, "status": r.status, "returncode": None,
+             "duration": r.duration, "articles": r.articles} for s, r in zip(sources, results)]
+
+
+class ResidentScript:
+    """ 常駐模式: 載入腳本模組，第一次執行時 open_session，之後重複呼叫 session.run() """
+
+    def __init__(self, path):
+        name = os.path.splitext(os.path.basename(path))[0]
+        spec = importlib.util.spec_from_file_location(name, path)
+        self.module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(self.module)
+        self.session = None
+
+    def run(self):
+        from scraper_core.scheduler import JobResult
+        if self.session is None:
+            self.session = self.module.open_session(DATA_DIR)
+        articles = self.session.run()
+        # 有文章處理失敗時還有東西沒做完，當作被截斷 (下次提早執行)
+        return JobResult(articles, truncated=not getattr(self.session, "completed", True))
+
+    def reset(self):
+        """ 執行失敗 (例如瀏覽器當掉) 後關掉 session，下次重新開啟 """
+        session, self.session = self.session, None
+        if session is not None:
+            session.close()
+
+    def close(self):
+        self.reset()
+
+
+def daemon_jobs(files, timeout, interval):
+    """
+    常駐模式的工作: sources/ 的來源共用一個 SourceRunner (連線池、快取保持開啟)；
+    RESIDENT_SCRIPTS 在行程內重複執行；其餘腳本每次以子行程執行
+    回傳 (工作清單, 結束時要關閉的物件)
+    """
+    from scraper_core.runner import SourceRunner
+    from scraper_core.scheduler import Job, JobResult
+    from sources import all_sources
+
+    runner = SourceRunner(DATA_DIR)
+    closers = [runner]
+    jobs = []
+    sources = all_sources()
+    for source in sources:
+        def run_source(source=source):
+            result = runner.run(source, time_limit=timeout)
+            return JobResult(result.articles, truncated=result.dropped > 0 or result.status == "timeout",
+                             status=result.status)
+        jobs.append(Job(source.name, run_source, source.poll_interval,
+                        source.min_poll_interval, source.max_poll_interval))
+
+    covered = {s.script for s in sources}
+    for path in files:
+        name = os.path.basename(path)
+        if name in covered:
+            continue
+        if name in RESIDENT_SCRIPTS:
+            script = ResidentScript(path)
+            closers.append(script)
+            module = script.module
+            jobs.append(Job(name, script.run, getattr(module, "POLL_INTERVAL", interval),
+                            getattr(module, "MIN_POLL_INTERVAL", 300), getattr(module, "MAX_POLL_INTERVAL", 6 * 3600),
+                            reset=script.reset))
+            continue
+
+        def run_subprocess(path=path):
+            stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+            result = run_scraper(path, timeout, time.monotonic() + timeout, stamp)
+            status = "failed" if result["status"] == "failed" else "ok"
+            return JobResult(result["articles"] or 0, truncated=result["status"] == "timeout", status=status)
+        jobs.append(Job(name, run_subprocess, interval))
+    return jobs, closers
+
+
+def run_daemon(files, args):
+    """ 常駐排程: 各來源依自己的間隔反覆執行，直到 Ctrl+C / SIGTERM """
+    import signal
+    from scraper_core.metrics import METRICS
+    from scraper_core.scheduler import DirectoryLock, Scheduler
+
+    lock = DirectoryLock(DATA_DIR)
+    if not lock.acquire():
+        print(f"{DATA_DIR} 已有常駐排程在執行 ({lock.path})，結束。")
+        sys.exit(1)
+    jobs, closers = daemon_jobs(files, args.timeout, args.interval)
+    status_path = os.path.join(METRICS_DIR, "daemon.json")
+
+    def on_finish(name, result):
+        # 每次執行後更新累計的指標，不必等常駐結束
+        METRICS.write_json(status_path, jobs=scheduler.report().splitlines())
+
+    scheduler = Scheduler(DATA_DIR, jobs, workers=args.workers, jitter=args.jitter,
+                          target_articles=args.target_articles, on_finish=on_finish)
+    signal.signal(signal.SIGTERM, lambda *_: scheduler.stop())
+    try:
+        scheduler.run()
+    finally:
+        print(scheduler.report())
+        scheduler.close()
+        for closer in closers:
+            try:
+                closer.close()
+            except Exception as e:
+                print(f"關閉時發生錯誤: {e}")
+        lock.release()
+
+
+def write_metrics(results, elapsed, stamp, in_process):
+    """ 各爬蟲的結果與指標合併成一份 JSON: data/metrics/run_<時間>.json """
+    report = {"started": stamp, "elapsed": round(elapsed, 3), "results": results}
+    if in_process:
+        from scraper_core.metrics import METRICS
+        report["in_process"] = METRICS.snapshot()
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    path = os.path.join(METRICS_DIR, f"run_{stamp}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return path, report
+
+
+def print_hosts(report):
+    """ 各網域的請求數與延遲 (p50 / p99)，方便一眼看出慢在哪個網站 """
+    snapshots = [r["metrics"] for r in report["results"] if r.get("metrics")]
+    if report.get("in_process"):
+        snapshots.append(report["in_process"])
+    rows = []
+    for snapshot in snapshots:
+        errors = snapshot.get("counters", {}).get("fetch.errors", {})
+        for host, h in snapshot.get("histograms", {}).get("fetch.latency", {}).items():
+            rows.append((host, h["count"], errors.get(host, 0), h["p50"], h["p99"]))
+    if not rows:
+        return
+    print(f"{'網域':<28}{'請求':>8}{'錯誤':>8}{'p50(秒)':>10}{'p99(秒)':>10}")
+    for host, count, errors, p50, p99 in sorted(rows, key=lambda r: -r[1]):
+        print(f"{host:<28}{count:>8}{errors:>8}{p50:>10.3f}{p99:>10.3f}")
+    print("-" * 64)
+
+
+def print_summary(results, elapsed):
+    print("\n" + "=" * 64)
+    print(f"{'爬蟲':<28}{'狀態':<10}{'結束碼':>6}{'耗時(秒)':>10}{'篇數':>8}")
+    print("-" * 64)
+    for r in results:
+        code = "" if r["returncode"] is None else str(r["returncode"])
+        articles = "-" if r["articles"] is None else str(r["articles"])
+        print(f"{r['name']:<28}{r['status']:<10}{code:>6}{r['duration']:>10.1f}{articles:>8}")
+    print("-" * 64)
+    print(f"總耗時: {elapsed:.1f} 秒")
+
+
+def main():
+    files = find_scrapers()
+
+    parser = argparse.ArgumentParser(description="平行執行所有新聞爬蟲")
+    parser.add_argument('--workers', type=int, default=len(files) or 1, help='同時執行的爬蟲數量')
+    parser.add_argument('--timeout', type=float, default=1800, help='單一爬蟲的執行時限 (秒)')
+    parser.add_argument('--budget', type=float, default=3600, help='整體執行時間預算 (秒)，超過後不再啟動新爬蟲')
+    parser.add_argument('--in-process', action='store_true',
+                        help='sources/ 登記的來源在同一個行程內執行 (共用連線池與快取)，其餘腳本照常以子行程執行')
+    parser.add_argument('--profile', action='append', default=[], metavar='NAME',
+                        help='剖析指定的爬蟲 (檔名或來源名稱，可重複指定；all 表示全部)，'
+                             '結果存到 data/profiles/；被強制結束的爬蟲沒有剖析結果')
+    parser.add_argument('--profiler', choices=PROFILERS, default='cprofile',
+                        help='剖析工具 (pyinstrument 沒安裝時改用 cprofile)')
+    parser.add_argument('--resume', action='store_true', help='各爬蟲接續上次沒有完整結束的執行')
+    parser.add_argument('--daemon', action='store_true',
+                        help='常駐排程: 各來源依自己的輪詢間隔反覆執行，連線池、翻譯快取與瀏覽器保持開啟')
+    parser.add_argument('--interval', type=float, default=3600,
+                        help='--daemon 時沒有設定間隔的腳本多久執行一次 (秒)')
+    parser.add_argument('--jitter', type=float, default=0.1, help='--daemon 時排定時間的隨機抖動比例')
+    parser.add_argument('--target-articles', type=int, default=5,
+                        help='--daemon 依新文章速度調整間隔，讓每次約抓到這麼多篇')
+    args = parser.parse_args()
+
+    if args.daemon:
+        run_daemon(files, args)
+        return
+    extra_args = ['--resume'] if args.resume else []
+
+    profiler = args.profiler
+    if args.profile and profiler == 'pyinstrument' and importlib.util.find_spec('pyinstrument') is None:
+        print("找不到 pyinstrument，改用 cProfile 剖析。")
+        profiler = 'cprofile'
+
+    start = time.monotonic()
+    deadline = start + args.budget
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    sources = []
+    if args.in_process:
+        from sources import all_sources
+        # 要剖析的來源改以子行程執行，剖析結果才不會混在一起
+        sources = [s for s in all_sources()
+                   if not wants_profile(args.profile, s.name, s.script, os.path.splitext(s.script)[0])]
+        covered = {s.script for s in sources}
+        files = [f for f in files if os.path.basename(f) not in covered]
+
+    def profiler_for(path):
+        name = os.path.basename(path)
+        return profiler if wants_profile(args.profile, name, os.path.splitext(name)[0]) else None
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = [pool.submit(run_scraper, f, args.timeout, deadline, stamp, profiler_for(f), extra_args)
+                   for f in files]
+        results = run_in_process(sources, args.timeout, deadline, args.workers, args.resume) if sources else []
+        results += [fut.result() for fut in futures]
+
+    elapsed = time.monotonic() - start
+    print_summary(results, elapsed)
+    path, report = write_metrics(results, elapsed, stamp, in_process=bool(sources))
+    print_hosts(report)
+    print(f"執行指標: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,4 @@
+"""
+各新聞爬蟲共用的核心元件
+(放在子資料夾內，run_all.py 只會掃描上一層的 *.py，不會把這裡當成爬蟲執行)
+"""
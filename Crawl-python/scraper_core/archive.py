@@ -0,0 +1,306 @@
+"""
+原始頁面存檔 (抓到的 HTML 原樣保存)
+- 網站改版、選擇器 (例如 .article_title、.paragraph) 失效時，修好選擇器後從存檔重新解析，不必重新抓取
+  (舊文章可能已經下架，重抓也要照限速慢慢來)
+- 每個來源的頁面依序附加到區段檔 (<來源>/<時間>-<pid>-<序號>.<壓縮>.seg)，寫到上限 (預設 64 MB) 就換新檔
+- 每筆是 4 bytes 長度 + 各自壓縮的 (JSON 標頭一行 + 頁面內容)，可依位移直接讀出單筆；
+  區段本身帶有網址與標頭，沒有索引也讀得回來
+- 壓縮預設 zlib；有安裝 zstandard 時改用 zstd (讀取 zstd 區段也需要 zstandard)
+- 索引放在 SQLite: 網址、種類 (列表頁 / 文章)、列表上的分類與標題、下載時間、所在區段與位移
+- 同一網址內容沒變 (例如 304 取回的快取內容) 時不重複存
+- reparse() 依索引把區段分批交給多個行程，以來源現行的 parse_article 重新解析，完全不連網
+- 設定 SCRAPER_ARCHIVE=0 時不存檔
+
+重新解析: python "crawl CNA.py" <資料夾> --reparse [--since 2024-05-01] [--until 2024-05-31] [--workers 8]
+查看: python -m scraper_core.archive <資料夾> report
+"""
+import hashlib
+import importlib.util
+import json
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+from datetime import datetime
+
+from .frontier import ARTICLE
+from .metrics import METRICS
+
+ARCHIVE_DIRNAME = "raw_archive"
+INDEX_FILENAME = "index.sqlite3"
+# 設為 0 時不存檔
+ARCHIVE_ENV = "SCRAPER_ARCHIVE"
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_LENGTH = struct.Struct(">I")
+
+
+def archive_enabled():
+    return os.environ.get(ARCHIVE_ENV, "1") != "0"
+
+
+def default_codec():
+    return "zstd" if importlib.util.find_spec("zstandard") is not None else "zlib"
+
+
+def _compressor(codec):
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdCompressor(level=10).compress
+    return lambda data: zlib.compress(data, 6)
+
+
+def _decompressor(codec):
+    if codec == "zstd":
+        import zstandard
+        return zstandard.ZstdDecompressor().decompress
+    return zlib.decompress
+
+
+def read_frame(f, offset, decompress):
+    """ 從區段檔的 offset 讀出一筆，回傳 (標頭 dict, 頁面內容) """
+    f.seek(offset)
+    (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+    header, _, body = decompress(f.read(length)).partition(b"\n")
+    return json.loads(header), body.decode('utf-8')
+
+
+class RawArchive:
+    def __init__(self, directory, codec=None, max_segment_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.codec = codec or default_codec()
+        self.max_segment_bytes = max_segment_bytes
+        self.stored = 0
+        self.unchanged = 0
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # 壓縮器不能跨執行緒共用 (zstd)，每個執行緒各一個
+        self._local = threading.local()
+        # {來源: (區段相對路徑, 檔案)}
+        self._segments = {}
+        self._serial = 0
+        self.conn = sqlite3.connect(os.path.join(directory, INDEX_FILENAME), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT,
+                kind TEXT,
+                url TEXT,
+                category TEXT,
+                title TEXT,
+                published TEXT,
+                status INTEGER,
+                fetched_at TEXT,
+                segment TEXT,
+                offset INTEGER,
+                length INTEGER,
+                size INTEGER,
+                codec TEXT,
+                digest TEXT
+            );
+            CREATE INDEX IF NOT EXISTS pages_source ON pages (source, kind, fetched_at);
+            CREATE INDEX IF NOT EXISTS pages_url ON pages (url);
+        """)
+        self.conn.commit()
+
+    def _compress(self, data):
+        compress = getattr(self._local, "compress", None)
+        if compress is None:
+            compress = self._local.compress = _compressor(self.codec)
+        return compress(data)
+
+    def _segment(self, source):
+        """ 目前寫入中的區段，超過上限時換新檔 (呼叫端持有 _lock) """
+        current = self._segments.get(source)
+        if current is not None and current[1].tell() < self.max_segment_bytes:
+            return current
+        if current is not None:
+            current[1].close()
+        os.makedirs(os.path.join(self.directory, source), exist_ok=True)
+        self._serial += 1
+        name = f"{source}/{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}-{self._serial}.{self.codec}.seg"
+        current = self._segments[source] = (name, open(os.path.join(self.directory, name), 'ab'))
+        return current
+
+    def add(self, source, kind, response, category=None, title=None, published=None):
+        """
+        存一個抓取結果 (200，或 304 時的快取內容)；kind 為 frontier.LISTING / ARTICLE
+        category / title / published 為列表上的資訊，重新解析時照樣交給 parse_article
+        同一網址內容沒變時不重複存，回傳是否有存
+        """
+        if response.error or not response.text or not (response.status == 200 or response.not_modified):
+            return False
+        body = response.text.encode('utf-8')
+        digest = hashlib.sha1(body).hexdigest()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT digest FROM pages WHERE url = ? ORDER BY id DESC LIMIT 1", (response.url,)).fetchone()
+            if row is not None and row[0] == digest:
+                self.unchanged += 1
+                return False
+        fetched_at = datetime.now().strftime(_TIME_FORMAT)
+        header = {"url": response.url, "source": source, "kind": kind, "status": response.status,
+                  "fetched_at": fetched_at, "content_type": response.headers.get('Content-Type')}
+        # 壓縮不必佔著鎖，各抓取執行緒可以同時壓縮
+        payload = self._compress(json.dumps(header, ensure_ascii=False).encode('utf-8') + b"\n" + body)
+        with self._lock:
+            segment, f = self._segment(source)
+            offset = f.tell()
+            f.write(_LENGTH.pack(len(payload)) + payload)
+            f.flush()
+            self.conn.execute(
+                "INSERT INTO pages (source, kind, url, category, title, published, status, fetched_at, "
+                "segment, offset, length, size, codec, digest) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (source, kind, response.url, category, title,
+                 published.strftime(_TIME_FORMAT) if published else None, response.status, fetched_at,
+                 segment, offset, len(payload), len(body), self.codec, digest))
+            self.conn.commit()
+            self.stored += 1
+        METRICS.count("archive.pages", source)
+        METRICS.count("archive.bytes", source, len(payload))
+        return True
+
+    def entries(self, source, kind, since=None, until=None):
+        """
+        下載時間在 [since, until] (datetime，含) 的存檔，同一網址只取最新一筆
+        依區段與位移排序 (讀取時循序)，回傳 [(區段, 位移, 壓縮, 網址, 分類, 標題, 列表上的發布時間, 下載時間)]
+        """
+        conditions = ["source = ?", "kind = ?"]
+        params = [source, kind]
+        if since is not None:
+            conditions.append("fetched_at >= ?")
+            params.append(since.strftime(_TIME_FORMAT))
+        if until is not None:
+            conditions.append("fetched_at <= ?")
+            params.append(until.strftime(_TIME_FORMAT))
+        with self._lock:
+            return self.conn.execute(
+                "SELECT segment, offset, codec, url, category, title, published, fetched_at FROM pages "
+                f"WHERE id IN (SELECT MAX(id) FROM pages WHERE {' AND '.join(conditions)} GROUP BY url) "
+                "ORDER BY segment, offset", params).fetchall()
+
+    def load(self, url):
+        """ 某網址最新存檔的 (標頭, 頁面內容)，沒有則回傳 None """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT segment, offset, codec FROM pages WHERE url = ? ORDER BY id DESC LIMIT 1", (url,)).fetchone()
+            if row is None:
+                return None
+            self._flush()
+        with open(os.path.join(self.directory, row[0]), 'rb') as f:
+            return read_frame(f, row[1], _decompressor(row[2]))
+
+    def _flush(self):
+        for _, f in self._segments.values():
+            f.flush()
+
+    def report(self):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT source, kind, COUNT(*), COUNT(DISTINCT url), SUM(length), SUM(size), "
+                "MIN(fetched_at), MAX(fetched_at) FROM pages GROUP BY source, kind ORDER BY source, kind").fetchall()
+        lines = [f"頁面存檔: {self.directory}"]
+        for source, kind, count, urls, length, size, first, last in rows:
+            ratio = size / length if length else 0
+            lines.append(f"  {source:<18} {kind:<8} {count} 筆 ({urls} 個網址)  {length / 1024 / 1024:.1f} MB "
+                         f"(壓縮 {ratio:.1f} 倍)  {first} ~ {last}")
+        return "\n".join(lines)
+
+    def close(self):
+        with self._lock:
+            for _, f in self._segments.values():
+                f.close()
+            self._segments.clear()
+            self.conn.close()
+
+
+def open_archive(save_dir):
+    """ 開啟輸出資料夾下的頁面存檔，SCRAPER_ARCHIVE=0 時回傳 None """
+    if not archive_enabled():
+        return None
+    return RawArchive(os.path.join(save_dir, ARCHIVE_DIRNAME))
+
+
+# ---------- 重新解析 (子行程) ----------
+
+_source = None
+
+
+def _init_worker(source):
+    global _source
+    _source = source
+
+
+def _parse_batch(task):
+    """ 解析同一個區段內的一批存檔，回傳 [(網址, 記錄或 None)] """
+    from .fetcher import FetchResult
+    from .source import ArticleJob
+    path, codec, rows = task
+    decompress = _decompressor(codec)
+    results = []
+    with open(path, 'rb') as f:
+        for offset, url, category, title, published, fetched_at in rows:
+            header, text = read_frame(f, offset, decompress)
+            response = FetchResult(url, header.get("status") or 200, text,
+                                   {'Content-Type': header.get("content_type") or "text/html"})
+            job = ArticleJob(url, category, title,
+                             datetime.strptime(published, _TIME_FORMAT) if published else None)
+            record = _source.parse_article(response, job)
+            if record is not None:
+                # 下載時間沿用當初抓取的時間 (Parquet 依此分區，也才能取代同一筆舊記錄)
+                record['fetched_at'] = fetched_at
+            results.append((url, record))
+    return results
+
+
+def reparse(archive, source, since=None, until=None, workers=None, batch_size=64):
+    """
+    以 source.parse_article 重新解析存檔的文章頁 (不連網)，依存檔順序產生 (網址, 記錄或 None)
+    since / until: 只處理這段時間下載的頁面；workers: 平行解析的行程數 (預設 CPU 核心數，1 表示不開子行程)
+    列表頁的 accept / 日期過濾是抓取時的條件，這裡不套用
+    """
+    tasks = []
+    for segment, offset, codec, url, category, title, published, fetched_at in archive.entries(
+            source.name, ARTICLE, since, until):
+        path = os.path.join(archive.directory, segment)
+        if not tasks or tasks[-1][0] != path or len(tasks[-1][2]) >= batch_size:
+            tasks.append((path, codec, []))
+        tasks[-1][2].append((offset, url, category, title, published, fetched_at))
+    if not tasks:
+        return
+    # 寫入中的區段先寫到檔案，子行程才讀得到
+    with archive._lock:
+        archive._flush()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        _init_worker(source)
+        for task in tasks:
+            yield from _parse_batch(task)
+        return
+    # 平行解析才用得到，不在爬蟲啟動時載入
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    # 呼叫端通常已經有執行緒在跑 (流水線)，子行程以 spawn 啟動，不複製執行緒持有的鎖 (Windows 本來就是 spawn)
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_init_worker, initargs=(source,)) as pool:
+        for results in pool.map(_parse_batch, tasks):
+            yield from results
+
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description="查看原始頁面存檔")
+    parser.add_argument("save_dir", help="爬蟲的輸出資料夾")
+    parser.add_argument("action", choices=["report"])
+    args = parser.parse_args()
+
+    archive = RawArchive(os.path.join(args.save_dir, ARCHIVE_DIRNAME))
+    print(archive.report())
+    archive.close()
+
+
+if __name__ == '__main__':
+    main()
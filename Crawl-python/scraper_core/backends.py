@@ -0,0 +1,132 @@
+"""
+可替換的翻譯引擎
+- google: deep_translator 的 GoogleTranslator (線上，需要限速)
+- argos: Argos Translate 離線模型，在 CPU 上以多個子行程平行翻譯，Google 限流時可切換
+- stub: 固定規則的假翻譯，不連網，給效能測試用
+
+選擇方式: get_backend(name) 或環境變數 TRANSLATOR_BACKEND (預設 google)
+"""
+import os
+import time
+
+from .translate import MAX_REQUEST_CHARS
+
+BACKEND_ENV = "TRANSLATOR_BACKEND"
+# stub 每次請求模擬的延遲秒數 (離線效能測試用)
+STUB_LATENCY_ENV = "TRANSLATOR_STUB_LATENCY"
+DEFAULT_BACKEND = "google"
+
+
+class TranslationBackend:
+    name = "base"
+    # 是否為線上服務 (CachedTranslator 只對線上引擎套用限速)
+    remote = False
+    max_chars = MAX_REQUEST_CHARS
+
+    def __init__(self, source='auto', target='zh-TW'):
+        self.source = source
+        self.target = target
+
+    def translate(self, text):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class GoogleBackend(TranslationBackend):
+    name = "google"
+    remote = True
+
+    def __init__(self, source='auto', target='zh-TW'):
+        super().__init__(source, target)
+        self._translator = None
+
+    def translate(self, text):
+        if self._translator is None:
+            from deep_translator import GoogleTranslator
+            self._translator = GoogleTranslator(source=self.source, target=self.target)
+        return self._translator.translate(text)
+
+
+# ---------- Argos (離線) ----------
+
+# Argos 的語言代碼沒有區分繁簡
+ARGOS_LANGUAGE_CODES = {"zh-TW": "zh", "zh-CN": "zh"}
+
+_argos_translation = None
+
+
+def _argos_init(source, target):
+    """ 子行程啟動時載入一次模型，之後每次翻譯直接使用 """
+    global _argos_translation
+    from argostranslate import translate as argos_translate
+    _argos_translation = argos_translate.get_translation_from_codes(source, target)
+
+
+def _argos_translate(text):
+    return _argos_translation.translate(text)
+
+
+class ArgosBackend(TranslationBackend):
+    name = "argos"
+    # 本機模型一次處理太長的文字會變慢，切小一點比較能平行
+    max_chars = 1500
+
+    def __init__(self, source='auto', target='zh-TW', workers=None):
+        if source == 'auto':
+            raise ValueError("Argos 離線翻譯需要指定來源語言 (例如 source='ru')")
+        super().__init__(source, target)
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self._pool = None
+
+    def translate(self, text):
+        if self._pool is None:
+            # multiprocessing 只有離線翻譯用得到，不在啟動時載入
+            from concurrent.futures import ProcessPoolExecutor
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_argos_init,
+                initargs=(ARGOS_LANGUAGE_CODES.get(self.source, self.source),
+                          ARGOS_LANGUAGE_CODES.get(self.target, self.target)),
+            )
+        return self._pool.submit(_argos_translate, text).result()
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+
+# ---------- Stub (效能測試) ----------
+
+class StubBackend(TranslationBackend):
+    name = "stub"
+
+    def __init__(self, source='auto', target='zh-TW', latency=None):
+        """ latency: 每次請求模擬的延遲秒數，未指定時讀環境變數 TRANSLATOR_STUB_LATENCY (預設 0) """
+        super().__init__(source, target)
+        self.latency = float(os.environ.get(STUB_LATENCY_ENV, 0)) if latency is None else latency
+        self.requests = 0
+
+    def translate(self, text):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+        # 逐行加上標記，保留換行結構，合併請求拆回時行數一致
+        return "\n".join(f"[{self.target}] {line}" if line.strip() else line for line in text.split("\n"))
+
+
+BACKENDS = {
+    GoogleBackend.name: GoogleBackend,
+    ArgosBackend.name: ArgosBackend,
+    StubBackend.name: StubBackend,
+}
+
+
+def get_backend(name=None, source='auto', target='zh-TW', **kwargs):
+    """ 依名稱建立翻譯引擎，未指定時讀環境變數 TRANSLATOR_BACKEND """
+    name = (name or os.environ.get(BACKEND_ENV) or DEFAULT_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"未知的翻譯引擎: {name} (可用: {', '.join(BACKENDS)})")
+    return BACKENDS[name](source=source, target=target, **kwargs)
@@ -0,0 +1,122 @@
+"""
+可重複使用的無頭 Chrome 瀏覽器池
+- 啟動 N 個瀏覽器 (平行啟動)，文章網址分散給各瀏覽器處理，不必每篇重開 Chrome
+- 封鎖圖片、字型與影音，頁面載入策略設為 eager (DOM 好了就回來，不等其他資源)
+- wait_for() 以選擇器等待元素出現，取代固定秒數的 sleep
+- session_headers() 取出瀏覽器的 Cookie 與 User-Agent，讓後續改用一般 HTTP 請求
+- selenium 在啟動瀏覽器時才載入
+- 啟動、借用 (等待閒置瀏覽器) 與 wait_for 的耗時記到 METRICS
+"""
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from .metrics import METRICS
+
+# 透過 DevTools 封鎖的資源 (圖片、字型、影音)
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.mp4", "*.webm", "*.mp3", "*.m3u8", "*.ogg",
+]
+
+
+def build_chrome_options(headless=True):
+    from selenium.webdriver.chrome.options import Options
+    chrome_options = Options()
+    if headless:
+        chrome_options.add_argument('--headless')  # 無頭模式
+
+    # 隱藏警告訊息
+    chrome_options.add_argument('--log-level=3')
+    chrome_options.add_argument('--disable-logging')
+    chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
+
+    # 模擬真實瀏覽器設定
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')
+
+    # 不載入圖片，DOM 就緒即返回
+    chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+    chrome_options.add_experimental_option('prefs', {
+        'profile.managed_default_content_settings.images': 2,
+    })
+    chrome_options.page_load_strategy = 'eager'
+    return chrome_options
+
+
+def start_driver(headless=True):
+    from selenium import webdriver
+    with METRICS.timer("browser.start"):
+        driver = webdriver.Chrome(options=build_chrome_options(headless))
+    try:
+        # 字型、影音沒有對應的偏好設定，用 DevTools 直接封鎖
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        print(f"  [瀏覽器] 無法設定資源封鎖，照常載入: {e}")
+    return driver
+
+
+def wait_for(driver, css_selector, timeout=15):
+    """ 等到選擇器對應的元素出現 (逾時會丟出 TimeoutException) """
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.webdriver.support.ui import WebDriverWait
+    with METRICS.timer("browser.wait", css_selector):
+        WebDriverWait(driver, timeout).until(EC.presence_of_element_located((By.CSS_SELECTOR, css_selector)))
+
+
+def session_headers(driver):
+    """ 瀏覽器目前的 Cookie 與 User-Agent，轉成 HTTP 請求標頭 """
+    cookies = driver.get_cookies()
+    user_agent = driver.execute_script("return navigator.userAgent")
+    headers = {
+        # 無頭模式的 User-Agent 帶有 HeadlessChrome 字樣，改回一般 Chrome
+        'User-Agent': user_agent.replace('HeadlessChrome', 'Chrome'),
+    }
+    if cookies:
+        headers['Cookie'] = "; ".join(f"{c['name']}={c['value']}" for c in cookies)
+    return headers
+
+
+class BrowserPool:
+    def __init__(self, size=3, headless=True):
+        print(f"正在啟動 {size} 個瀏覽器...")
+        self.size = size
+        self._idle = queue.Queue()
+        self._drivers = []
+        with ThreadPoolExecutor(max_workers=size) as pool:
+            futures = [pool.submit(start_driver, headless) for _ in range(size)]
+        error = None
+        for future in futures:
+            try:
+                driver = future.result()
+            except Exception as e:
+                error = error or e
+                continue
+            self._drivers.append(driver)
+            self._idle.put(driver)
+        if error is not None:
+            # 有瀏覽器啟動失敗時，已啟動的也要關掉，不留下沒人管的 Chrome / chromedriver
+            self.close()
+            raise error
+
+    @contextmanager
+    def driver(self):
+        """ 借用一個閒置的瀏覽器，用完自動歸還 """
+        with METRICS.timer("browser.checkout"):
+            driver = self._idle.get()
+        try:
+            yield driver
+        finally:
+            self._idle.put(driver)
+
+    def close(self):
+        for driver in self._drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        self._drivers = []
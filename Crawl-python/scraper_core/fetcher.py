@@ -0,0 +1,178 @@
+"""
+共用的非同步抓取引擎 (asyncio + aiohttp)
+- 單一 ClientSession，每個網域共用 keep-alive 連線池，不必每篇文章重新握手
+- 每個網域各自限制同時連線數，速率交給 DomainRateLimiter (token bucket)，不同網站可以同時抓
+- 遇到 429/503 或連線錯誤會依限速器給的退避時間重試
+- 設定 cache (HttpCache) 後自動送出條件式請求，304 時回傳快取內容並標記 not_modified
+- 提供同步介面 fetch / fetch_many，事件迴圈跑在背景執行緒，原本的同步爬蟲可直接呼叫
+- aiohttp 在第一次連線時才載入
+- 每個網域的請求數、狀態碼、下載位元組、重試、延遲與限速等待記到 METRICS
+"""
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .metrics import METRICS
+from .ratelimit import DomainRateLimiter, THROTTLE_STATUSES
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: int = 0
+    text: str = ""
+    headers: Dict[str, str] = field(default_factory=dict)
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    # 伺服器回 304，text 為快取內容，呼叫端通常可以直接略過解析
+    not_modified: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.status == 200
+
+
+class AsyncFetcher:
+    def __init__(self, headers=None, per_host=4, rate=1.0, burst=2, host_limits=None,
+                 limiter=None, max_retries=3, timeout=15, total_connections=64, cache=None):
+        """
+        per_host: 每個網域最多同時幾個請求
+        rate / burst: 每個網域每秒幾個請求、可瞬間連發幾個
+        host_limits: 個別網域的 (rate, burst)，例如 {"www.ng.ru": (0.5, 2)}
+        limiter: 直接傳入共用的 DomainRateLimiter (會忽略 rate / burst / host_limits)
+        max_retries: 被限流或連線失敗時最多重試幾次
+        cache: 可選的 HttpCache，啟用條件式請求
+        """
+        self.headers = dict(headers or {})
+        self.per_host = per_host
+        self.limiter = limiter or DomainRateLimiter(rate=rate, burst=burst, domain_limits=host_limits)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.total_connections = total_connections
+        self.cache = cache
+
+        self._loop = None
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._session = None
+        self._host_sems = {}
+
+    # ---------- 背景事件迴圈 ----------
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="fetcher-loop", daemon=True)
+                self._thread.start()
+        return self._loop
+
+    def _run(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop()).result()
+
+    async def _get_session(self):
+        if self._session is None:
+            import aiohttp
+            connector = aiohttp.TCPConnector(
+                limit=self.total_connections,
+                limit_per_host=self.per_host,
+                keepalive_timeout=30,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+        return self._session
+
+    # ---------- 非同步介面 ----------
+
+    async def afetch(self, url, headers=None) -> FetchResult:
+        host = urlsplit(url).netloc
+        sem = self._host_sems.setdefault(host, asyncio.Semaphore(self.per_host))
+        if self.cache is not None:
+            # 快取是 SQLite 與檔案 I/O，交給執行緒池，不擋住事件迴圈上其他進行中的請求
+            conditional = await asyncio.get_running_loop().run_in_executor(
+                None, self.cache.conditional_headers, url)
+            headers = {**conditional, **(headers or {})}
+        async with sem:
+            session = await self._get_session()
+            for attempt in range(self.max_retries + 1):
+                start = time.monotonic()
+                await self.limiter.aacquire(host)
+                METRICS.observe("fetch.throttle_wait", host, time.monotonic() - start)
+                start = time.monotonic()
+                try:
+                    async with session.get(url, headers=headers) as resp:
+                        # 先讀位元組 (記錄下載量)，text() 會沿用已讀取的內容
+                        body = await resp.read()
+                        text = await resp.text(errors='replace')
+                        # 保留不分大小寫的標頭 (伺服器可能送 etag / Etag)，快取與限速器才查得到
+                        result = FetchResult(url, resp.status, text, resp.headers.copy(), time.monotonic() - start)
+                    METRICS.count("fetch.bytes", host, len(body))
+                except Exception as e:
+                    result = FetchResult(url, elapsed=time.monotonic() - start, error=f"{type(e).__name__}: {e}")
+
+                METRICS.count("fetch.requests", host)
+                METRICS.observe("fetch.latency", host, result.elapsed)
+                if attempt:
+                    METRICS.count("fetch.retries", host)
+                if result.error:
+                    METRICS.count("fetch.errors", host)
+                    backoff = self.limiter.on_error(host)
+                else:
+                    METRICS.count("fetch.status", f"{host} {result.status}")
+                    backoff = self.limiter.on_response(host, result.status, result.headers.get('Retry-After'))
+                    if result.status not in THROTTLE_STATUSES:
+                        return await self._apply_cache(result)
+
+                if attempt < self.max_retries:
+                    print(f"  [限流/錯誤] {url} -> {result.error or result.status}，{backoff:.1f} 秒後重試")
+            return result
+
+    async def _apply_cache(self, result):
+        if self.cache is None:
+            return result
+        loop = asyncio.get_running_loop()
+        if result.status == 304:
+            cached = await loop.run_in_executor(None, self.cache.load, result.url)
+            if cached is not None:
+                result.text = cached
+                result.not_modified = True
+                METRICS.count("fetch.not_modified", urlsplit(result.url).netloc)
+        elif result.status == 200:
+            await loop.run_in_executor(None, self.cache.store, result.url, result.text, result.headers)
+        return result
+
+    async def afetch_many(self, urls, headers=None) -> List[FetchResult]:
+        return await asyncio.gather(*(self.afetch(u, headers) for u in urls))
+
+    # ---------- 同步介面 ----------
+
+    def fetch(self, url, headers=None) -> FetchResult:
+        return self._run(self.afetch(url, headers))
+
+    def fetch_many(self, urls, headers=None) -> List[FetchResult]:
+        """ 同時抓取多個網址，回傳順序與輸入相同 """
+        return self._run(self.afetch_many(list(urls), headers))
+
+    def close(self):
+        if self._loop is None:
+            return
+        if self._session is not None:
+            self._run(self._session.close())
+            self._session = None
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,147 @@
+"""
+爬取邊界 (crawl frontier)
+- 待抓的列表頁與文章放在同一個優先佇列，依 (深度, 種類) 排序: 同一頁的文章先於下一頁列表，
+  新的文章會先進流水線，翻頁只在前面的文章送出後才進行
+- 每個網域一個佇列，輪流取出 (per-host fairness)，一個網域的大量翻頁不會把其他網域擠到最後
+- 深度 (翻頁數)、文章數、佇列容量都有上限；超過上限的項目不加入，與抓取失敗的列表頁一樣記為「不完整」
+- 網址去重用 64 位元雜湊集合 (UrlSet)，比存整串網址省記憶體，回補一整週的列表也不會膨脹
+"""
+import hashlib
+import heapq
+import itertools
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Optional
+from urllib.parse import urlsplit
+
+from .seen import normalize_url
+
+LISTING = "listing"
+ARTICLE = "article"
+# 同一深度時文章優先於列表頁
+_KIND_ORDER = {ARTICLE: 0, LISTING: 1}
+
+
+class UrlSet:
+    """ 只存網址的 64 位元雜湊 (blake2b)，碰撞機率可忽略 """
+
+    def __init__(self):
+        self._hashes = set()
+
+    @staticmethod
+    def _key(url):
+        return int.from_bytes(hashlib.blake2b(normalize_url(url).encode('utf-8'), digest_size=8).digest(), 'big')
+
+    def add(self, url):
+        """ 加入網址，回傳是否是新的 """
+        key = self._key(url)
+        if key in self._hashes:
+            return False
+        self._hashes.add(key)
+        return True
+
+    def __contains__(self, url):
+        return self._key(url) in self._hashes
+
+    def __len__(self):
+        return len(self._hashes)
+
+
+@dataclass
+class FrontierItem:
+    url: str
+    kind: str = LISTING
+    # 列表頁: 第幾頁 (從 0 起算)；文章: 所在列表頁的深度
+    depth: int = 0
+    category: Optional[str] = None
+    # 列表頁的第一頁網址 (翻頁網址範本用)
+    origin: Optional[str] = None
+    # 文章項目附帶的 ArticleJob
+    job: Any = None
+
+
+class Frontier:
+    def __init__(self, max_depth=None, max_articles=None, max_size=10000):
+        """
+        max_depth: 列表頁最多翻到第幾頁 (0 表示只抓第一頁)，None 表示不限
+        max_articles: 最多送出幾篇文章；max_size: 佇列中最多幾個項目
+        """
+        self.max_depth = max_depth
+        self.max_articles = max_articles
+        self.max_size = max_size
+        self.seen = UrlSet()
+        self._queues = {}
+        self._hosts = deque()
+        self._counter = itertools.count()
+        self._size = 0
+        self.pushed = {LISTING: 0, ARTICLE: 0}
+        # 因為上限而沒加入的項目數、抓取失敗的項目數；不為 0 表示這次沒有抓完
+        self.dropped = 0
+        self.errors = 0
+
+    @property
+    def complete(self):
+        return self.dropped == 0 and self.errors == 0
+
+    @property
+    def article_limit_reached(self):
+        return self.max_articles is not None and self.pushed[ARTICLE] >= self.max_articles
+
+    def push(self, item: FrontierItem):
+        """ 加入一個項目，重複或超過上限時回傳 False """
+        if item.url in self.seen:
+            return False
+        if (self.max_depth is not None and item.kind == LISTING and item.depth > self.max_depth) \
+                or (self.max_articles is not None and item.kind == ARTICLE
+                    and self.pushed[ARTICLE] >= self.max_articles) \
+                or self._size >= self.max_size:
+            self.dropped += 1
+            return False
+        self.seen.add(item.url)
+        host = urlsplit(item.url).netloc
+        if host not in self._queues:
+            self._queues[host] = []
+        if not self._queues[host]:
+            self._hosts.append(host)
+        heapq.heappush(self._queues[host], ((item.depth, _KIND_ORDER[item.kind]), next(self._counter), item))
+        self._size += 1
+        self.pushed[item.kind] += 1
+        return True
+
+    def pop(self) -> Optional[FrontierItem]:
+        """ 輪流從各網域取出優先順序最高的項目，空了回傳 None """
+        if not self._hosts:
+            return None
+        host = self._hosts.popleft()
+        heap = self._queues[host]
+        _, _, item = heapq.heappop(heap)
+        if heap:
+            self._hosts.append(host)
+        self._size -= 1
+        return item
+
+    def pop_many(self, limit, kind=None):
+        """
+        依序取出最多 limit 個項目；指定 kind 時遇到其他種類就停止
+        (那個項目留在佇列，順序不變)
+        """
+        items = []
+        while len(items) < limit and self._hosts:
+            host = self._hosts[0]
+            if kind is not None and self._queues[host][0][2].kind != kind:
+                break
+            items.append(self.pop())
+        return items
+
+    def peek_kind(self):
+        """ 下一個會取出的項目種類，空了回傳 None """
+        if not self._hosts:
+            return None
+        return self._queues[self._hosts[0]][0][2].kind
+
+    def __len__(self):
+        return self._size
+
+    def report(self):
+        return (f"列表頁 {self.pushed[LISTING]} 頁、文章 {self.pushed[ARTICLE]} 篇，"
+                f"去重網址 {len(self.seen)} 個，超過上限略過 {self.dropped} 個，失敗 {self.errors} 個")
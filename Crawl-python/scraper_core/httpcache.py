@@ -0,0 +1,114 @@
+"""
+HTTP 回應快取 (條件式請求)
+- 記下每個網址的 ETag / Last-Modified，下次請求帶 If-None-Match / If-Modified-Since
+- 伺服器回 304 時直接使用快取內容，呼叫端可依 FetchResult.not_modified 略過解析
+- 內容以 zlib 壓縮存檔，索引放在 SQLite；總容量超過上限時淘汰最久沒用到的項目
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+HTTP_CACHE_DIRNAME = "http_cache"
+
+
+class HttpCache:
+    def __init__(self, directory, max_bytes=200 * 1024 * 1024):
+        """ max_bytes: 壓縮後內容的總容量上限 """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.not_modified = 0
+        self.stored = 0
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(directory, "index.sqlite3"), check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                filename TEXT,
+                size INTEGER,
+                stored_at REAL,
+                accessed_at REAL
+            )
+        """)
+        self.conn.commit()
+
+    def _path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def conditional_headers(self, url):
+        """ 有快取內容時回傳條件式請求的標頭 """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified, filename FROM entries WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None or not os.path.exists(self._path(row[2])):
+            return {}
+        headers = {}
+        if row[0]:
+            headers['If-None-Match'] = row[0]
+        if row[1]:
+            headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def load(self, url):
+        """ 取出快取內容 (伺服器回 304 時使用)，沒有則回傳 None """
+        with self._lock:
+            row = self.conn.execute("SELECT filename FROM entries WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            try:
+                with open(self._path(row[0]), 'rb') as f:
+                    body = zlib.decompress(f.read()).decode('utf-8')
+            except (OSError, zlib.error):
+                return None
+            self.conn.execute("UPDATE entries SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+            self.not_modified += 1
+            return body
+
+    def store(self, url, text, headers):
+        """ 儲存 200 回應；沒有 ETag / Last-Modified 的回應無法重新驗證，不存 """
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        data = zlib.compress(text.encode('utf-8'), 6)
+        filename = hashlib.sha1(url.encode('utf-8')).hexdigest() + ".z"
+        now = time.time()
+        with self._lock:
+            with open(self._path(filename), 'wb') as f:
+                f.write(data)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, filename, len(data), now, now)
+            )
+            self.conn.commit()
+            self.stored += 1
+            self._evict()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self.conn.execute("SELECT url, filename, size FROM entries ORDER BY accessed_at").fetchall()
+        for url, filename, size in rows:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(filename))
+            except OSError:
+                pass
+            self.conn.execute("DELETE FROM entries WHERE url = ?", (url,))
+            total -= size
+        self.conn.commit()
+
+    def report(self):
+        return f"HTTP 快取: 304 未變更 {self.not_modified} 次，新存入 {self.stored} 筆"
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,147 @@
+"""
+執行指標 (計數器、耗時分布)
+- 全行程共用一個 METRICS，各模組直接記錄: 各網域的請求數、狀態碼、下載位元組、重試、延遲分布，
+  流水線各階段的每筆耗時，翻譯請求、Selenium 等待、Excel / Parquet 寫檔時間，快取命中率
+- 延遲分布用固定的對數刻度分桶 (1ms ~ 約 2 分鐘，每格約差 19%)，記憶體固定，可算出近似的 p50 / p90 / p99
+- 指標以 名稱 → {標籤: 值} 保存，標籤通常是網域或「流水線/階段」
+- run_all.py 以環境變數 SCRAPER_METRICS 指定輸出檔，子行程結束時 (write_env_report) 寫出 JSON，
+  最後由 run_all.py 合併成一份報表
+
+用法:
+    METRICS.count("fetch.requests", host)
+    with METRICS.timer("excel.write", "cna"):
+        ...
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# 子行程的指標輸出檔 (由 run_all.py 設定)
+METRICS_ENV = "SCRAPER_METRICS"
+
+# 分桶上限 (秒): 1ms 起每 4 格翻倍，最後一格收其餘
+BUCKETS = [0.001 * 2 ** (i / 4) for i in range(4 * 17 + 1)]
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """ 近似分位數: 落在哪一格就回傳該格上限 (不超過實際最大值) """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return round(min(BUCKETS[i], self.max), 6) if i < len(BUCKETS) else self.max
+        return self.max
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.total, 6),
+            "mean": round(self.total / self.count, 6) if self.count else None,
+            "min": self.min and round(self.min, 6), "max": self.max and round(self.max, 6),
+            "p50": self.quantile(0.5), "p90": self.quantile(0.9), "p99": self.quantile(0.99),
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.histograms = {}
+        self.gauges = {}
+        self.started = time.time()
+
+    def count(self, name, label="", value=1):
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[label] = series.get(label, 0) + value
+
+    def observe(self, name, label, seconds):
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            if label not in series:
+                series[label] = Histogram()
+            series[label].observe(seconds)
+
+    def gauge(self, name, label, value):
+        """ 設定目前值 (例如快取命中率)，重複設定會覆蓋 """
+        with self._lock:
+            self.gauges.setdefault(name, {})[label] = value
+
+    @contextmanager
+    def timer(self, name, label=""):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, label, time.perf_counter() - start)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "elapsed": round(time.time() - self.started, 3),
+                "counters": {name: dict(series) for name, series in self.counters.items()},
+                "histograms": {name: {label: h.to_dict() for label, h in series.items()}
+                               for name, series in self.histograms.items()},
+                "gauges": {name: dict(series) for name, series in self.gauges.items()},
+            }
+
+    def write_json(self, path, **extra):
+        """ 寫出目前的指標 (extra 為額外的頂層欄位) """
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({**extra, **self.snapshot()}, f, ensure_ascii=False, indent=2)
+        return path
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.gauges.clear()
+            self.started = time.time()
+
+
+METRICS = Metrics()
+
+
+def record_cache_stats(http_cache=None, translation_cache=None):
+    """ 把 HTTP 快取與翻譯快取的累計次數記成指標 """
+    if http_cache is not None:
+        METRICS.gauge("http_cache", "not_modified", http_cache.not_modified)
+        METRICS.gauge("http_cache", "stored", http_cache.stored)
+    if translation_cache is not None:
+        cache = translation_cache
+        total = cache.memory_hits + cache.disk_hits + cache.misses
+        METRICS.gauge("translation_cache", "memory_hits", cache.memory_hits)
+        METRICS.gauge("translation_cache", "disk_hits", cache.disk_hits)
+        METRICS.gauge("translation_cache", "misses", cache.misses)
+        METRICS.gauge("translation_cache", "hit_rate",
+                      round((cache.memory_hits + cache.disk_hits) / total, 4) if total else None)
+
+
+def write_env_report(**extra):
+    """ 有設定 SCRAPER_METRICS 時把這個行程的指標寫到該檔案 (給 run_all.py 合併) """
+    path = os.environ.get(METRICS_ENV)
+    if path:
+        METRICS.write_json(path, **extra)
+    return path
@@ -0,0 +1,250 @@
+"""
+跨來源的近似重複文章偵測 (SimHash + LSH 分段索引，SQLite 永久保存)
+- 同一則通訊社稿件常同時出現在 TASS、Interfax、NG，只差幾個字；網址不同，已抓網址索引擋不住
+- 每篇文章的內文算出 64 位元 SimHash，切成 8 段 8 位元當作分桶 (LSH)，
+  任一段完全相同的才拿出來比對漢明距離，距離不超過 6 即視為同一群
+  (400 字的稿件改兩三個詞距離約 4；不相關的文章約 32)
+- 每群只有第一篇 (代表) 送去翻譯，其他篇直接沿用代表的內文譯文；標題很短仍各自翻譯
+- 指紋、分群與代表的譯文存在 SQLite，跨執行、跨來源共用；超過保留天數的指紋會清掉
+- 只比對同一種原文語言 (不同語言的同一則新聞文字不同，SimHash 無法比對)
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+import zlib
+from collections import Counter
+from datetime import datetime, timedelta
+
+NEAR_DUP_DB_FILENAME = "near_duplicates.sqlite3"
+
+# 64 位元指紋切成 8 段，漢明距離 <= 7 時保證至少有一段完全相同
+BANDS = 8
+BAND_BITS = 64 // BANDS
+MAX_DISTANCE = 6
+# 內文太短時指紋不可靠，不參與比對
+MIN_CHARS = 200
+# 指紋保留天數
+RETENTION_DAYS = 14
+# 等待其他流水線翻譯代表文章的秒數，逾時就自己翻
+WAIT_SECONDS = 60
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_WORD_RE = re.compile(r'[^\W\d_]+|\d+')
+_CJK_RE = re.compile(r'[\u3400-\u9fff\uf900-\ufaff]')
+
+
+def _features(text):
+    """ 拼音文字取相鄰兩個詞、中日文取相鄰兩個字當作特徵 """
+    tokens = []
+    for word in _WORD_RE.findall(text.lower()):
+        if _CJK_RE.match(word):
+            tokens.extend(word[i:i + 2] for i in range(max(1, len(word) - 1)))
+        else:
+            tokens.append(word)
+    if len(tokens) < 2:
+        return Counter(tokens)
+    return Counter(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+
+
+# 累加用的欄位寬度: 64 個計數器並排放在一個大整數裡，每個 32 位元
+_FIELD_BITS = 32
+_FIELD_MASK = (1 << _FIELD_BITS) - 1
+# 一個位元組展開成 8 個欄位 (第 i 位元為 1 的欄位放 1)
+_SPREAD = [sum(1 << (i * _FIELD_BITS) for i in range(8) if byte >> i & 1) for byte in range(256)]
+
+
+def _spread(digest):
+    """ 8 位元組的雜湊展開成 64 個欄位，一次加總所有位元，不必逐位元迴圈 """
+    value = 0
+    for k, byte in enumerate(digest):
+        value |= _SPREAD[byte] << (k * 8 * _FIELD_BITS)
+    return value
+
+
+def simhash(text):
+    """ 64 位元 SimHash (無號整數)，文字沒有任何特徵時回傳 None """
+    features = _features(text or "")
+    if not features:
+        return None
+    counts = 0
+    total = 0
+    for feature, weight in features.items():
+        counts += weight * _spread(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest())
+        total += weight
+    # 某個位元為 1 的權重超過一半，指紋的該位元就是 1
+    fingerprint = 0
+    for bit in range(64):
+        if 2 * (counts >> (bit * _FIELD_BITS) & _FIELD_MASK) > total:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def _bands(fingerprint):
+    mask = (1 << BAND_BITS) - 1
+    return [fingerprint >> (i * BAND_BITS) & mask for i in range(BANDS)]
+
+
+def _signed(value):
+    """ SQLite 的 INTEGER 是有號 64 位元 """
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def _unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+class Claim:
+    """ 一篇文章的分群結果；representative 為 None 表示自己是代表 (或沒有指紋)，需要自己翻譯 """
+
+    def __init__(self, index, url, representative=None, event=None, translation=None):
+        self._index = index
+        self.url = url
+        self.representative = representative
+        self._event = event
+        self._translation = translation
+
+    def wait(self, timeout=WAIT_SECONDS):
+        """ 取得代表文章的內文譯文；代表還在翻譯時等待，失敗或逾時回傳 None """
+        if self._translation is None and self._event is not None:
+            self._event.wait(timeout)
+            self._translation = self._index.translation(self.representative)
+        return self._translation
+
+
+class NearDuplicateIndex:
+    def __init__(self, path, max_distance=MAX_DISTANCE, retention_days=RETENTION_DAYS):
+        self.path = path
+        self.max_distance = max_distance
+        self._lock = threading.Lock()
+        # 本次執行中還在翻譯的代表文章 {網址: Event}
+        self._pending = {}
+        self.checked = 0
+        self.duplicates = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS fingerprints (
+                url TEXT PRIMARY KEY,
+                source TEXT,
+                language TEXT,
+                simhash INTEGER,
+                {", ".join(f"b{i} INTEGER" for i in range(BANDS))},
+                representative TEXT,
+                translation BLOB,
+                created_at TEXT
+            )
+        """)
+        for i in range(BANDS):
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_band{i} ON fingerprints (language, b{i})")
+        cutoff = (datetime.now() - timedelta(days=retention_days)).strftime(_TIME_FORMAT)
+        self.conn.execute("DELETE FROM fingerprints WHERE created_at < ?", (cutoff,))
+        self.conn.commit()
+
+    def _find(self, fingerprint, language):
+        """ 找出距離最近 (且不超過門檻) 的已知文章，回傳它所屬群的代表網址 """
+        bands = _bands(fingerprint)
+        condition = " OR ".join(f"b{i} = ?" for i in range(BANDS))
+        rows = self.conn.execute(
+            f"SELECT simhash, representative FROM fingerprints WHERE language IS ? AND ({condition})",
+            (language, *bands)
+        ).fetchall()
+        best = None
+        for value, representative in rows:
+            distance = hamming(fingerprint, _unsigned(value))
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, representative)
+        return best[1] if best else None
+
+    def claim(self, url, text, source=None, language=None) -> Claim:
+        """ 登記一篇文章並分群；同一網址再次登記時沿用原本的分群 """
+        fingerprint = simhash(text) if text and len(text) >= MIN_CHARS else None
+        if fingerprint is None:
+            return Claim(self, url)
+        with self._lock:
+            self.checked += 1
+            row = self.conn.execute("SELECT representative FROM fingerprints WHERE url = ?", (url,)).fetchone()
+            representative = row[0] if row else self._find(fingerprint, language)
+            if representative == url or representative is None:
+                if row is None:
+                    self._insert(url, source, language, fingerprint, url)
+                event = self._pending.setdefault(url, threading.Event())
+                return Claim(self, url, event=event)
+            if row is None:
+                self._insert(url, source, language, fingerprint, representative)
+            self.duplicates += 1
+            event = self._pending.get(representative)
+        translation = self.translation(representative)
+        return Claim(self, url, representative, event=event, translation=translation)
+
+    def _insert(self, url, source, language, fingerprint, representative):
+        self.conn.execute(
+            f"INSERT INTO fingerprints (url, source, language, simhash, {', '.join(f'b{i}' for i in range(BANDS))}, "
+            f"representative, created_at) VALUES (?, ?, ?, ?, {', '.join('?' * BANDS)}, ?, ?)",
+            (url, source, language, _signed(fingerprint), *_bands(fingerprint), representative,
+             datetime.now().strftime(_TIME_FORMAT))
+        )
+        self.conn.commit()
+
+    def resolve(self, claim, translation):
+        """ 代表文章翻譯完成 (失敗時 translation 為 None)，通知等待中的重複文章 """
+        if claim.representative is not None:
+            return
+        with self._lock:
+            if translation:
+                self.conn.execute("UPDATE fingerprints SET translation = ? WHERE url = ?",
+                                  (zlib.compress(translation.encode('utf-8')), claim.url))
+                self.conn.commit()
+            event = self._pending.pop(claim.url, None)
+        if event is not None:
+            event.set()
+
+    def translation(self, url):
+        """ 代表文章已存下的內文譯文，沒有則回傳 None """
+        with self._lock:
+            row = self.conn.execute("SELECT translation FROM fingerprints WHERE url = ?", (url,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return zlib.decompress(row[0]).decode('utf-8')
+
+    def translate_unique(self, translator, articles, source=None, language=None, wait=WAIT_SECONDS):
+        """
+        批次翻譯 [(網址, 標題, 內文)]，回傳 [(標題譯文, 內文譯文)]
+        每群只翻代表的內文，重複文章沿用代表的譯文；代表翻譯失敗或逾時才自己翻
+        """
+        claims = [self.claim(url, content, source, language) for url, _, content in articles]
+        owners = [i for i, claim in enumerate(claims) if claim.representative is None]
+        try:
+            translated = translator.translate_many(
+                [title or "" for _, title, _ in articles] + [articles[i][2] or "" for i in owners]
+            )
+        except Exception:
+            for i in owners:
+                self.resolve(claims[i], None)
+            raise
+        titles = translated[:len(articles)]
+        contents = [None] * len(articles)
+        for k, i in enumerate(owners):
+            contents[i] = translated[len(articles) + k]
+            self.resolve(claims[i], contents[i])
+
+        # 自己的代表都已通知完才等別人的，不會互相等待
+        missing = []
+        for i, claim in enumerate(claims):
+            if claim.representative is not None:
+                contents[i] = claim.wait(wait)
+                if contents[i] is None:
+                    missing.append(i)
+        if missing:
+            for i, text in zip(missing, translator.translate_many([articles[i][2] or "" for i in missing])):
+                contents[i] = text
+        return list(zip(titles, contents))
+
+    def report(self):
+        return f"近似重複: 比對 {self.checked} 篇，其中 {self.duplicates} 篇沿用同群代表的譯文"
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,220 @@
+"""
+共用的 HTML 解析層
+- 優先使用 C 實作的 lxml 解析器，沒安裝時退回 html.parser
+- make_soup(html, selectors) 只建出選擇器會用到的子樹 (SoupStrainer)，其餘節點直接略過
+  取每個選擇器最外層的條件 (例如 '.updatetime span' 的 '.updatetime') 來決定保留哪些子樹，
+  原本的 soup.select / select_one 寫法不用改
+- 選擇器太複雜無法判斷時 (例如 :not()、開頭是 >)，自動退回完整解析
+- embedded_article_body(html) 直接讀頁面內嵌的 JSON (JSON-LD / __NEXT_DATA__) 取內文
+"""
+import importlib.util
+import json
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from .metrics import METRICS
+
+# 只檢查有沒有安裝，真正載入交給 bs4
+DEFAULT_PARSER = 'lxml' if importlib.util.find_spec('lxml') is not None else 'html.parser'
+
+# 最外層條件: 標籤名稱 + 任意個 .class / #id / [attr op "value"]
+_COMPOUND_RE = re.compile(r'^([a-zA-Z][\w-]*|\*)?((?:[.#][\w-]+|\[[^\]]+\])*)$')
+_PART_RE = re.compile(r'[.#][\w-]+|\[[^\]]+\]')
+_ATTR_RE = re.compile(r'^\[\s*([\w-]+)\s*(?:([*^$~|]?=)\s*["\']?(.*?)["\']?\s*)?\]$')
+
+
+class _Condition:
+    """ 單一選擇器最外層的比對條件 """
+
+    def __init__(self, tag, parts):
+        self.tag = None if tag in (None, '*') else tag.lower()
+        self.classes = []
+        self.ident = None
+        self.attrs = []
+        for part in parts:
+            if part.startswith('.'):
+                self.classes.append(part[1:])
+            elif part.startswith('#'):
+                self.ident = part[1:]
+            else:
+                match = _ATTR_RE.match(part)
+                if not match:
+                    raise ValueError(part)
+                self.attrs.append(match.groups())
+
+    def matches(self, name, attrs):
+        if self.tag and name != self.tag:
+            return False
+        if self.classes:
+            classes = _class_list(attrs.get('class'))
+            if not all(c in classes for c in self.classes):
+                return False
+        if self.ident and attrs.get('id') != self.ident:
+            return False
+        for attr, op, value in self.attrs:
+            actual = attrs.get(attr)
+            if actual is None:
+                return False
+            if isinstance(actual, (list, tuple)):
+                actual = " ".join(actual)
+            if not _attr_matches(actual, op, value):
+                return False
+        return True
+
+
+def _class_list(value):
+    if not value:
+        return []
+    if isinstance(value, str):
+        return value.split()
+    return list(value)
+
+
+def _attr_matches(actual, op, value):
+    if op is None:
+        return True
+    if op == '=':
+        return actual == value
+    if op == '*=':
+        return value in actual
+    if op == '^=':
+        return actual.startswith(value)
+    if op == '$=':
+        return actual.endswith(value)
+    if op == '~=':
+        return value in actual.split()
+    if op == '|=':
+        return actual == value or actual.startswith(value + '-')
+    return False
+
+
+def _conditions_for(selectors):
+    """ 把選擇器清單 (可含逗號) 轉成最外層條件；無法判斷時回傳 None """
+    conditions = []
+    for selector in selectors:
+        for alternative in selector.split(','):
+            alternative = alternative.strip()
+            if not alternative:
+                continue
+            head = alternative.split()[0]
+            match = _COMPOUND_RE.match(head)
+            if not match or head in ('>', '+', '~'):
+                return None
+            try:
+                conditions.append(_Condition(match.group(1), _PART_RE.findall(match.group(2))))
+            except ValueError:
+                return None
+    return conditions or None
+
+
+class SelectorStrainer(SoupStrainer):
+    """
+    只保留符合任一條件的最外層元素 (連同整個子樹)
+    同時實作 bs4 4.12 (search_tag) 與 4.13 以後 (allow_tag_creation) 的介面
+    """
+
+    def __init__(self, conditions):
+        # 給一個不會出現的標籤名稱，讓 bs4 知道這是「只挑標籤」的過濾器 (最外層的文字節點會被略過)
+        super().__init__(name='__selector_strainer__')
+        self.conditions = conditions
+
+    def _matches(self, name, attrs):
+        attrs = attrs or {}
+        return any(c.matches(name, attrs) for c in self.conditions)
+
+    # bs4 4.13 以後
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        return self._matches(name, attrs)
+
+    def allow_string_creation(self, string):
+        return False
+
+    # bs4 4.12 以前
+    def search_tag(self, markup_name=None, markup_attrs={}):
+        if isinstance(markup_name, str):
+            return markup_name if self._matches(markup_name, markup_attrs) else None
+        return super().search_tag(markup_name, markup_attrs)
+
+
+def make_strainer(selectors):
+    conditions = _conditions_for(selectors)
+    return SelectorStrainer(conditions) if conditions else None
+
+
+def make_soup(html, selectors=None, parser=None):
+    """
+    解析 HTML；提供 selectors 時只建出這些選擇器需要的子樹
+    例如 make_soup(html, ['.article_title', '.article_content'])
+    """
+    strainer = make_strainer(selectors) if selectors else None
+    parser = parser or DEFAULT_PARSER
+    with METRICS.timer("parse.soup", parser):
+        return BeautifulSoup(html, parser, parse_only=strainer)
+
+
+# ---------- 頁面內嵌的結構化資料 ----------
+
+EMBEDDED_SELECTORS = ['script[type="application/ld+json"]', 'script#__NEXT_DATA__']
+# __NEXT_DATA__ 裡可能放內文的欄位名稱
+_BODY_KEYS = ('articleBody', 'text', 'body', 'content')
+# 太短的字串多半是摘要或按鈕文字，不當作內文
+_MIN_BODY_CHARS = 200
+
+
+def _html_to_text(value):
+    """ 內嵌資料的內文有時是 HTML 片段，轉成以換行分段的純文字 """
+    if '<' not in value:
+        return value.strip()
+    soup = BeautifulSoup(value, DEFAULT_PARSER)
+    paragraphs = [p.get_text().strip() for p in soup.find_all('p')]
+    text = "\n".join(p for p in paragraphs if p)
+    return text or soup.get_text("\n").strip()
+
+
+def _walk_json(data):
+    if isinstance(data, dict):
+        yield data
+        for value in data.values():
+            yield from _walk_json(value)
+    elif isinstance(data, list):
+        for value in data:
+            yield from _walk_json(value)
+
+
+def _longest_body(data):
+    best = ""
+    for node in _walk_json(data):
+        for key in _BODY_KEYS:
+            value = node.get(key)
+            if isinstance(value, str) and len(value) > len(best):
+                best = value
+    return best if len(best) >= _MIN_BODY_CHARS else ""
+
+
+def embedded_article_body(html):
+    """
+    從頁面內嵌的 JSON 取出文章內文，找不到時回傳空字串
+    先看 JSON-LD 的 articleBody (schema.org 標準欄位)，再看 Next.js 的 __NEXT_DATA__
+    """
+    soup = make_soup(html, EMBEDDED_SELECTORS)
+    for script in soup.select(EMBEDDED_SELECTORS[0]):
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            continue
+        for node in _walk_json(data):
+            body = node.get('articleBody')
+            if isinstance(body, str) and body.strip():
+                return _html_to_text(body)
+
+    script = soup.select_one(EMBEDDED_SELECTORS[1])
+    if script is not None:
+        try:
+            data = json.loads(script.string or "")
+        except ValueError:
+            return ""
+        body = _longest_body(data)
+        if body:
+            return _html_to_text(body)
+    return ""
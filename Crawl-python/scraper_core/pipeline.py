@@ -0,0 +1,168 @@
+"""
+串流式的多階段流水線 (抓取 → 解析 → 翻譯 → 寫出)
+- 各階段之間以有界佇列相接，前面的階段太快會被擋住，記憶體不會隨文章數成長
+- 每個階段有自己的執行緒數量，抓取在等網路時，翻譯與寫檔可以同時進行
+- 階段函式回傳 None 代表丟棄該筆 (例如解析失敗)；單筆出錯只會記錄並略過，不會中斷整個流程
+- batch_size > 1 的階段一次收一批資料交給函式 (例如批次翻譯)，函式回傳同樣長度的清單
+- 每次呼叫階段函式的耗時記到 METRICS (stage.latency，標籤為「流水線/階段」，批次階段為整批的耗時)，
+  執行結束時各階段的處理、丟棄、錯誤筆數也一併記下
+"""
+import queue
+import threading
+import time
+
+from .metrics import METRICS
+
+# 佇列結束記號
+_DONE = object()
+
+
+class Stage:
+    def __init__(self, name, func, workers=1, batch_size=1, batch_timeout=0.5):
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_timeout = batch_timeout
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.busy_time = 0.0
+        self._finished_workers = 0
+        self._lock = threading.Lock()
+
+
+class Pipeline:
+    def __init__(self, name="pipeline", maxsize=32):
+        """ maxsize: 每個階段輸入佇列的容量 """
+        self.name = name
+        self.maxsize = maxsize
+        self.stages = []
+        self._stop = threading.Event()
+
+    def add_stage(self, name, func, workers=1, batch_size=1, batch_timeout=0.5):
+        self.stages.append(Stage(name, func, workers, batch_size, batch_timeout))
+        return self
+
+    def stop(self):
+        """ 不再送入新資料；已在流水線中的資料仍會處理完 """
+        self._stop.set()
+
+    @property
+    def stopped(self):
+        return self._stop.is_set()
+
+    @property
+    def errors(self):
+        """ 各階段處理失敗的總筆數 """
+        return sum(stage.errors for stage in self.stages)
+
+    # ---------- 內部 ----------
+
+    def _take_batch(self, stage, inbox):
+        """ 取出一批資料；拿到結束記號時回傳 (batch, True) """
+        first = inbox.get()
+        if first is _DONE:
+            return [], True
+        batch = [first]
+        deadline = time.monotonic() + stage.batch_timeout
+        while len(batch) < stage.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = inbox.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _process(self, stage, batch, is_sink=False):
+        start = time.monotonic()
+        try:
+            if stage.batch_size > 1:
+                results = stage.func(batch)
+            else:
+                results = [stage.func(batch[0])]
+        except Exception as e:
+            print(f"  [{self.name}:{stage.name}] 處理失敗，略過 {len(batch)} 筆: {e}")
+            with stage._lock:
+                stage.errors += len(batch)
+            return []
+        finally:
+            elapsed = time.monotonic() - start
+            with stage._lock:
+                stage.busy_time += elapsed
+            METRICS.observe("stage.latency", f"{self.name}/{stage.name}", elapsed)
+
+        kept = [r for r in results if r is not None]
+        with stage._lock:
+            stage.processed += len(batch)
+            # 最後一個階段 (寫出) 本來就不往下傳，不算丟棄
+            if not is_sink:
+                stage.dropped += len(batch) - len(kept)
+        return kept
+
+    def _worker(self, index, inbox, outbox):
+        stage = self.stages[index]
+        while True:
+            batch, done = self._take_batch(stage, inbox)
+            if batch:
+                for result in self._process(stage, batch, is_sink=outbox is None):
+                    if outbox is not None:
+                        outbox.put(result)
+            if done:
+                break
+
+        # 最後一個結束的執行緒負責通知下一個階段
+        with stage._lock:
+            stage._finished_workers += 1
+            last = stage._finished_workers == stage.workers
+        if last and outbox is not None:
+            for _ in range(self.stages[index + 1].workers):
+                outbox.put(_DONE)
+
+    # ---------- 執行 ----------
+
+    def run(self, items):
+        """ 把 items 逐筆送進第一個階段，等所有階段處理完後回傳 """
+        queues = [queue.Queue(maxsize=self.maxsize) for _ in self.stages]
+        threads = []
+        for i, stage in enumerate(self.stages):
+            outbox = queues[i + 1] if i + 1 < len(self.stages) else None
+            for n in range(stage.workers):
+                t = threading.Thread(target=self._worker, args=(i, queues[i], outbox),
+                                     name=f"{self.name}-{stage.name}-{n}", daemon=True)
+                t.start()
+                threads.append(t)
+
+        try:
+            for item in items:
+                if self.stopped:
+                    break
+                queues[0].put(item)
+        finally:
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_DONE)
+            for t in threads:
+                t.join()
+            self._record_metrics()
+
+    def _record_metrics(self):
+        for stage in self.stages:
+            label = f"{self.name}/{stage.name}"
+            METRICS.count("stage.processed", label, stage.processed)
+            METRICS.count("stage.dropped", label, stage.dropped)
+            METRICS.count("stage.errors", label, stage.errors)
+            METRICS.count("stage.busy_time", label, round(stage.busy_time, 3))
+
+    def report(self):
+        lines = [f"[{self.name}] 各階段統計:"]
+        for stage in self.stages:
+            lines.append(
+                f"  {stage.name:<10} 執行緒 {stage.workers}  處理 {stage.processed}  "
+                f"丟棄 {stage.dropped}  錯誤 {stage.errors}  累計耗時 {stage.busy_time:.1f} 秒"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,146 @@
+"""
+每個網域各自的 token bucket 限速器
+- rate: 每秒補充幾個 token (穩定速率)，burst: 桶子容量 (可瞬間連發幾次)
+- 遇到 429/503 時依 Retry-After 或指數退避暫停該網域，並把速率減半；之後成功再慢慢恢復
+- 同一份狀態同時提供同步 acquire() 與非同步 aacquire()，Selenium、翻譯與 aiohttp 都能共用
+"""
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# 需要退避的狀態碼
+THROTTLE_STATUSES = (429, 503)
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """ 預約一個 token，回傳呼叫端還需要等待的秒數 (0 代表可立即送出) """
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class _DomainState:
+    def __init__(self, rate, burst):
+        self.base_rate = float(rate)
+        self.bucket = TokenBucket(rate, burst)
+        self.failures = 0
+        self.blocked_until = 0.0
+
+
+def parse_retry_after(value):
+    """ Retry-After 可能是秒數或 HTTP 日期，統一轉成秒數；無法解析回傳 None """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class DomainRateLimiter:
+    def __init__(self, rate=1.0, burst=2, domain_limits=None,
+                 base_backoff=2.0, max_backoff=300.0, min_rate_factor=0.125):
+        """
+        rate / burst: 預設每個網域的速率與容量
+        domain_limits: 個別網域設定，例如 {"www.ng.ru": (0.5, 2)}
+        base_backoff / max_backoff: 指數退避的起始與上限秒數
+        min_rate_factor: 被限流時速率最低降到原本的幾分之一
+        """
+        self.rate = rate
+        self.burst = burst
+        self.domain_limits = dict(domain_limits or {})
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.min_rate_factor = min_rate_factor
+        self._domains = {}
+        self._lock = threading.Lock()
+
+    def _state(self, domain):
+        with self._lock:
+            state = self._domains.get(domain)
+            if state is None:
+                rate, burst = self.domain_limits.get(domain, (self.rate, self.burst))
+                state = self._domains[domain] = _DomainState(rate, burst)
+            return state
+
+    def configure(self, domain, rate, burst):
+        """
+        設定 (或更新) 個別網域的速率，共用同一個限速器的多個來源各自註冊
+        已有狀態的網域 (例如同一個行程內再執行一次) 保留退避時間與被減半的速率，只套用新的設定值
+        """
+        with self._lock:
+            self.domain_limits[domain] = (rate, burst)
+            state = self._domains.get(domain)
+            if state is None or (state.base_rate, state.bucket.burst) == (float(rate), float(burst)):
+                return
+            with state.bucket._lock:
+                # 被限流降下來的比例沿用到新的速率
+                state.bucket.rate = float(rate) * state.bucket.rate / state.base_rate
+                state.bucket.burst = float(burst)
+                state.bucket.tokens = min(state.bucket.tokens, state.bucket.burst)
+            state.base_rate = float(rate)
+
+    def reserve(self, domain):
+        state = self._state(domain)
+        wait = state.bucket.reserve()
+        return max(wait, state.blocked_until - time.monotonic())
+
+    def acquire(self, domain):
+        """ 同步等待直到可以對該網域送出請求 """
+        wait = self.reserve(domain)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def aacquire(self, domain):
+        wait = self.reserve(domain)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def on_response(self, domain, status, retry_after=None):
+        """
+        回報請求結果，讓限速器調整速率
+        被限流 (429/503) 時回傳建議的退避秒數，其他情況回傳 None
+        """
+        state = self._state(domain)
+        with self._lock:
+            if status in THROTTLE_STATUSES:
+                state.failures += 1
+                delay = parse_retry_after(retry_after)
+                if delay is None:
+                    delay = self.base_backoff * (2 ** (state.failures - 1))
+                    delay += random.uniform(0, delay / 2)
+                delay = min(delay, self.max_backoff)
+                state.blocked_until = max(state.blocked_until, time.monotonic() + delay)
+                state.bucket.rate = max(state.base_rate * self.min_rate_factor, state.bucket.rate / 2)
+                return delay
+
+            # 成功：清除連續失敗，速率逐步恢復到設定值
+            state.failures = 0
+            state.bucket.rate = min(state.base_rate, state.bucket.rate + state.base_rate * 0.1)
+            return None
+
+    def on_error(self, domain):
+        """ 連線錯誤等同被限流，但沒有 Retry-After 可參考 """
+        return self.on_response(domain, THROTTLE_STATUSES[0])
@@ -0,0 +1,607 @@
+"""
+同一個行程內執行多個新聞來源 (scraper_core.source.NewsSource)
+- 所有來源共用一個 AsyncFetcher (連線池 + 各網域限速 + HTTP 快取)、已抓網址索引、日期水位線、翻譯快取與 Parquet 保存區
+- 早於水位線的文章在列表頁就略過；文章頁才看得到日期的網站，解析後早於水位線的當作不收錄
+- 列表頁與文章由 Frontier 排程: 多頁列表一次同時抓一批，邊翻頁邊把新文章送進流水線，
+  到達日期 (水位線 / --since) 或篇數上限 (--max-articles) 就停止翻頁
+- 每個來源各自一條流水線: 抓取 → 解析 → 整批清理文字 → 批次翻譯 (原文不是中文才有) → 寫出 JSONL
+- 翻譯前先比對近似重複 (scraper_core.neardup)，各來源轉載的同一則稿件只翻譯一次
+- 結束後寫入 Parquet，再依來源設定輸出 JSON / Excel
+- 每篇文章的進度記在工作記錄 (scraper_core.worklog)，中途當掉或逾時後以 --resume 從上次的進度續跑
+- 抓到的列表頁與文章頁原樣存進頁面存檔 (scraper_core.archive)，選擇器失效時以 --reparse 不連網重新解析
+
+單一來源: python "Interfax-Ukraine.py" [輸出資料夾]  (各腳本只是呼叫 run_cli)
+全部來源: python run_all.py --in-process
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .backends import get_backend
+from .excel import write_excel
+from .fetcher import AsyncFetcher
+from .frontier import ARTICLE, LISTING, Frontier, FrontierItem
+from .httpcache import HttpCache, HTTP_CACHE_DIRNAME
+from .metrics import METRICS, record_cache_stats, write_env_report
+from .neardup import NearDuplicateIndex, NEAR_DUP_DB_FILENAME
+from .pipeline import Pipeline
+from .ratelimit import DomainRateLimiter
+from .seen import SeenIndex, SEEN_DB_FILENAME
+from .sink import JsonlWriter, read_jsonl
+from .source import TARGET_LANGUAGE, ArticleJob
+from .textclean import normalize_records
+from .translate import CachedTranslator, TranslationCache, TRANSLATION_CACHE_FILENAME
+from .watermark import WatermarkStore, WATERMARK_DB_FILENAME
+
+# 翻譯請求共用一個限速器 (各來源一起算 Google 的額度)
+TRANSLATE_DOMAIN = "translate.google.com"
+
+
+@dataclass
+class SourceResult:
+    name: str
+    status: str = "ok"
+    articles: int = 0
+    duration: float = 0.0
+    error: Optional[str] = None
+    # 因為上限 (頁數、篇數、max_per_listing) 沒有處理的項目數
+    dropped: int = 0
+
+
+class SourceRunner:
+    def __init__(self, save_dir, per_host=4, timeout=15):
+        self.save_dir = save_dir
+        os.makedirs(save_dir, exist_ok=True)
+        # 目錄頁與文章頁的 HTTP 快取，沒變更的頁面只會收到 304
+        self.fetcher = AsyncFetcher(per_host=per_host, timeout=timeout,
+                                    cache=HttpCache(os.path.join(save_dir, HTTP_CACHE_DIRNAME)))
+        # 跨執行的已抓網址索引，重複執行時略過抓過的文章
+        self.seen = SeenIndex(os.path.join(save_dir, SEEN_DB_FILENAME))
+        # 各來源上次完整抓完時最新一篇的發布時間
+        self.watermarks = WatermarkStore(os.path.join(save_dir, WATERMARK_DB_FILENAME))
+        # 每次執行的列表頁與文章進度，中途停止時可續跑
+        # (工作記錄、Parquet 保存區與頁面存檔到執行時才載入，不算進啟動時間)
+        from .worklog import WorkLog, WORKLOG_DB_FILENAME
+        self.worklog = WorkLog(os.path.join(save_dir, WORKLOG_DB_FILENAME))
+        # 翻譯快取存在輸出資料夾，跨執行、跨來源共用
+        self.translation_cache = TranslationCache(os.path.join(save_dir, TRANSLATION_CACHE_FILENAME))
+        self.translate_limiter = DomainRateLimiter(rate=1.0, burst=3)
+        # 內文指紋索引，跨來源、跨執行找出同一則稿件
+        self.near_duplicates = NearDuplicateIndex(os.path.join(save_dir, NEAR_DUP_DB_FILENAME))
+        from .store import open_store
+        self.store = open_store(save_dir)
+        # 抓到的原始頁面，網站改版後可以重新解析
+        from .archive import open_archive
+        self.archive = open_archive(save_dir)
+        self._translators = {}
+        self._lock = threading.Lock()
+
+    def translator(self, language):
+        """ 每種原文語言一個翻譯器，共用同一份快取與限速器 """
+        with self._lock:
+            if language not in self._translators:
+                self._translators[language] = CachedTranslator(
+                    get_backend(source=language, target=TARGET_LANGUAGE),
+                    self.translation_cache, limiter=self.translate_limiter, limiter_domain=TRANSLATE_DOMAIN)
+            return self._translators[language]
+
+    # ---------- 單一來源 ----------
+
+    def resume_frontier(self, source, frontier, run_id):
+        """
+        續跑: 沒讀完的列表頁與還沒寫出的文章放回 frontier，已讀過的列表頁與已完成的文章不再處理
+        回傳是否有上次的進度
+        """
+        from .worklog import WRITTEN
+        listings = self.worklog.listings(run_id)
+        # 上次因為上限沒處理的部分續跑也不會補上，這次執行同樣不算完整
+        frontier.dropped = self.worklog.dropped(run_id)
+        for url, depth, category, origin, done in listings:
+            if done:
+                frontier.seen.add(url)
+            else:
+                frontier.push(FrontierItem(url, LISTING, depth, category, origin=origin))
+        for url in self.worklog.finished_urls(run_id):
+            frontier.seen.add(url)
+        resumed = []
+        for url, state, depth, category, title, published, record in self.worklog.pending(run_id):
+            if url in self.seen:
+                # 上次已寫出，只是還沒記下進度就停止了
+                resumed.append((url, WRITTEN, None))
+                frontier.seen.add(url)
+                continue
+            job = ArticleJob(url, category, title, published, record=record)
+            frontier.push(FrontierItem(url, ARTICLE, depth, category, job=job))
+        self.worklog.update_many(run_id, resumed)
+        return bool(listings)
+
+    def crawl(self, source, frontier, run_id, cutoff=None, watermark=None, backfill=False, resume=False):
+        """
+        依 frontier 的順序產生還沒抓過、也不早於 cutoff 的文章 (ArticleJob)
+        - 列表頁一次同時抓一批 (最多 fetch_workers 頁)，找到的文章與下一頁再放回 frontier
+        - 同一頁的文章先送進流水線才翻下一頁；流水線滿了時這裡會被擋住，不會一口氣翻完所有頁
+        - 依時間排序的列表讀到舊文章 (或上次水位線那篇) 就不再翻頁
+        列表頁失敗、被 max_per_listing 或 frontier 上限截斷時 frontier.complete 為 False，不能推進水位線
+        backfill: 回補模式，304 未更新的列表頁也要解析 (後面的頁上次可能沒讀)
+        304 未更新的列表頁只有在上一次執行完整結束時才略過；上次被上限截斷、逾時或有文章失敗時
+        改為解析快取的內容，已寫出的文章由已抓網址索引濾掉，沒處理完的才會重新找到
+        列表頁與找到的文章都記到工作記錄 run_id；resume 時從記錄中的進度接著做
+        """
+        from .worklog import DONE
+
+        def push_listing(item):
+            if frontier.push(item):
+                self.worklog.listing(run_id, item.url, item.depth, item.category, item.origin)
+
+        skip_unchanged = not (backfill or resume) and self.worklog.last_status(source.name, run_id) == DONE
+
+        if not (resume and self.resume_frontier(source, frontier, run_id)):
+            for category, url in source.listing_pages():
+                push_listing(FrontierItem(url, LISTING, 0, category, origin=url))
+        old = 0
+        while len(frontier):
+            if frontier.peek_kind() == ARTICLE:
+                yield frontier.pop().job
+                continue
+            pages = frontier.pop_many(source.fetch_workers, kind=LISTING)
+            responses = self.fetcher.fetch_many([page.url for page in pages], headers=source.headers)
+            for page, response in zip(pages, responses):
+                if response.error or response.status not in (200, 304):
+                    frontier.errors += 1
+                else:
+                    self.worklog.listing_done(run_id, page.url)
+                    if self.archive is not None:
+                        self.archive.add(source.name, LISTING, response, page.category)
+                jobs, next_url = source.parse_listing(response, page.category, page.depth, page.origin,
+                                                      skip_unchanged=skip_unchanged)
+                found = []
+                passed_count = 0
+                for job in jobs:
+                    passed = (job.published is not None and cutoff is not None and job.published < cutoff) \
+                        or (watermark is not None and job.url == watermark.url)
+                    if passed:
+                        passed_count += 1
+                        # 依時間排序的列表，後面都是更舊的文章
+                        if source.listing_sorted:
+                            break
+                        continue
+                    if job.url not in frontier.seen and job.url not in self.seen:
+                        found.append(job)
+                old += passed_count
+                if source.max_per_listing is not None and len(found) > source.max_per_listing:
+                    frontier.dropped += len(found) - source.max_per_listing
+                    found = found[:source.max_per_listing]
+                self.worklog.discovered(run_id, found, page.depth)
+                for job in found:
+                    frontier.push(FrontierItem(job.url, ARTICLE, page.depth, page.category, job=job))
+                # 已經讀到日期上限 (排序的列表遇到一篇、未排序的整頁都是) 或空白頁就不再翻頁
+                reached = passed_count and (source.listing_sorted or passed_count == len(jobs))
+                if next_url and jobs and not reached and frontier.article_limit_reached:
+                    # 篇數已達上限，後面的頁沒有讀
+                    frontier.dropped += 1
+                elif next_url and jobs and not reached:
+                    push_listing(FrontierItem(next_url, LISTING, page.depth + 1, page.category,
+                                              origin=page.origin))
+        message = frontier.report()
+        if old:
+            message += f"；早於 {cutoff:%Y-%m-%d %H:%M} 或已處理 {old} 篇 (未下載)"
+        source.log(message)
+
+    def translate_batch(self, source, records, run_id=None):
+        """
+        標題與內文一起批次翻譯 (長文依句子切塊，不截斷)；近似重複的內文沿用同群代表的譯文
+        續跑時上次已翻譯的記錄 (已有中文欄位) 不再翻譯
+        翻譯失敗 (例如被限流) 時丟出例外，流水線記為錯誤，這批文章停在 parsed，以 --resume 重試
+        """
+        from .worklog import TRANSLATED
+        pending = [r for r in records if not (r.get('title_zh') or r.get('content_zh'))]
+        if not pending:
+            return records
+        source.log(f"正在批次翻譯 {len(pending)} 篇文章...")
+        translated = self.near_duplicates.translate_unique(
+            self.translator(source.language),
+            [(r['url'], r.get('title'), r.get('content')) for r in pending],
+            source=source.name, language=source.language,
+        )
+        for record, (title_zh, content_zh) in zip(pending, translated):
+            record['title_zh'] = title_zh
+            record['content_zh'] = content_zh
+        if run_id is not None:
+            self.worklog.update_many(run_id, [(r['url'], TRANSLATED, r) for r in pending])
+        return records
+
+    def build_pipeline(self, source, writer, run_id, cutoff=None, newest=None):
+        """
+        cutoff: 早於這個時間的文章不收錄；newest: 記錄寫出文章中最新的 [發布時間, 網址]
+        每篇文章的進度 (已下載、已解析、已翻譯、已寫出) 記到工作記錄 run_id
+        """
+        from .worklog import FETCHED, PARSED, SKIPPED, WRITTEN
+        self.fetcher.limiter.configure(source.host, source.rate, source.burst)
+        pipeline = Pipeline(source.name, maxsize=source.queue_size)
+        rejects = 0
+        lock = threading.Lock()
+        # 每篇文章開始抓取的時間，寫出時算出整篇的處理時間 (article.latency)
+        started = {}
+
+        def fetch(job):
+            # 已決定停止時，佇列中剩下的網址不再抓取
+            if pipeline.stopped:
+                return None
+            started[job.url] = time.monotonic()
+            if job.record is not None:
+                # 續跑: 上次已解析過，不必重新下載
+                return None, job
+            try:
+                response = self.fetcher.fetch(job.url, headers=source.headers)
+            except Exception:
+                forget(job.url)
+                raise
+            if response.ok or response.not_modified:
+                self.worklog.update(run_id, job.url, FETCHED)
+                if self.archive is not None:
+                    self.archive.add(source.name, ARTICLE, response, job.category, job.title, job.published)
+            return response, job
+
+        def forget(url):
+            # 文章在途中被丟棄或出錯，不會寫出，移除開始時間 (常駐執行時才不會越積越多)
+            started.pop(url, None)
+
+        def tracked(func):
+            """ 包裝批次階段：整批出錯或回傳 None 的文章移除開始時間 """
+            def run(batch):
+                try:
+                    results = func(batch)
+                except Exception:
+                    for record in batch:
+                        forget(record['url'])
+                    raise
+                for record, result in zip(batch, results):
+                    if result is None:
+                        forget(record['url'])
+                return results
+            return run
+
+        def parse(pair):
+            try:
+                record = check(pair)
+            except Exception:
+                forget(pair[1].url)
+                raise
+            if record is None:
+                forget(pair[1].url)
+            return record
+
+        def check(pair):
+            nonlocal rejects
+            response, job = pair
+            if response is None:
+                return job.record
+            record = source.parse_article(response, job)
+            if record is None:
+                return None
+            published = job.published or source.parse_date(record.get('published'))
+            if cutoff is not None and published is not None and published < cutoff:
+                source.log(f"早於 {cutoff:%Y-%m-%d %H:%M} ({record.get('published')})，跳過。")
+                accepted = False
+            else:
+                accepted = source.accept(record)
+            if accepted:
+                if newest is not None and published is not None:
+                    with lock:
+                        if newest[0] is None or published > newest[0]:
+                            newest[:] = [published, record['url']]
+                with lock:
+                    rejects = 0
+                self.worklog.update(run_id, job.url, PARSED, record, published)
+                return record
+            # 不收錄的文章只要成功讀到頁面也記錄，下次不必再抓
+            self.seen.mark(job.url, source=source.name)
+            self.worklog.update(run_id, job.url, SKIPPED)
+            with lock:
+                rejects += 1
+                stop = source.stop_after_rejects is not None and rejects >= source.stop_after_rejects
+            if stop and not pipeline.stopped:
+                source.log(f"連續 {rejects} 篇不收錄，停止送出新文章。")
+                pipeline.stop()
+            return None
+
+        def write(record):
+            begin = started.pop(record['url'], None)
+            writer.write(source.to_output(record))
+            self.seen.mark(record['url'], record.get('content'), source=source.name)
+            self.worklog.update(run_id, record['url'], WRITTEN)
+            if begin is not None:
+                METRICS.observe("article.latency", source.name, time.monotonic() - begin)
+
+        pipeline.add_stage("fetch", fetch, workers=source.fetch_workers)
+        # 需要依完成順序判斷是否停止時，只用一個解析執行緒
+        pipeline.add_stage("parse", parse, workers=1 if source.stop_after_rejects else 2)
+        # 整批以 pandas 整欄清理 (控制字元、空白、來源自訂的欄位)
+        pipeline.add_stage("normalize", tracked(lambda batch: normalize_records(batch, source.normalize_frame)),
+                           batch_size=32)
+        if source.translate:
+            pipeline.add_stage("translate", tracked(lambda batch: self.translate_batch(source, batch, run_id)),
+                               workers=2, batch_size=8)
+        pipeline.add_stage("write", write)
+        return pipeline
+
+    def start_run(self, source, resume=False, since=None, pages=None, max_articles=None):
+        """
+        在工作記錄開始一次執行；resume 時改為接續該來源上次未完成的執行 (沒指定的參數沿用上次的)
+        回傳 (run_id, since, pages, max_articles, 是否續跑)
+        """
+        previous = self.worklog.resumable(source.name) if resume else None
+        if previous is None:
+            if resume:
+                source.log("沒有未完成的執行，重新開始。")
+            options = {"since": since.strftime('%Y-%m-%d') if since else None,
+                       "pages": pages, "max_articles": max_articles}
+            return self.worklog.start(source.name, options), since, pages, max_articles, False
+        run_id, options = previous
+        self.worklog.reopen(run_id)
+        progress = "、".join(f"{state} {n}" for state, n in self.worklog.counts(run_id).items())
+        source.log(f"續跑第 {run_id} 次執行 ({progress or '尚未找到文章'})")
+        if since is None and options.get("since"):
+            since = datetime.strptime(options["since"], '%Y-%m-%d')
+        return run_id, since, pages or options.get("pages"), max_articles or options.get("max_articles"), True
+
+    def run(self, source, time_limit=None, since=None, pages=None, max_articles=None, resume=False) -> SourceResult:
+        """
+        time_limit: 秒數，時間到就不再送出新文章 (已在流水線中的會處理完)
+        since: 回補模式，抓到這個時間為止 (不看水位線)；pages: 每個分類最多讀幾頁 (預設 source.pages_to_scrape)
+        max_articles: 這次最多送出幾篇文章
+        resume: 接續上次中途停止的執行 (工作記錄中的進度)
+        """
+        from .worklog import DONE
+        result = SourceResult(source.name)
+        start = time.monotonic()
+        run_id, since, pages, max_articles, resumed = self.start_run(source, resume, since, pages, max_articles)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M')
+        stem = os.path.join(self.save_dir, source.output_stem(timestamp))
+        # 每完成一篇就寫入 JSONL，中途當掉也保留已完成的文章
+        writer = JsonlWriter(stem + ".jsonl")
+        timer = None
+        watermark = None if since else self.watermarks.get(source.name)
+        cutoff = source.cutoff(watermark)
+        if since is not None:
+            cutoff = max(cutoff, since) if cutoff else since
+        frontier = Frontier(max_depth=(pages or source.pages_to_scrape) - 1, max_articles=max_articles)
+        newest = [None, None]
+        complete = False
+        retry = True
+        try:
+            pipeline = self.build_pipeline(source, writer, run_id, cutoff, newest)
+            if time_limit is not None:
+                timer = threading.Timer(time_limit, pipeline.stop)
+                timer.daemon = True
+                timer.start()
+            pipeline.run(self.crawl(source, frontier, run_id, cutoff, watermark,
+                                    backfill=since is not None, resume=resumed))
+            print(pipeline.report())
+            if timer is not None and timer.finished.is_set() and pipeline.stopped:
+                result.status = "timeout"
+            # 有階段處理失敗 (例如翻譯被限流) 的文章還沒寫出，也要能續跑
+            complete = frontier.complete and result.status == "ok" and not pipeline.errors
+            # 只是被上限截斷時續跑也沒有東西可做
+            retry = result.status != "ok" or frontier.errors > 0 or pipeline.errors > 0
+            if resumed:
+                # 前幾次已寫出的文章也算在這次執行內
+                earlier = self.worklog.newest(run_id)
+                if earlier is not None and (newest[0] is None or earlier[0] > newest[0]):
+                    newest[:] = earlier
+            # 有文章沒抓完 (逾時、截斷) 時不推進，下次仍會檢查這段時間的文章
+            if complete and newest[0] is not None:
+                if self.watermarks.advance(source.name, *newest):
+                    source.log(f"水位線更新為 {newest[0]:%Y-%m-%d %H:%M}")
+        except Exception as e:
+            result.status = "failed"
+            result.error = f"{type(e).__name__}: {e}"
+            source.log(f"執行失敗: {result.error}")
+        finally:
+            if timer is not None:
+                timer.cancel()
+            writer.close()
+            # 沒有完整結束的執行保留進度，可用 --resume 續跑
+            self.worklog.finish(run_id, DONE if complete else
+                                (result.status if result.status != "ok" else "incomplete"), frontier.dropped)
+            if not complete and retry:
+                source.log("這次執行沒有完整結束，可加上 --resume 從目前的進度續跑")
+
+        result.articles = writer.count
+        result.dropped = frontier.dropped
+        self.finish(source, writer, stem)
+        result.duration = time.monotonic() - start
+        METRICS.count("source.articles", source.name, result.articles)
+        METRICS.gauge("source.duration", source.name, round(result.duration, 3))
+        METRICS.gauge("source.status", source.name, result.status)
+        print(f"\n[{source.name}] 任務完成！共抓取 {writer.count} 篇新聞。")
+        return result
+
+    def finish(self, source, writer, stem):
+        """ 這次寫入的記錄存進 Parquet，再輸出 JSON / Excel """
+        run_id = None
+        if writer.count and self.store is not None:
+            run_id = self.store.save_run(source.name, list(read_jsonl(writer.path, writer.start_offset)),
+                                         source.fields, language=source.language)
+
+        if os.path.getsize(writer.path) == 0:
+            os.remove(writer.path)
+            return
+        if not source.daily_file and not writer.count:
+            # 同一分鐘內的前一次執行 (例如中途停止後馬上續跑) 已寫入同一個檔案時保留
+            if writer.start_offset == 0:
+                os.remove(writer.path)
+            return
+
+        if source.write_json:
+            # 當日檔案累積了今天每次執行的結果，輸出檔包含今天全部新聞
+            with open(stem + ".json", 'w', encoding='utf-8') as f:
+                json.dump(list(read_jsonl(writer.path)), f, ensure_ascii=False, indent=4)
+
+        from .store import excel_enabled
+        if excel_enabled() and source.excel_columns:
+            count = write_excel(stem + ".xlsx", source.sheet_name, source.excel_columns,
+                                self.export_rows(source, writer, run_id))
+            print(f"Excel 已儲存: {stem}.xlsx ({count} 篇)")
+
+    def export_rows(self, source, writer, run_id):
+        """ Excel 的資料來源: 有 Parquet 時從保存區串流讀回，否則讀 JSONL """
+        from .store import from_common_record
+        if self.store is None:
+            offset = 0 if source.daily_file else writer.start_offset
+            yield from read_jsonl(writer.path, offset)
+            return
+        if source.daily_file:
+            today = datetime.now().strftime('%Y-%m-%d')
+            records = self.store.iter_records(source.name, start=today, end=today)
+        else:
+            records = self.store.iter_records(source.name, run_id=run_id)
+        urls = set()
+        for record in records:
+            if record['url'] in urls:
+                continue
+            urls.add(record['url'])
+            yield from_common_record(record, source.fields)
+
+    # ---------- 重新解析 ----------
+
+    def reparse(self, source, since=None, until=None, workers=None, translate=True) -> SourceResult:
+        """
+        以來源現行的解析規則重新解析頁面存檔中的文章 (不連網)，例如修正失效的選擇器之後補回資料
+        since / until: 只處理這段時間下載的文章；workers: 平行解析的行程數 (預設 CPU 核心數)
+        解析後照常整理、翻譯 (內容沒變的譯文直接從翻譯快取取得) 並寫出 <prefix>_reparse_<時間>.jsonl，
+        翻譯時也寫入 Parquet (下載時間沿用原本的，合併分區時取代同一網址的舊記錄)
+        不看水位線、accept 與已抓網址索引，也不記到工作記錄
+        """
+        from .archive import reparse
+        from .store import excel_enabled
+        result = SourceResult(source.name)
+        start = time.monotonic()
+        if self.archive is None:
+            result.status = "failed"
+            result.error = "頁面存檔已關閉 (SCRAPER_ARCHIVE=0)"
+            source.log(result.error)
+            return result
+        stem = os.path.join(self.save_dir, f"{source.file_prefix}_reparse_{datetime.now():%Y%m%d_%H%M}")
+        writer = JsonlWriter(stem + ".jsonl")
+        translate = translate and source.translate
+        failed = 0
+
+        def records():
+            nonlocal failed
+            for url, record in reparse(self.archive, source, since, until, workers):
+                if record is None:
+                    failed += 1
+                else:
+                    yield record
+
+        pipeline = Pipeline(f"{source.name}-reparse", maxsize=source.queue_size)
+        pipeline.add_stage("normalize", lambda batch: normalize_records(batch, source.normalize_frame),
+                           batch_size=32)
+        if translate:
+            pipeline.add_stage("translate", lambda batch: self.translate_batch(source, batch),
+                               workers=2, batch_size=8)
+        pipeline.add_stage("write", lambda record: writer.write(source.to_output(record)))
+        try:
+            pipeline.run(records())
+            print(pipeline.report())
+        except Exception as e:
+            result.status = "failed"
+            result.error = f"{type(e).__name__}: {e}"
+            source.log(f"重新解析失敗: {result.error}")
+        finally:
+            writer.close()
+        source.log(f"重新解析 {writer.count + failed} 篇存檔，成功 {writer.count} 篇、解析失敗 {failed} 篇")
+
+        result.articles = writer.count
+        if not writer.count:
+            if writer.start_offset == 0:
+                os.remove(writer.path)
+        else:
+            if translate and self.store is not None:
+                self.store.save_run(source.name, list(read_jsonl(writer.path, writer.start_offset)), source.fields,
+                                    language=source.language)
+            if excel_enabled() and source.excel_columns:
+                count = write_excel(stem + ".xlsx", source.sheet_name, source.excel_columns,
+                                    read_jsonl(writer.path, writer.start_offset))
+                print(f"Excel 已儲存: {stem}.xlsx ({count} 篇)")
+        result.duration = time.monotonic() - start
+        return result
+
+    # ---------- 多個來源 ----------
+
+    def run_many(self, sources, workers=None, time_limit=None, **options):
+        """
+        多個來源同時執行 (各自一條流水線，共用連線池與快取)；workers 限制同時執行的來源數
+        options 原樣傳給 run() (since / pages / max_articles / resume)
+        """
+        sources = list(sources)
+        with ThreadPoolExecutor(max_workers=max(1, workers or len(sources))) as pool:
+            return list(pool.map(lambda source: self.run(source, time_limit, **options), sources))
+
+    def close(self):
+        record_cache_stats(self.fetcher.cache, self.translation_cache)
+        METRICS.gauge("near_duplicates", "checked", self.near_duplicates.checked)
+        METRICS.gauge("near_duplicates", "duplicates", self.near_duplicates.duplicates)
+        self.fetcher.close()
+        print(self.fetcher.cache.report())
+        self.fetcher.cache.close()
+        self.seen.close()
+        self.watermarks.close()
+        self.worklog.close()
+        print(self.near_duplicates.report())
+        self.near_duplicates.close()
+        if self.archive is not None:
+            self.archive.close()
+        print(self.translation_cache.report())
+        for translator in self._translators.values():
+            translator.close()
+        self.translation_cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_cli(source):
+    """
+    各來源腳本的進入點: python <腳本> [輸出資料夾] [--since 2024-05-01] [--pages 20] [--max-articles 500] [--resume]
+    回補一段時間的舊新聞: --since 指定日期並把 --pages 調大，翻頁到該日期為止
+    中途停止 (當掉、逾時、被限流) 後加上 --resume，從上次的進度續跑
+    選擇器失效修好後: --reparse [--since 2024-05-01] [--until 2024-05-31] 從頁面存檔重新解析那段時間下載的文章
+    """
+    parser = argparse.ArgumentParser(description=f"{source.label} 爬蟲")
+    parser.add_argument('save_dir', nargs='?', default=".", help='輸出資料夾')
+    parser.add_argument('--since', type=lambda s: datetime.strptime(s, '%Y-%m-%d'),
+                        help='回補到這一天為止 (YYYY-MM-DD)，不看水位線')
+    parser.add_argument('--pages', type=int, help=f'每個分類最多讀幾頁列表 (預設 {source.pages_to_scrape})')
+    parser.add_argument('--max-articles', type=int, help='最多抓幾篇文章')
+    parser.add_argument('--resume', action='store_true', help='接續上次沒有完整結束的執行')
+    parser.add_argument('--reparse', action='store_true', help='不連網，從頁面存檔重新解析 (--since 起下載的) 文章')
+    parser.add_argument('--until', type=lambda s: datetime.strptime(s, '%Y-%m-%d'),
+                        help='--reparse 時只處理到這一天 (含) 下載的文章')
+    parser.add_argument('--workers', type=int, help='--reparse 時平行解析的行程數 (預設 CPU 核心數)')
+    parser.add_argument('--no-translate', action='store_true', help='--reparse 時不翻譯 (也不寫入 Parquet)')
+    args = parser.parse_args()
+
+    print(f"=== {source.label} 爬蟲啟動 ===")
+    with SourceRunner(args.save_dir) as runner:
+        if args.reparse:
+            until = args.until + timedelta(days=1, seconds=-1) if args.until else None
+            result = runner.reparse(source, args.since, until, args.workers, translate=not args.no_translate)
+        else:
+            result = runner.run(source, since=args.since, pages=args.pages, max_articles=args.max_articles,
+                                resume=args.resume)
+    # 由 run_all.py 執行時把指標寫到它指定的檔案
+    write_env_report(script=source.name, results=[asdict(result)])
+    if result.status == "failed":
+        sys.exit(1)
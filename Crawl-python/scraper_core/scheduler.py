@@ -0,0 +1,281 @@
+"""
+常駐排程 (run_all.py --daemon)
+- 行程常駐，連線池、翻譯快取、已抓網址索引與瀏覽器在多次執行之間保持開啟，不必每次冷啟動
+- 每個工作 (來源) 各自的輪詢間隔，例如中央社 5 分鐘、獨立報 1 小時；
+  排定時間加上隨機抖動 (預設 ±10%)，各來源不會固定擠在同一時刻
+- 同一個工作上一次還沒跑完就不會再啟動 (不重疊)；同一個資料夾只能有一個常駐排程 (鎖定檔)
+- 依實際出現新文章的速度調整間隔: 以指數移動平均估計每秒新增幾篇，間隔取「每次約抓到 target 篇」，
+  限制在工作的最短 / 最長間隔之間；一直沒有新文章時平均值遞減，間隔逐次拉長；
+  被上限截斷 (還有文章沒抓) 時間隔直接減半
+- 執行失敗時依連續失敗次數加倍延後 (不超過最長間隔)，並呼叫 reset 重建常駐的資源 (例如當掉的瀏覽器)
+- 各工作的間隔、估計速度與下次執行時間存在 SQLite，重新啟動後沿用學到的間隔
+
+查看: python -m scraper_core.scheduler <資料夾> report
+"""
+import argparse
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+from .metrics import METRICS
+
+SCHEDULER_DB_FILENAME = "scheduler.sqlite3"
+LOCK_FILENAME = "scheduler.lock"
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        name TEXT PRIMARY KEY,
+        interval REAL,
+        rate REAL,
+        next_run REAL,
+        last_started REAL,
+        last_articles INTEGER,
+        runs INTEGER,
+        failures INTEGER,
+        updated_at TEXT
+    )
+"""
+
+
+@dataclass
+class JobResult:
+    """ 一次執行的結果: 新文章篇數、是否被上限截斷 (還有文章沒抓) """
+    articles: int = 0
+    truncated: bool = False
+    status: str = "ok"
+
+
+@dataclass
+class Job:
+    name: str
+    # 執行一次，回傳 JobResult；丟出例外或 status 為 failed 時算失敗
+    run: Callable[[], JobResult]
+    # 輪詢間隔 (秒)，會依新文章出現的速度在 [min_interval, max_interval] 之間調整
+    interval: float = 1800
+    min_interval: float = 300
+    max_interval: float = 6 * 3600
+    # 失敗後重建常駐資源 (可省略)
+    reset: Optional[Callable[[], None]] = None
+
+
+@dataclass
+class JobState:
+    interval: float
+    # 估計的新文章速度 (篇/秒)，還沒有估計時為 None
+    rate: Optional[float] = None
+    next_run: float = 0.0
+    last_started: Optional[float] = None
+    last_articles: int = 0
+    runs: int = 0
+    failures: int = 0
+    running: bool = False
+
+
+def adapt_interval(job, state, articles, window, truncated, target, smoothing=0.3):
+    """
+    依這次抓到的篇數調整間隔；window 為這次涵蓋的時間 (距離上次開始執行的秒數，未知時為 None)
+    回傳新的間隔，並更新 state.rate
+    """
+    if window:
+        sample = articles / window
+        state.rate = sample if state.rate is None else smoothing * sample + (1 - smoothing) * state.rate
+    if truncated:
+        interval = state.interval / 2
+    elif state.rate:
+        interval = target / state.rate
+    elif state.rate is not None:
+        # 一直沒有新文章
+        interval = state.interval * 1.5
+    else:
+        interval = state.interval
+    return min(max(interval, job.min_interval), job.max_interval)
+
+
+class Scheduler:
+    def __init__(self, directory, jobs, workers=None, jitter=0.1, target_articles=5, on_finish=None):
+        """
+        jobs: Job 清單；workers: 最多同時執行幾個工作 (預設全部)
+        jitter: 排定時間的隨機抖動比例；target_articles: 調整間隔時希望每次抓到的篇數
+        on_finish(名稱, JobResult 或 None): 每次執行結束後呼叫 (例如寫出指標)
+        """
+        self.directory = directory
+        self.jobs = {job.name: job for job in jobs}
+        self.workers = workers or len(self.jobs) or 1
+        self.jitter = jitter
+        self.target_articles = target_articles
+        self.on_finish = on_finish
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._rng = random.Random()
+        self.conn = sqlite3.connect(os.path.join(directory, SCHEDULER_DB_FILENAME), check_same_thread=False)
+        self.conn.execute(_SCHEMA)
+        self.conn.commit()
+        self.states = {name: self._load(job) for name, job in self.jobs.items()}
+
+    def _load(self, job):
+        row = self.conn.execute(
+            "SELECT interval, rate, next_run, last_started, last_articles, runs, failures FROM jobs WHERE name = ?",
+            (job.name,)).fetchone()
+        if row is None:
+            # 第一次執行: 全部馬上開始
+            return JobState(job.interval, next_run=time.time())
+        interval, rate, next_run, last_started, last_articles, runs, failures = row
+        interval = min(max(interval, job.min_interval), job.max_interval)
+        return JobState(interval, rate, next_run, last_started, last_articles, runs, failures)
+
+    def _save(self, name, state):
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (name, state.interval, state.rate, state.next_run, state.last_started, state.last_articles,
+                 state.runs, state.failures, datetime.now().strftime(_TIME_FORMAT)))
+            self.conn.commit()
+
+    def _delay(self, seconds):
+        return seconds * (1 + self._rng.uniform(-self.jitter, self.jitter))
+
+    # ---------- 執行 ----------
+
+    def _execute(self, name):
+        job, state = self.jobs[name], self.states[name]
+        started = time.time()
+        window = started - state.last_started if state.last_started else None
+        result = None
+        delay = state.interval
+        try:
+            result = job.run()
+            if result.status == "failed":
+                raise RuntimeError("執行失敗")
+        except Exception as e:
+            state.failures += 1
+            delay = min(state.interval * 2 ** state.failures, job.max_interval)
+            print(f"[排程] {name} 失敗 ({type(e).__name__}: {e})，{delay / 60:.0f} 分鐘後重試")
+            METRICS.count("scheduler.failures", name)
+            if job.reset is not None:
+                try:
+                    job.reset()
+                except Exception as reset_error:
+                    print(f"[排程] {name} 重建資源失敗: {reset_error}")
+        else:
+            state.failures = 0
+            state.last_started = started
+            state.last_articles = result.articles
+            state.interval = adapt_interval(job, state, result.articles, window, result.truncated,
+                                            self.target_articles)
+            delay = state.interval
+            print(f"[排程] {name} 完成: {result.articles} 篇 ({result.status})，"
+                  f"下次間隔 {state.interval / 60:.1f} 分鐘")
+        finally:
+            state.runs += 1
+            state.next_run = time.time() + self._delay(delay)
+            state.running = False
+            self._save(name, state)
+            METRICS.count("scheduler.runs", name)
+            METRICS.gauge("scheduler.interval", name, round(state.interval, 1))
+            METRICS.observe("scheduler.run", name, time.time() - started)
+            if self.on_finish is not None:
+                self.on_finish(name, result)
+            self._wake.set()
+
+    def run(self):
+        """ 持續排程直到 stop() (或 Ctrl+C)；結束時等執行中的工作完成 """
+        print(f"[排程] 常駐執行 {len(self.jobs)} 個工作: "
+              + "、".join(f"{name} 每 {state.interval / 60:.0f} 分" for name, state in self.states.items()))
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scheduler") as pool:
+            try:
+                while not self._stop.is_set():
+                    now = time.time()
+                    running = sum(state.running for state in self.states.values())
+                    due = sorted((state.next_run, name) for name, state in self.states.items()
+                                 if not state.running and state.next_run <= now)
+                    for _, name in due[:max(0, self.workers - running)]:
+                        self.states[name].running = True
+                        pool.submit(self._execute, name)
+                    # 等到下一個工作排定的時間，或有工作結束 (空出名額) 時被喚醒
+                    waiting = [state.next_run for state in self.states.values()
+                               if not state.running and state.next_run > now]
+                    self._wake.wait(timeout=min(min(waiting) - now, 60) if waiting else 60)
+                    self._wake.clear()
+            except KeyboardInterrupt:
+                print("[排程] 收到中斷，等待執行中的工作完成...")
+            finally:
+                self._stop.set()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def report(self):
+        with self._lock:
+            return report(self.conn)
+
+    def close(self):
+        self.conn.close()
+
+
+def report(conn):
+    lines = [f"{'工作':<20}{'間隔(分)':>9}{'篇/小時':>9}{'上次篇數':>9}{'次數':>7}{'連續失敗':>9}  下次執行"]
+    for name, interval, rate, next_run, last_articles, runs, failures in conn.execute(
+            "SELECT name, interval, rate, next_run, last_articles, runs, failures FROM jobs ORDER BY name"):
+        per_hour = "-" if rate is None else f"{rate * 3600:.1f}"
+        lines.append(f"{name:<20}{interval / 60:>9.1f}{per_hour:>9}{last_articles:>9}{runs:>7}{failures:>9}  "
+                     f"{datetime.fromtimestamp(next_run):%Y-%m-%d %H:%M:%S}")
+    return "\n".join(lines)
+
+
+class DirectoryLock:
+    """ 同一個資料夾只允許一個常駐排程: 鎖住 scheduler.lock，行程結束 (包含當掉) 時系統自動釋放 """
+
+    def __init__(self, directory):
+        self.path = os.path.join(directory, LOCK_FILENAME)
+        self._file = None
+
+    def acquire(self):
+        """ 拿到鎖回傳 True，已有其他排程在執行時回傳 False """
+        f = open(self.path, 'a+')
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        f.seek(0)
+        f.truncate()
+        f.write(str(os.getpid()))
+        f.flush()
+        self._file = f
+        return True
+
+    def release(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查看常駐排程的狀態")
+    parser.add_argument("save_dir", help="爬蟲的輸出資料夾")
+    parser.add_argument("action", choices=["report"])
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(os.path.join(args.save_dir, SCHEDULER_DB_FILENAME))
+    conn.execute(_SCHEMA)
+    print(report(conn))
+    conn.close()
+
+
+if __name__ == '__main__':
+    main()
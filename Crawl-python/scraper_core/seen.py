@@ -0,0 +1,69 @@
+"""
+跨執行保存的「已抓過網址」索引 (SQLite)
+- 每筆記錄網址、來源、內文雜湊與抓取時間
+- 爬蟲在抓文章前先用 filter_new() 過濾，重複執行時只抓新文章
+"""
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from urllib.parse import urldefrag
+
+SEEN_DB_FILENAME = "seen_urls.sqlite3"
+
+
+def normalize_url(url):
+    """ 去掉 #fragment 與前後空白，避免同一篇文章被當成不同網址 """
+    return urldefrag(url.strip())[0]
+
+
+def content_hash(text):
+    if not text:
+        return None
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class SeenIndex:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen_urls (
+                url TEXT PRIMARY KEY,
+                source TEXT,
+                content_hash TEXT,
+                scraped_at TEXT
+            )
+        """)
+        self.conn.commit()
+
+    def __contains__(self, url):
+        with self._lock:
+            row = self.conn.execute("SELECT 1 FROM seen_urls WHERE url = ?", (normalize_url(url),)).fetchone()
+        return row is not None
+
+    def filter_new(self, urls):
+        """ 回傳尚未抓過的網址 (保留原順序並去除重複) """
+        urls = list(dict.fromkeys(normalize_url(u) for u in urls))
+        seen = set()
+        with self._lock:
+            # SQLite 參數數量有上限，分批查詢
+            for i in range(0, len(urls), 500):
+                chunk = urls[i:i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = self.conn.execute(f"SELECT url FROM seen_urls WHERE url IN ({marks})", chunk)
+                seen.update(row[0] for row in rows)
+        return [u for u in urls if u not in seen]
+
+    def mark(self, url, content=None, source=None):
+        """ 記錄一篇已處理的文章 (content 用來計算內文雜湊，可省略) """
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO seen_urls (url, source, content_hash, scraped_at) VALUES (?, ?, ?, ?)",
+                (normalize_url(url), source, content_hash(content), datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            )
+            self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,44 @@
+"""
+逐筆寫出的 JSON Lines 檔
+每完成一篇就寫一行並 flush，程式中途當掉也保留已完成的資料
+"""
+import json
+import threading
+
+
+class JsonlWriter:
+    def __init__(self, path):
+        self.path = path
+        self.count = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'a', encoding='utf-8')
+        # 開檔時已有的內容長度，read_jsonl(path, writer.start_offset) 只讀這次寫入的記錄
+        self.start_offset = self._file.tell()
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_jsonl(path, offset=0):
+    """ 逐行讀回 JsonlWriter 寫出的記錄；offset 為開始讀取的位置 """
+    with open(path, encoding='utf-8') as f:
+        f.seek(offset)
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
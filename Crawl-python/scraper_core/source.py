@@ -0,0 +1,272 @@
+"""
+新聞來源外掛介面
+- 每個網站是一個 NewsSource 子類別，大部分只需要設定類別屬性 (列表頁、連結選擇器、文章選擇器、語言、輸出欄位)
+- 特殊的網站再覆寫對應的方法，例如中央社的作者擷取與「只收今日新聞」
+- 列表頁上有日期的網站設定 listing_date_selector，早於水位線 (scraper_core.watermark) 的文章不必下載
+- 列表頁可以翻頁 (pages_to_scrape / next_page_selector / page_url_template)，由 scraper_core.frontier 排程
+- 實際的抓取、翻譯、寫檔由 scraper_core.runner.SourceRunner 處理，所有來源共用連線池、翻譯快取與輸出
+
+文章在流水線中以共用欄位 (scraper_core.store.RECORD_FIELDS) 的 dict 傳遞，
+寫出時才依 fields 對照表轉成各網站原本的欄位名稱
+"""
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+from urllib.parse import urljoin, urlsplit
+
+from .store import TIME_FORMAT
+from .watermark import parse_published
+
+# 翻譯的目標語言；來源語言相同時不翻譯
+TARGET_LANGUAGE = 'zh-TW'
+
+
+@dataclass
+class ArticleJob:
+    """ 列表頁找到的一篇文章 """
+    url: str
+    category: Optional[str] = None
+    # 列表上的標題 (有些網站文章頁沒有好抓的標題)
+    title: Optional[str] = None
+    # 列表上的發布時間 (沒有時為 None)
+    published: Optional[datetime] = None
+    # 續跑時上次已解析 (或已翻譯) 的記錄，有的話不必重新下載
+    record: Optional[dict] = None
+
+
+class NewsSource:
+    # 來源代號 (命令列參數、Parquet 分區、已抓網址索引的 source 欄位)
+    name = "base"
+    # 顯示名稱
+    label = ""
+    # 對應的獨立執行腳本，run_all.py 同行程模式用來略過這些腳本
+    script = None
+    base_url = ""
+    # 原文語言
+    language = 'en'
+
+    headers: Dict[str, str] = {}
+    # 每秒幾個請求、最多連發幾個
+    rate = 1.0
+    burst = 2
+    # 同時抓幾篇文章；流水線佇列容量
+    fetch_workers = 6
+    queue_size = 32
+    # 常駐排程 (run_all.py --daemon) 的輪詢間隔 (秒)，依新文章出現的速度在最短 / 最長之間調整
+    poll_interval = 1800
+    min_poll_interval = 300
+    max_poll_interval = 6 * 3600
+
+    # ---------- 列表頁 ----------
+    # {分類: 列表頁網址}
+    listings: Dict[str, str] = {}
+    link_selector = ""
+    # 連結 (href) 必須符合的規則，None 表示全收
+    link_pattern = None
+    # 網址含有這些字串就略過
+    excluded_keywords = ()
+    # 每個列表頁最多取幾篇新文章，None 表示不限
+    max_per_listing = None
+    # 連結元素內 (或所在列表項目內) 的日期元素，None 表示列表頁沒有日期
+    listing_date_selector = None
+    # 列表依發布時間由新到舊排序: 遇到水位線就停止往下讀 (也不再翻頁)
+    listing_sorted = False
+    # 每個分類最多讀幾頁列表 (命令列 --pages 可覆寫，回補舊新聞時調大)
+    pages_to_scrape = 1
+    # 「下一頁」連結；找不到時改用 page_url_template ({url}: 第一頁網址、{page}: 頁碼，從 1 起算)
+    next_page_selector = 'a[rel="next"], link[rel="next"]'
+    page_url_template = None
+
+    # ---------- 文章頁 ----------
+    # {共用欄位: CSS 選擇器}，例如 {'title': 'h1', 'content': '.article-content'}
+    article_selectors: Dict[str, str] = {}
+    # 找不到元素時的預設值
+    defaults: Dict[str, str] = {}
+    # 這些欄位是空的就丟棄整篇
+    required = ()
+    # True: 內文只取 <p> 段落並以 paragraph_separator 相接；False: 整個區塊的文字
+    paragraphs = False
+    paragraph_separator = "\n"
+    # 連續幾篇不收錄 (accept 回傳 False) 就停止送出新文章，None 表示不停
+    stop_after_rejects = None
+
+    # ---------- 輸出 ----------
+    file_prefix = ""
+    # True: 同一天的執行寫進同一個檔案，輸出檔包含當天全部新聞
+    daily_file = False
+    # 另外輸出縮排的 JSON 檔
+    write_json = False
+    # {輸出欄位: 共用欄位}，順序即 JSONL / Excel 的欄位順序
+    fields: Dict[str, str] = {}
+    # scraper_core.excel.ExcelColumn 清單
+    excel_columns = []
+    sheet_name = "新聞"
+
+    def __init__(self):
+        self._link_re = re.compile(self.link_pattern) if self.link_pattern else None
+
+    @property
+    def host(self):
+        return urlsplit(self.base_url).netloc
+
+    @property
+    def translate(self):
+        return self.language != TARGET_LANGUAGE
+
+    def log(self, message):
+        print(f"  [{self.name}] {message}")
+
+    # ---------- 列表頁 ----------
+
+    def listing_pages(self):
+        """ 回傳 [(分類, 列表頁網址)] """
+        return list(self.listings.items())
+
+    def absolute_url(self, href):
+        return href if href.startswith('http') else self.base_url + href
+
+    def accept_link(self, url):
+        lowered = url.lower()
+        return not any(keyword in lowered for keyword in self.excluded_keywords)
+
+    def parse_date(self, text) -> Optional[datetime]:
+        """ 網站的日期字串轉成 datetime，看不懂時回傳 None；格式特殊的網站覆寫這裡 """
+        return parse_published(text)
+
+    def listing_date(self, item) -> Optional[datetime]:
+        """ 列表上連結的發布時間: 先找連結內，再找所在的列表項目 (<li> / <article>) """
+        if not self.listing_date_selector:
+            return None
+        for scope in (item, item.find_parent(['li', 'article'])):
+            tag = scope.select_one(self.listing_date_selector) if scope is not None else None
+            if tag is not None:
+                return self.parse_date(tag.get('datetime') or tag.get_text())
+        return None
+
+    def earliest(self) -> Optional[datetime]:
+        """ 早於這個時間的文章一律不收 (例如只要今天的新聞)，None 表示不限 """
+        return None
+
+    def cutoff(self, watermark) -> Optional[datetime]:
+        """ 水位線與 earliest() 取較晚者，早於這個時間的文章不抓 """
+        limits = [t for t in (watermark.published if watermark else None, self.earliest()) if t]
+        return max(limits) if limits else None
+
+    def next_page_url(self, soup, url, origin, page):
+        """ 第 page 頁 (從 0 起算) 的下一頁網址，沒有下一頁時回傳 None """
+        if self.next_page_selector:
+            tag = soup.select_one(self.next_page_selector)
+            if tag is not None and tag.get('href'):
+                return urljoin(url, tag['href'])
+        if self.page_url_template:
+            return self.page_url_template.format(url=origin or url, page=page + 2)
+        return None
+
+    def parse_listing(self, response, category=None, page=0, origin=None, skip_unchanged=True):
+        """
+        從列表頁的抓取結果取出文章 (同一頁重複的連結只取一次)
+        回傳 (ArticleJob 清單, 下一頁網址或 None)；skip_unchanged: 304 未更新的列表頁不解析
+        """
+        try:
+            if response.error:
+                raise RuntimeError(response.error)
+            if response.not_modified and skip_unchanged:
+                self.log(f"列表頁未更新 (304)，略過: {response.url}")
+                return [], None
+            if response.status != 200 and not response.not_modified:
+                return [], None
+            # bs4 等到解析時才載入
+            from .parsing import make_soup
+            selectors = [self.link_selector]
+            if self.listing_date_selector:
+                # 日期可能不在連結內，所在的列表項目也要保留
+                selectors += ['li', 'article']
+            if self.next_page_selector:
+                selectors.append(self.next_page_selector)
+            soup = make_soup(response.text, selectors)
+            jobs = {}
+            for item in soup.select(self.link_selector):
+                href = item.get('href')
+                if not href or (self._link_re is not None and not self._link_re.search(href)):
+                    continue
+                url = self.absolute_url(href)
+                if url in jobs or not self.accept_link(url):
+                    continue
+                jobs[url] = ArticleJob(url, category, item.get_text().strip() or None, self.listing_date(item))
+            return list(jobs.values()), self.next_page_url(soup, response.url, origin, page)
+        except Exception as e:
+            self.log(f"抓取列表錯誤 {response.url}: {e}")
+            return [], None
+
+    # ---------- 文章頁 ----------
+
+    def extract(self, soup, field, selector):
+        tag = soup.select_one(selector)
+        if tag is None:
+            return None
+        if field == 'content':
+            if self.paragraphs:
+                texts = (p.get_text().strip() for p in tag.find_all('p'))
+                return self.paragraph_separator.join(t for t in texts if t)
+            return tag.get_text(separator='\n').strip()
+        return tag.get_text().strip()
+
+    def parse_article(self, response, job: ArticleJob) -> Optional[dict]:
+        """ 解析文章頁，回傳共用欄位的記錄；失敗回傳 None (中文欄位之後批次翻譯) """
+        try:
+            if response.error:
+                raise RuntimeError(response.error)
+            # 304 時 text 為快取的頁面 (例如續跑時重抓上次已下載的文章)，照常解析
+            if response.status != 200 and not response.not_modified:
+                return None
+            # 只建出選擇器用到的區塊
+            from .parsing import make_soup
+            soup = make_soup(response.text, list(self.article_selectors.values()))
+            record = {
+                'category': job.category,
+                'title': job.title,
+                'url': job.url,
+                'fetched_at': datetime.now().strftime(TIME_FORMAT),
+                'title_zh': "",
+                'content_zh': "",
+            }
+            for field, selector in self.article_selectors.items():
+                value = self.extract(soup, field, selector)
+                if value or field not in record:
+                    record[field] = value
+            for field, default in self.defaults.items():
+                if not record.get(field):
+                    record[field] = default
+            if any(not record.get(field) for field in self.required):
+                return None
+            self.finish_record(record, soup)
+            self.log(f"已解析: {(record.get('title') or '')[:20]}...")
+            return record
+        except Exception as e:
+            self.log(f"解析文章失敗 {job.url}: {e}")
+            return None
+
+    def finish_record(self, record, soup):
+        """ 子類別可在這裡補上需要額外處理的欄位 """
+
+    def normalize_frame(self, df):
+        """ 整理階段: 一批記錄 (DataFrame) 整欄清理文字；子類別可再補上整欄計算的欄位 """
+        from .textclean import clean_columns
+        return clean_columns(df)
+
+    def accept(self, record) -> bool:
+        """ 是否收錄 (例如只要今天的新聞)；不收錄的文章仍會記入已抓網址索引 """
+        return True
+
+    # ---------- 輸出 ----------
+
+    def to_output(self, record):
+        """ 共用欄位轉成網站原本的欄位名稱 """
+        return {column: record.get(name) for column, name in self.fields.items()}
+
+    def output_stem(self, timestamp):
+        """ 輸出檔名 (不含副檔名) """
+        if self.daily_file:
+            return f"{self.file_prefix}_{datetime.now().strftime('%Y%m%d')}"
+        return f"{self.file_prefix}_{timestamp}"
@@ -0,0 +1,242 @@
+"""
+以 Parquet 保存所有網站的新聞 (共用欄位格式)
+- 目錄依網站與日期分區: <root>/site=<網站>/date=<YYYY-MM-DD>/part-*.parquet
+  pandas.read_parquet(root) 或 pyarrow.dataset 可直接跨月份查詢，不必再開一堆 xlsx
+- 每次執行只新增一個 part 檔 (append)，分區內檔案太多時合併成一個 (compact)，合併時依網址去重
+- 分區日期取下載時間 (各網站的發布日期格式不一，不適合拿來分區)
+- 各爬蟲原本的中文欄位名稱以對照表轉成共用欄位，Excel 再從這裡轉回原本欄位輸出 (可關閉)
+- pyarrow 沒安裝時 open_store() 回傳 None，爬蟲照常只輸出 JSONL / Excel
+
+整理分區: python -m scraper_core.store <資料夾> compact [--site cna]
+"""
+import importlib.util
+import os
+from datetime import datetime
+
+from .metrics import METRICS
+
+STORE_DIRNAME = "parquet"
+# 設為 0 時不輸出 Excel，只寫 Parquet
+EXCEL_ENV = "SCRAPER_EXCEL"
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 共用欄位 (site / date 是分區欄位，存在路徑上)
+RECORD_FIELDS = [
+    "category", "published", "author", "title", "title_zh", "subtitle",
+    "content", "content_zh", "language", "url", "fetched_at", "run_id",
+]
+
+# 分區內超過幾個檔案才合併
+COMPACT_MIN_FILES = 8
+
+
+def excel_enabled():
+    return os.environ.get(EXCEL_ENV, "1") != "0"
+
+
+def _schema():
+    import pyarrow as pa
+    return pa.schema([
+        (name, pa.timestamp('s') if name == "fetched_at" else pa.string())
+        for name in RECORD_FIELDS
+    ])
+
+
+def _parse_time(value):
+    if isinstance(value, datetime):
+        return value
+    try:
+        return datetime.strptime(value, TIME_FORMAT)
+    except (TypeError, ValueError):
+        return datetime.now()
+
+
+def to_common(article, fields, language=None):
+    """ 依對照表 {原欄位: 共用欄位} 把爬蟲的記錄轉成共用欄位 """
+    record = dict.fromkeys(RECORD_FIELDS)
+    for column, name in fields.items():
+        value = article.get(column)
+        record[name] = value if value is None or name == "fetched_at" else str(value)
+    record["fetched_at"] = _parse_time(record["fetched_at"])
+    record["language"] = language
+    return record
+
+
+def from_common(df, fields, columns=None):
+    """ 把共用欄位的 DataFrame 轉回爬蟲原本的欄位名稱與順序 (columns 可只取部分欄位) """
+    df = df.copy()
+    if "fetched_at" in df:
+        df["fetched_at"] = df["fetched_at"].dt.strftime(TIME_FORMAT)
+    df = df.rename(columns={name: column for column, name in fields.items()})
+    return df[list(columns or fields)]
+
+
+def from_common_record(record, fields):
+    """ 單筆版的 from_common """
+    article = {}
+    for column, name in fields.items():
+        value = record.get(name)
+        if name == "fetched_at" and value is not None:
+            value = value.strftime(TIME_FORMAT)
+        article[column] = value
+    return article
+
+
+class ParquetStore:
+    def __init__(self, root, compression='zstd', compact_min_files=COMPACT_MIN_FILES):
+        # 只檢查有沒有安裝，真正讀寫時才載入 pyarrow
+        if importlib.util.find_spec("pyarrow") is None:
+            raise ImportError("需要安裝 pyarrow")
+        self.root = root
+        self.compression = compression
+        self.compact_min_files = compact_min_files
+        os.makedirs(root, exist_ok=True)
+
+    def _partition_dir(self, site, date):
+        return os.path.join(self.root, f"site={site}", f"date={date}")
+
+    def _write(self, table, path):
+        import pyarrow.parquet as pq
+        tmp_path = path + ".tmp"
+        pq.write_table(table, tmp_path, compression=self.compression)
+        # 寫完再改名，讀取端不會看到寫一半的檔案
+        os.replace(tmp_path, path)
+
+    def append(self, site, records, run_id=None):
+        """ 新增一批共用欄位的記錄，依下載日期寫進各分區，回傳寫出的檔案 """
+        import pyarrow as pa
+        run_id = run_id or datetime.now().strftime('%Y%m%d_%H%M%S')
+        by_date = {}
+        for record in records:
+            record = dict(record, run_id=run_id)
+            by_date.setdefault(record["fetched_at"].strftime('%Y-%m-%d'), []).append(record)
+
+        paths = []
+        for date, rows in by_date.items():
+            directory = self._partition_dir(site, date)
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{run_id}-{os.urandom(4).hex()}.parquet")
+            self._write(pa.Table.from_pylist(rows, schema=_schema()), path)
+            paths.append(path)
+        return paths
+
+    def partitions(self, site=None):
+        """ 列出 (網站, 日期, 資料夾) """
+        result = []
+        sites = [f"site={site}"] if site else sorted(os.listdir(self.root))
+        for site_dir in sites:
+            site_path = os.path.join(self.root, site_dir)
+            if not site_dir.startswith("site=") or not os.path.isdir(site_path):
+                continue
+            for date_dir in sorted(os.listdir(site_path)):
+                if date_dir.startswith("date="):
+                    result.append((site_dir[5:], date_dir[5:], os.path.join(site_path, date_dir)))
+        return result
+
+    def compact(self, site=None, min_files=None):
+        """ 把檔案數達到門檻的分區合併成單一檔案 (同網址保留最新一筆)，回傳合併了幾個分區 """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        min_files = min_files or self.compact_min_files
+        compacted = 0
+        for _, date, directory in self.partitions(site):
+            parts = sorted(f for f in os.listdir(directory) if f.endswith(".parquet"))
+            if len(parts) < min_files:
+                continue
+            df = pq.read_table([os.path.join(directory, f) for f in parts], schema=_schema()).to_pandas()
+            df = df.sort_values("fetched_at", kind="stable").drop_duplicates("url", keep="last")
+            path = os.path.join(directory, f"part-compacted-{os.urandom(4).hex()}.parquet")
+            self._write(pa.Table.from_pandas(df, schema=_schema(), preserve_index=False), path)
+            for f in parts:
+                os.remove(os.path.join(directory, f))
+            compacted += 1
+        return compacted
+
+    def read(self, site=None, start=None, end=None, run_id=None, columns=None):
+        """
+        讀回 DataFrame；start / end 為 'YYYY-MM-DD' (含)，只會讀到範圍內的分區
+        """
+        import pandas as pd
+        if not self.partitions(site):
+            return pd.DataFrame(columns=columns or RECORD_FIELDS)
+        dataset, condition = self._dataset(site, start, end, run_id)
+        return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+    def _dataset(self, site=None, start=None, end=None, run_id=None):
+        import pyarrow.dataset as ds
+        dataset = ds.dataset(self.root, format="parquet", partitioning="hive",
+                             exclude_invalid_files=True)
+        condition = None
+        for expression in (
+            ds.field("site") == site if site else None,
+            ds.field("date") >= start if start else None,
+            ds.field("date") <= end if end else None,
+            ds.field("run_id") == run_id if run_id else None,
+        ):
+            if expression is not None:
+                condition = expression if condition is None else condition & expression
+        return dataset, condition
+
+    def iter_records(self, site=None, start=None, end=None, run_id=None):
+        """ 逐批讀回共用欄位的記錄 (dict)，不必整份載入記憶體 """
+        if not self.partitions(site):
+            return
+        dataset, condition = self._dataset(site, start, end, run_id)
+        for batch in dataset.to_batches(columns=RECORD_FIELDS, filter=condition):
+            yield from batch.to_pylist()
+
+    def save_run(self, site, articles, fields, language=None):
+        """
+        爬蟲一次執行的收尾: 轉成共用欄位寫入，必要時合併分區，回傳這次的 run_id
+        fields 為 {原欄位: 共用欄位} 對照表
+        """
+        run_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{os.urandom(3).hex()}"
+        with METRICS.timer("store.save_run", site):
+            self.append(site, [to_common(a, fields, language) for a in articles], run_id=run_id)
+            merged = self.compact(site)
+        if merged:
+            print(f"  [Parquet] {site} 分區已合併")
+        print(f"  [Parquet] 已寫入 {len(articles)} 筆: {self.root}")
+        return run_id
+
+    def iter_run(self, site, run_id, fields):
+        """ 逐筆讀回某次執行的記錄，欄位轉回爬蟲原本的名稱 (給 Excel 串流輸出用) """
+        for record in self.iter_records(site, run_id=run_id):
+            yield from_common_record(record, fields)
+
+    def report(self):
+        lines = [f"Parquet 資料夾: {self.root}"]
+        for site, date, directory in self.partitions():
+            files = [f for f in os.listdir(directory) if f.endswith(".parquet")]
+            size = sum(os.path.getsize(os.path.join(directory, f)) for f in files)
+            lines.append(f"  {site:<18} {date}  {len(files)} 個檔案  {size / 1024:.0f} KB")
+        return "\n".join(lines)
+
+
+def open_store(save_dir):
+    """ 開啟輸出資料夾下的 Parquet 保存區，pyarrow 沒安裝時回傳 None """
+    try:
+        return ParquetStore(os.path.join(save_dir, STORE_DIRNAME))
+    except ImportError:
+        print("  [Parquet] 未安裝 pyarrow，略過 Parquet 輸出")
+        return None
+
+
+def main():
+    # 爬蟲啟動時會載入這個模組 (欄位對照)，命令列工具才用得到的套件放到這裡
+    import argparse
+    parser = argparse.ArgumentParser(description="整理 Parquet 新聞資料")
+    parser.add_argument("save_dir", help="爬蟲的輸出資料夾")
+    parser.add_argument("action", choices=["compact", "report"])
+    parser.add_argument("--site", help="只處理指定網站")
+    parser.add_argument("--min-files", type=int, default=2, help="分區內至少幾個檔案才合併")
+    args = parser.parse_args()
+
+    store = ParquetStore(os.path.join(args.save_dir, STORE_DIRNAME))
+    if args.action == "compact":
+        print(f"已合併 {store.compact(args.site, args.min_files)} 個分區")
+    print(store.report())
+
+
+if __name__ == '__main__':
+    main()
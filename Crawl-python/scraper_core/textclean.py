@@ -0,0 +1,65 @@
+"""
+文字清理 (整批、向量化)
+- 正規表示式只在載入時編譯一次，不再每次呼叫都 re.compile
+- clean_columns() 以 pandas 的 .str 方法一次處理整欄，取代逐格 applymap
+  傳給 .str 的是規則字串而不是編譯好的物件: pandas 的字串欄位由 pyarrow 支援時，
+  字串規則會交給 pyarrow 的 RE2 在 C++ 裡整欄處理 (規則因此只用兩邊都支援的語法)
+- clean_text() 是同樣規則的單筆版本
+- suffix_pattern() 把一串結尾詞組成單一個 alternation (長的優先)，一次比對，不必逐一 endswith
+"""
+import re
+
+# 與 openpyxl.cell.cell.ILLEGAL_CHARACTERS_RE 相同 (不必為了這個載入 openpyxl)
+ILLEGAL_CHARACTERS = r'[\000-\010]|[\013-\014]|[\016-\037]'
+ILLEGAL_CHARACTERS_RE = re.compile(ILLEGAL_CHARACTERS)
+# 單行欄位的連續空白 (含換行；RE2 的 \s 不含不換行空白與全形空白，另外列出)
+WHITESPACE = '[\\s\u00a0\u3000]+'
+_WHITESPACE_RE = re.compile(WHITESPACE)
+
+# 共用欄位中需要清理的文字欄位；單行欄位另外把換行與連續空白壓成一個空白
+TEXT_FIELDS = ("title", "subtitle", "author", "published", "content")
+SINGLE_LINE_FIELDS = ("title", "subtitle", "author", "published")
+
+
+def clean_text(value, single_line=False):
+    """ 濾掉 Excel 不允許的控制字元並去掉前後空白；不是字串的原樣回傳 """
+    if not isinstance(value, str):
+        return value
+    value = ILLEGAL_CHARACTERS_RE.sub("", value)
+    if single_line:
+        value = _WHITESPACE_RE.sub(' ', value)
+    return value.strip()
+
+
+def clean_series(series, single_line=False):
+    """ clean_text 的整欄版本，空值維持空值 """
+    series = series.str.replace(ILLEGAL_CHARACTERS, "", regex=True)
+    if single_line:
+        series = series.str.replace(WHITESPACE, ' ', regex=True)
+    return series.str.strip()
+
+
+def clean_columns(df, columns=TEXT_FIELDS):
+    """ 清理 DataFrame 中存在的文字欄位 (就地修改並回傳) """
+    for column in columns:
+        # 整欄都是空值時沒有 .str 可用，也不必處理
+        if column in df and df[column].dtype.kind == 'O' and df[column].notna().any():
+            df[column] = clean_series(df[column], single_line=column in SINGLE_LINE_FIELDS)
+    return df
+
+
+def suffix_pattern(words):
+    """ 結尾詞清單組成一個 regex: (?:舊金山|台北|...)$，長的詞優先比對 """
+    alternation = "|".join(re.escape(w) for w in sorted(set(words), key=len, reverse=True))
+    return re.compile(f"(?:{alternation})$")
+
+
+def normalize_records(records, normalize_frame):
+    """
+    一批 dict 記錄轉成 DataFrame，交給 normalize_frame(df) 整欄處理後再轉回 dict
+    (原本是 None 的欄位轉回來仍是 None)
+    """
+    import pandas as pd
+    df = normalize_frame(pd.DataFrame.from_records(records))
+    df = df.astype(object).where(df.notna(), None)
+    return df.to_dict('records')
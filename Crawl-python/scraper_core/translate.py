@@ -0,0 +1,301 @@
+"""
+翻譯快取
+- 以 (翻譯引擎, 來源語言, 目標語言, 正規化後文字的雜湊) 為鍵
+- 前面是有上限的記憶體 LRU，後面是 SQLite 永久保存，隔天重跑同一標題也不必再翻
+- 執行結束時可印出命中率統計
+
+批次翻譯
+- 長文依段落、句子切開，再裝箱成接近引擎上限的請求，不再截斷內文
+- 很短的單行文字 (標題) 以換行合併成一個請求，回來後依行數拆回；行數對不上就逐筆重翻
+- 多篇文章的請求一起送出，以執行緒池限制同時請求數，最後依原順序組回每篇文章
+- 請求失敗 (例如被限流) 或沒有譯文時丟出 TranslationError，不把原文當成譯文，也不存進快取
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from .metrics import METRICS
+
+TRANSLATION_CACHE_FILENAME = "translation_cache.sqlite3"
+
+# Google 單次請求上限約 5000 字，保留餘裕
+MAX_REQUEST_CHARS = 4500
+
+_WHITESPACE_RE = re.compile(r'\s+')
+# 段落切點 (保留換行在前一段的結尾) 與句子切點 (句末標點後的空白)
+_PARAGRAPH_RE = re.compile(r'(?<=\n)')
+_SENTENCE_RE = re.compile(r'(?<=[.!?。！？…»"])\s+')
+
+
+class TranslationError(Exception):
+    """ 翻譯請求失敗 (引擎錯誤、被限流) 或沒有取得譯文 """
+
+
+def normalize_text(text):
+    """ 統一 Unicode 形式並壓縮空白，只差在空白的相同文字共用同一筆快取 """
+    return _WHITESPACE_RE.sub(' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def text_key(text):
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+def _split_sentences(paragraph, limit):
+    """ 把過長段落依句子切開，句子本身仍過長才硬切 """
+    pieces = []
+    last = 0
+    for match in _SENTENCE_RE.finditer(paragraph):
+        pieces.append(paragraph[last:match.end()])
+        last = match.end()
+    pieces.append(paragraph[last:])
+
+    result = []
+    for piece in pieces:
+        while len(piece) > limit:
+            result.append(piece[:limit])
+            piece = piece[limit:]
+        if piece:
+            result.append(piece)
+    return result
+
+
+def split_into_chunks(text, limit=MAX_REQUEST_CHARS):
+    """
+    依段落與句子邊界切分並裝箱，每塊不超過 limit 字
+    所有塊依序接起來會等於原文
+    """
+    units = []
+    for paragraph in _PARAGRAPH_RE.split(text):
+        if len(paragraph) > limit:
+            units.extend(_split_sentences(paragraph, limit))
+        elif paragraph:
+            units.append(paragraph)
+
+    chunks = []
+    current = ""
+    for unit in units:
+        if current and len(current) + len(unit) > limit:
+            chunks.append(current)
+            current = ""
+        current += unit
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _split_edges(chunk):
+    """ 把前後空白拆出來，翻譯時只送中間文字，組回時保留原本的換行 """
+    body = chunk.strip()
+    if not body:
+        return chunk, "", ""
+    start = chunk.index(body)
+    return chunk[:start], body, chunk[start + len(body):]
+
+
+class TranslationCache:
+    def __init__(self, path=None, max_memory=4096):
+        """ path 為 None 時只使用記憶體 LRU """
+        self.path = path
+        self.max_memory = max_memory
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.conn = None
+        if path:
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(translations)")]
+            if columns and 'engine' not in columns:
+                # 舊版快取沒有區分引擎，直接重建 (只是快取，丟掉無妨)
+                self.conn.execute("DROP TABLE translations")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS translations (
+                    engine TEXT,
+                    source TEXT,
+                    target TEXT,
+                    text_hash TEXT,
+                    translated TEXT,
+                    created_at TEXT,
+                    PRIMARY KEY (engine, source, target, text_hash)
+                )
+            """)
+            self.conn.commit()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory:
+            self._memory.popitem(last=False)
+
+    def get(self, engine, source, target, text):
+        key = (engine, source, target, text_key(text))
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return self._memory[key]
+            if self.conn is not None:
+                row = self.conn.execute(
+                    "SELECT translated FROM translations WHERE engine = ? AND source = ? AND target = ? AND text_hash = ?",
+                    key
+                ).fetchone()
+                if row is not None:
+                    self.disk_hits += 1
+                    self._remember(key, row[0])
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def put(self, engine, source, target, text, translated):
+        key = (engine, source, target, text_key(text))
+        with self._lock:
+            self._remember(key, translated)
+            if self.conn is not None:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)",
+                    key + (translated, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                )
+                self.conn.commit()
+
+    def report(self):
+        total = self.memory_hits + self.disk_hits + self.misses
+        rate = (self.memory_hits + self.disk_hits) / total * 100 if total else 0.0
+        return (f"翻譯快取: 共 {total} 次查詢，記憶體命中 {self.memory_hits}、"
+                f"磁碟命中 {self.disk_hits}、未命中 {self.misses} (命中率 {rate:.1f}%)")
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class CachedTranslator:
+    def __init__(self, translator, cache=None, limiter=None, limiter_domain="translate.google.com",
+                 max_chars=None, max_workers=4):
+        """
+        包裝翻譯引擎 (scraper_core.backends 的 TranslationBackend)，先查快取再呼叫
+        limiter: 可選的 DomainRateLimiter，只有快取未命中、且引擎是線上服務時才限速
+        max_chars: 單次請求的字數上限，預設沿用引擎的設定
+        max_workers: 批次翻譯時最多同時送出幾個請求
+        """
+        self.translator = translator
+        self.cache = cache or TranslationCache()
+        self.limiter = limiter
+        self.limiter_domain = limiter_domain
+        self.max_chars = max_chars or getattr(translator, 'max_chars', MAX_REQUEST_CHARS)
+        self.max_workers = max_workers
+        self.engine = getattr(translator, 'name', type(translator).__name__)
+        self.source = getattr(translator, 'source', 'auto')
+        self.target = getattr(translator, 'target', 'zh-TW')
+
+    def _request(self, text):
+        """ 實際送出一次翻譯請求 (不經快取) """
+        if self.limiter is not None and getattr(self.translator, 'remote', True):
+            self.limiter.acquire(self.limiter_domain)
+        METRICS.count("translate.requests", self.engine)
+        METRICS.count("translate.chars", self.engine, len(text))
+        try:
+            with METRICS.timer("translate.request", self.engine):
+                return self.translator.translate(text)
+        except Exception as e:
+            METRICS.count("translate.errors", self.engine)
+            if self.limiter is not None and type(e).__name__ == 'TooManyRequests':
+                self.limiter.on_response(self.limiter_domain, 429)
+            raise
+
+    def _translate_piece(self, text):
+        """ 翻譯單一片段；請求失敗或引擎沒有回傳譯文時丟出 TranslationError """
+        try:
+            translated = self._request(text)
+        except Exception as e:
+            print(f"  [翻譯錯誤] {e}")
+            raise TranslationError(f"翻譯失敗: {e}") from e
+        if not translated or not translated.strip():
+            raise TranslationError(f"引擎沒有回傳譯文 ({len(text)} 字)")
+        self.cache.put(self.engine, self.source, self.target, text, translated)
+        return translated
+
+    def _translate_lines(self, lines):
+        """
+        多個單行文字合併成一個請求，行數對不上時改為逐行翻譯；拆回後是空白的行也逐行重翻
+        請求失敗時丟出 TranslationError
+        """
+        if len(lines) == 1:
+            return [self._translate_piece(lines[0])]
+        try:
+            translated = self._request("\n".join(lines))
+        except Exception as e:
+            print(f"  [翻譯錯誤] {e}")
+            raise TranslationError(f"{len(lines)} 行合併翻譯失敗: {e}") from e
+        parts = [part.strip() for part in translated.split("\n")] if translated else []
+        if len(parts) != len(lines):
+            return [self._translate_piece(line) for line in lines]
+        results = []
+        for line, part in zip(lines, parts):
+            if part:
+                self.cache.put(self.engine, self.source, self.target, line, part)
+                results.append(part)
+            else:
+                results.append(self._translate_piece(line))
+        return results
+
+    def translate(self, text):
+        if not text:
+            return text
+        return self.translate_many([text])[0]
+
+    def translate_many(self, texts):
+        """
+        批次翻譯多段文字，回傳順序與輸入相同
+        長文切塊、短句合併，快取命中的片段不送出請求；任一片段失敗時丟出 TranslationError
+        (已成功的片段已存進快取，重試時不必再送)
+        """
+        texts = list(texts)
+        # 每段文字切成 (前空白, 內容, 後空白) 的片段
+        layouts = []
+        pending = {}  # 內容 -> 譯文 (None 代表待翻)
+        for text in texts:
+            pieces = [_split_edges(chunk) for chunk in split_into_chunks(text or "", self.max_chars)]
+            layouts.append(pieces)
+            for _, body, _ in pieces:
+                if body and body not in pending:
+                    pending[body] = self.cache.get(self.engine, self.source, self.target, body)
+
+        misses = [body for body, value in pending.items() if value is None]
+        # 單行短文字裝箱成一個請求，多行或長片段各自一個請求
+        jobs = []
+        batch, size = [], 0
+        for body in misses:
+            if "\n" in body:
+                jobs.append([body])
+                continue
+            if batch and size + len(body) + 1 > self.max_chars:
+                jobs.append(batch)
+                batch, size = [], 0
+            batch.append(body)
+            size += len(body) + 1
+        if batch:
+            jobs.append(batch)
+
+        if jobs:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for lines, results in zip(jobs, pool.map(self._translate_lines, jobs)):
+                    pending.update(zip(lines, results))
+
+        return [
+            "".join(head + (pending[body] if body else "") + tail for head, body, tail in pieces)
+            for pieces in layouts
+        ]
+
+    def close(self):
+        """ 關閉快取與引擎 (例如 Argos 的子行程) """
+        self.cache.close()
+        if hasattr(self.translator, 'close'):
+            self.translator.close()
@@ -0,0 +1,177 @@
+"""
+各來源的日期水位線 (SQLite)
+- 每個來源記錄「上次完整抓完時最新一篇的發布時間與網址」
+- 下次執行時列表頁上早於水位線的文章直接略過，不必下載整篇文章頁才發現是舊新聞；
+  列表依時間排序的網站遇到水位線 (或上次最新那篇的網址) 就停止往下讀
+- 只有整次執行完整結束 (沒有逾時、失敗、被 max_per_listing 截斷) 才推進水位線，
+  避免中途停止時把還沒抓的文章當成已處理
+
+parse_published() 把各網站的日期字串轉成 datetime (不含時區，一律用網站本身的時間):
+ISO 8601、2024/05/01 12:30、01.05.2024、1 мая 2024 14:33、May 1, 2024 ...
+
+查看 / 重設: python -m scraper_core.watermark <資料夾> report|reset [--source cna]
+"""
+import argparse
+import os
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+
+WATERMARK_DB_FILENAME = "watermarks.sqlite3"
+_STORE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 月份名稱 (英文全名 / 縮寫、俄文所有格與主格)
+MONTH_NAMES = {}
+for _number, _names in enumerate([
+    ("january", "jan", "января", "январь"), ("february", "feb", "февраля", "февраль"),
+    ("march", "mar", "марта", "март"), ("april", "apr", "апреля", "апрель"),
+    ("may", "мая", "май"), ("june", "jun", "июня", "июнь"),
+    ("july", "jul", "июля", "июль"), ("august", "aug", "августа", "август"),
+    ("september", "sep", "sept", "сентября", "сентябрь"), ("october", "oct", "октября", "октябрь"),
+    ("november", "nov", "ноября", "ноябрь"), ("december", "dec", "декабря", "декабрь"),
+], start=1):
+    for _name in _names:
+        MONTH_NAMES[_name] = _number
+
+_YMD_RE = re.compile(r'(\d{4})[/.-](\d{1,2})[/.-](\d{1,2})')
+_DMY_RE = re.compile(r'(\d{1,2})[/.](\d{1,2})[/.](\d{4})')
+_DAY_MONTH_RE = re.compile(r'(\d{1,2})\s+([^\W\d_]+)\.?,?\s+(\d{4})')
+_MONTH_DAY_RE = re.compile(r'([^\W\d_]+)\.?\s+(\d{1,2}),?\s+(\d{4})')
+_TIME_RE = re.compile(r'(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([AaPp][Mm])?')
+
+
+def _iso(text):
+    try:
+        value = datetime.fromisoformat(text.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    # 帶時區的換成本機時間，與其他格式一樣不含時區
+    return value.astimezone().replace(tzinfo=None) if value.tzinfo else value
+
+
+def _date_part(text):
+    match = _YMD_RE.search(text)
+    if match:
+        return int(match.group(1)), int(match.group(2)), int(match.group(3))
+    match = _DMY_RE.search(text)
+    if match:
+        return int(match.group(3)), int(match.group(2)), int(match.group(1))
+    match = _DAY_MONTH_RE.search(text)
+    if match and match.group(2).lower() in MONTH_NAMES:
+        return int(match.group(3)), MONTH_NAMES[match.group(2).lower()], int(match.group(1))
+    match = _MONTH_DAY_RE.search(text)
+    if match and match.group(1).lower() in MONTH_NAMES:
+        return int(match.group(3)), MONTH_NAMES[match.group(1).lower()], int(match.group(2))
+    return None
+
+
+def parse_published(text) -> Optional[datetime]:
+    """ 日期字串轉成 datetime，看不懂時回傳 None (只有日期時時間為 00:00) """
+    if not text or not isinstance(text, str):
+        return None
+    text = text.strip()
+    value = _iso(text)
+    if value is not None:
+        return value
+    date = _date_part(text)
+    if date is None:
+        return None
+    hour = minute = second = 0
+    match = _TIME_RE.search(text)
+    if match:
+        hour, minute, second = int(match.group(1)), int(match.group(2)), int(match.group(3) or 0)
+        meridiem = (match.group(4) or "").lower()
+        if meridiem == 'pm' and hour < 12:
+            hour += 12
+        elif meridiem == 'am' and hour == 12:
+            hour = 0
+    try:
+        return datetime(*date, hour, minute, second)
+    except ValueError:
+        return None
+
+
+@dataclass
+class Watermark:
+    # 上次完整執行時最新一篇的發布時間與網址
+    published: datetime
+    url: Optional[str] = None
+
+
+class WatermarkStore:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS watermarks (
+                source TEXT PRIMARY KEY,
+                published TEXT,
+                url TEXT,
+                updated_at TEXT
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, source) -> Optional[Watermark]:
+        with self._lock:
+            row = self.conn.execute("SELECT published, url FROM watermarks WHERE source = ?",
+                                    (source,)).fetchone()
+        if row is None:
+            return None
+        return Watermark(datetime.strptime(row[0], _STORE_FORMAT), row[1])
+
+    def advance(self, source, published, url=None):
+        """ 推進水位線 (只會往後移)，回傳是否有更新 """
+        current = self.get(source)
+        if current is not None and published <= current.published:
+            return False
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO watermarks (source, published, url, updated_at) VALUES (?, ?, ?, ?)",
+                (source, published.strftime(_STORE_FORMAT), url, datetime.now().strftime(_STORE_FORMAT))
+            )
+            self.conn.commit()
+        return True
+
+    def reset(self, source=None):
+        """ 清除水位線 (下次執行重新依已抓網址索引判斷)，source 為 None 時全部清除 """
+        with self._lock:
+            if source is None:
+                self.conn.execute("DELETE FROM watermarks")
+            else:
+                self.conn.execute("DELETE FROM watermarks WHERE source = ?", (source,))
+            self.conn.commit()
+
+    def report(self):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT source, published, url, updated_at FROM watermarks ORDER BY source").fetchall()
+        lines = [f"水位線: {self.path}"]
+        for source, published, url, updated_at in rows:
+            lines.append(f"  {source:<18} {published}  (更新於 {updated_at})  {url or ''}")
+        return "\n".join(lines)
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="查看或重設各來源的日期水位線")
+    parser.add_argument("save_dir", help="爬蟲的輸出資料夾")
+    parser.add_argument("action", choices=["report", "reset"])
+    parser.add_argument("--source", help="只處理指定來源")
+    args = parser.parse_args()
+
+    store = WatermarkStore(os.path.join(args.save_dir, WATERMARK_DB_FILENAME))
+    if args.action == "reset":
+        store.reset(args.source)
+    print(store.report())
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
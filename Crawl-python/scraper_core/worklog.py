@@ -0,0 +1,281 @@
+"""
+可續跑的工作記錄 (SQLite)
+- 每次執行一筆 run，記錄執行參數；列表頁記錄是否已讀，文章記錄目前進度:
+  discovered (列表上找到) → fetched (已下載) → parsed (已解析) → translated (已翻譯) → written (已寫出)，
+  不收錄或失敗的文章記為 skipped
+- parsed / translated 的文章連同記錄內容 (zlib 壓縮的 JSON) 一起保存，續跑時直接從該階段往下做，
+  不必重新下載、解析或翻譯；written 後就不再保存內容
+- 程式中途當掉、逾時或失敗時 run 維持未完成，下次以 --resume 執行會接著跑:
+  沒讀完的列表頁與還沒寫出的文章放回 frontier，已讀過的列表頁不再重讀
+- 整次完整結束的 run 只留一筆摘要；不續跑而重新開始時，舊的未完成 run 會標記為放棄並清掉明細
+- 以 WAL 模式寫入，每篇文章的狀態更新不必等整個檔案同步
+
+查看: python -m scraper_core.worklog <資料夾> report [--source cna]
+"""
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from typing import Optional
+
+WORKLOG_DB_FILENAME = "worklog.sqlite3"
+
+DISCOVERED = "discovered"
+FETCHED = "fetched"
+PARSED = "parsed"
+TRANSLATED = "translated"
+WRITTEN = "written"
+SKIPPED = "skipped"
+# 不必再處理的文章
+FINISHED_STATES = (WRITTEN, SKIPPED)
+# run 的最終狀態: 完整結束 / 開新的 run 時放棄的舊 run
+DONE = "done"
+ABANDONED = "abandoned"
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _pack(record):
+    return zlib.compress(json.dumps(record, ensure_ascii=False).encode('utf-8')) if record is not None else None
+
+
+def _unpack(blob):
+    return json.loads(zlib.decompress(blob).decode('utf-8')) if blob is not None else None
+
+
+def _format(value):
+    return value.strftime(_TIME_FORMAT) if value is not None else None
+
+
+def _parse(text):
+    return datetime.strptime(text, _TIME_FORMAT) if text else None
+
+
+class WorkLog:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                source TEXT,
+                options TEXT,
+                status TEXT,
+                -- 因為上限 (頁數、篇數) 沒有處理的項目數，續跑也不會補上，不能算完整結束
+                dropped INTEGER DEFAULT 0,
+                started_at TEXT,
+                updated_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS listings (
+                run_id INTEGER,
+                url TEXT,
+                depth INTEGER,
+                category TEXT,
+                origin TEXT,
+                done INTEGER DEFAULT 0,
+                PRIMARY KEY (run_id, url)
+            );
+            CREATE TABLE IF NOT EXISTS articles (
+                run_id INTEGER,
+                url TEXT,
+                state TEXT,
+                depth INTEGER,
+                category TEXT,
+                title TEXT,
+                published TEXT,
+                record BLOB,
+                updated_at TEXT,
+                PRIMARY KEY (run_id, url)
+            );
+        """)
+        self.conn.commit()
+
+    # ---------- run ----------
+
+    def start(self, source, options=None):
+        """ 開始新的 run，同一來源未完成的舊 run 標記為放棄；回傳 run_id """
+        now = datetime.now().strftime(_TIME_FORMAT)
+        with self._lock:
+            old = [row[0] for row in self.conn.execute(
+                "SELECT run_id FROM runs WHERE source = ? AND status NOT IN (?, ?)", (source, DONE, ABANDONED))]
+            for run_id in old:
+                self._purge(run_id, ABANDONED)
+            cursor = self.conn.execute(
+                "INSERT INTO runs (source, options, status, started_at, updated_at) VALUES (?, ?, 'running', ?, ?)",
+                (source, json.dumps(options or {}, ensure_ascii=False), now, now))
+            self.conn.commit()
+            return cursor.lastrowid
+
+    def resumable(self, source):
+        """ 該來源最近一次未完成的 run，回傳 (run_id, 執行參數)，沒有則回傳 None """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT run_id, options FROM runs WHERE source = ? AND status NOT IN (?, ?) "
+                "ORDER BY run_id DESC LIMIT 1", (source, DONE, ABANDONED)).fetchone()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1] or "{}")
+
+    def last_status(self, source, before):
+        """ 該來源在 run_id before 之前最近一次 run 的狀態，沒有則回傳 None """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT status FROM runs WHERE source = ? AND run_id < ? ORDER BY run_id DESC LIMIT 1",
+                (source, before)).fetchone()
+        return row[0] if row else None
+
+    def reopen(self, run_id):
+        self._set_status(run_id, "running")
+
+    def finish(self, run_id, status, dropped=0):
+        """ 記錄 run 的結果；DONE 時清掉明細只留摘要，其他狀態保留明細供續跑 """
+        with self._lock:
+            self.conn.execute("UPDATE runs SET dropped = ? WHERE run_id = ?", (dropped, run_id))
+            if status == DONE:
+                self._purge(run_id, DONE)
+            self.conn.commit()
+        if status != DONE:
+            self._set_status(run_id, status)
+
+    def dropped(self, run_id):
+        with self._lock:
+            row = self.conn.execute("SELECT dropped FROM runs WHERE run_id = ?", (run_id,)).fetchone()
+        return row[0] if row else 0
+
+    def _set_status(self, run_id, status):
+        with self._lock:
+            self.conn.execute("UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?",
+                              (status, datetime.now().strftime(_TIME_FORMAT), run_id))
+            self.conn.commit()
+
+    def _purge(self, run_id, status):
+        self.conn.execute("DELETE FROM listings WHERE run_id = ?", (run_id,))
+        self.conn.execute("DELETE FROM articles WHERE run_id = ?", (run_id,))
+        self.conn.execute("UPDATE runs SET status = ?, updated_at = ? WHERE run_id = ?",
+                          (status, datetime.now().strftime(_TIME_FORMAT), run_id))
+
+    # ---------- 列表頁 ----------
+
+    def listing(self, run_id, url, depth=0, category=None, origin=None):
+        """ 記錄一個待讀的列表頁 (已記錄過的不變) """
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO listings (run_id, url, depth, category, origin) VALUES (?, ?, ?, ?, ?)",
+                (run_id, url, depth, category, origin))
+            self.conn.commit()
+
+    def listing_done(self, run_id, url):
+        with self._lock:
+            self.conn.execute("UPDATE listings SET done = 1 WHERE run_id = ? AND url = ?", (run_id, url))
+            self.conn.commit()
+
+    def listings(self, run_id):
+        """ 這次 run 記錄過的列表頁 [(網址, 深度, 分類, 第一頁網址, 是否已讀)] """
+        with self._lock:
+            return self.conn.execute(
+                "SELECT url, depth, category, origin, done FROM listings WHERE run_id = ? ORDER BY rowid",
+                (run_id,)).fetchall()
+
+    # ---------- 文章 ----------
+
+    def discovered(self, run_id, jobs, depth=0):
+        """ 記錄列表上找到的文章 (ArticleJob)，已記錄過的不變 """
+        now = datetime.now().strftime(_TIME_FORMAT)
+        with self._lock:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO articles (run_id, url, state, depth, category, title, published, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, job.url, DISCOVERED, depth, job.category, job.title, _format(job.published), now)
+                 for job in jobs])
+            self.conn.commit()
+
+    def update(self, run_id, url, state, record=None, published=None):
+        self.update_many(run_id, [(url, state, record)], published={url: published} if published else None)
+
+    def update_many(self, run_id, items, published=None):
+        """
+        更新多篇文章的進度 [(網址, 狀態, 記錄)]；published 為 {網址: 發布時間}
+        只有 parsed / translated 保存記錄內容，其他狀態清掉內容
+        """
+        now = datetime.now().strftime(_TIME_FORMAT)
+        published = published or {}
+        with self._lock:
+            self.conn.executemany(
+                "UPDATE articles SET state = ?, record = ?, published = COALESCE(?, published), updated_at = ? "
+                "WHERE run_id = ? AND url = ?",
+                [(state, _pack(record) if state in (PARSED, TRANSLATED) else None,
+                  _format(published.get(url)), now, run_id, url) for url, state, record in items])
+            self.conn.commit()
+
+    def pending(self, run_id):
+        """
+        還沒寫出的文章 [(網址, 狀態, 深度, 分類, 標題, 發布時間, 記錄)]
+        記錄只有 parsed / translated 才有，其他為 None
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                f"SELECT url, state, depth, category, title, published, record FROM articles "
+                f"WHERE run_id = ? AND state NOT IN ({', '.join('?' * len(FINISHED_STATES))}) ORDER BY rowid",
+                (run_id, *FINISHED_STATES)).fetchall()
+        return [(url, state, depth, category, title, _parse(published), _unpack(record))
+                for url, state, depth, category, title, published, record in rows]
+
+    def finished_urls(self, run_id):
+        with self._lock:
+            return [row[0] for row in self.conn.execute(
+                f"SELECT url FROM articles WHERE run_id = ? AND state IN ({', '.join('?' * len(FINISHED_STATES))})",
+                (run_id, *FINISHED_STATES))]
+
+    def newest(self, run_id) -> Optional[tuple]:
+        """ 這次 run 已寫出的文章中最新的 (發布時間, 網址) (續跑時合併前幾次寫出的部分) """
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT published, url FROM articles WHERE run_id = ? AND state = ? AND published IS NOT NULL "
+                "ORDER BY published DESC LIMIT 1", (run_id, WRITTEN)).fetchone()
+        return (_parse(row[0]), row[1]) if row else None
+
+    def counts(self, run_id):
+        with self._lock:
+            return dict(self.conn.execute(
+                "SELECT state, COUNT(*) FROM articles WHERE run_id = ? GROUP BY state", (run_id,)).fetchall())
+
+    def report(self, source=None):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT run_id, source, status, dropped, started_at, updated_at FROM runs "
+                + ("WHERE source = ? " if source else "") + "ORDER BY run_id DESC LIMIT 20",
+                (source,) if source else ()).fetchall()
+        lines = [f"工作記錄: {self.path}"]
+        for run_id, name, status, dropped, started_at, updated_at in rows:
+            counts = self.counts(run_id)
+            detail = "、".join(f"{state} {n}" for state, n in counts.items())
+            if dropped:
+                detail += f"  (超過上限略過 {dropped})"
+            lines.append(f"  #{run_id:<5} {name:<18} {status:<10} {started_at} ~ {updated_at}  {detail}")
+        return "\n".join(lines)
+
+    def close(self):
+        self.conn.close()
+
+
+def main():
+    # 爬蟲執行時會載入這個模組，命令列工具才用得到的套件放到這裡
+    import argparse
+    parser = argparse.ArgumentParser(description="查看可續跑的工作記錄")
+    parser.add_argument("save_dir", help="爬蟲的輸出資料夾")
+    parser.add_argument("action", choices=["report"])
+    parser.add_argument("--source", help="只顯示指定來源")
+    args = parser.parse_args()
+
+    worklog = WorkLog(os.path.join(args.save_dir, WORKLOG_DB_FILENAME))
+    print(worklog.report(args.source))
+    worklog.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,24 @@
+"""
+新聞來源設定 (每個網站一個 scraper_core.source.NewsSource 子類別)
+新增網站: 在這個資料夾加一個模組寫好設定，再登記到 SOURCES
+(放在子資料夾內，run_all.py 不會把這裡當成爬蟲腳本執行)
+"""
+from .cna import CNASource
+from .interfax import InterfaxSource
+from .kyiv_independent import KyivIndependentSource
+from .ng import NGSource
+
+SOURCES = {
+    cls.name: cls for cls in (InterfaxSource, NGSource, CNASource, KyivIndependentSource)
+}
+
+
+def get_source(name):
+    """ 依代號建立新聞來源 """
+    if name not in SOURCES:
+        raise ValueError(f"未知的新聞來源: {name} (可用: {', '.join(SOURCES)})")
+    return SOURCES[name]()
+
+
+def all_sources():
+    return [cls() for cls in SOURCES.values()]
@@ -0,0 +1,147 @@
+"""
+中央社 (中文，不需翻譯)
+只收今日新聞: 列表依時間排序，列表上的日期早於今天 (或水位線) 就停止往下讀，
+不必下載文章頁才知道是舊新聞；列表沒有日期時退回原本的「連續遇到 5 篇舊新聞就停止」
+作者在整理階段整批從內文擷取 (extract_authors)
+"""
+import re
+from datetime import datetime
+
+from scraper_core.excel import ExcelColumn
+from scraper_core.source import NewsSource
+from scraper_core.textclean import suffix_pattern
+
+# 常見地點與結尾詞清單
+LOCATIONS = [
+    "台北", "新北", "桃園", "台中", "台南", "高雄", "基隆", "新竹", "嘉義", 
+    "苗栗", "彰化", "南投", "雲林", "屏東", "宜蘭", "花蓮", "台東", "澎湖", 
+    "金門", "馬祖", "東京", "紐約", "華盛頓", "倫敦", "巴黎", "北京", "上海", 
+    "香港", "新加坡", "曼谷", "首爾", "舊金山", "洛杉磯", "外電", "綜合", "整理", "連線"
+]
+DEFAULT_AUTHOR = "中央社"
+
+# 例: （中央社記者王小明台北18日電）
+# 規則同時給 re 與 pandas .str (可能交給 pyarrow 的 RE2)，只用兩邊都支援的語法
+AUTHOR_RE = re.compile(r'[（(]中央社記者(.+?)[）)]')
+_DISPATCH_RE = re.compile(r'(專?電|特稿)$')
+_DAY_RE = re.compile(r'[0-9０-９]+日')
+# 地點結尾詞合成一個 regex (長的優先)，只去掉一個
+_LOCATION_RE = suffix_pattern(LOCATIONS)
+
+
+def extract_author(content):
+    if not content:
+        return DEFAULT_AUTHOR
+    match = AUTHOR_RE.search(content)
+    if match:
+        raw_text = match.group(1).strip()
+        raw_text = _DISPATCH_RE.sub('', raw_text)
+        raw_text = _DAY_RE.sub('', raw_text)
+        raw_text = _LOCATION_RE.sub('', raw_text, count=1)
+        return raw_text.strip()
+    return DEFAULT_AUTHOR
+
+
+def extract_authors(contents):
+    """ extract_author 的整欄版本 (pandas Series)，規則完全相同 """
+    raw = contents.str.extract(AUTHOR_RE.pattern, expand=False).str.strip()
+    authors = (raw.str.replace(_DISPATCH_RE.pattern, '', regex=True)
+                  .str.replace(_DAY_RE.pattern, '', regex=True)
+                  .str.replace(_LOCATION_RE.pattern, '', n=1, regex=True)
+                  .str.strip())
+    return authors.where(raw.notna(), DEFAULT_AUTHOR)
+
+
+def check_is_today(date_str_from_web):
+    try:
+        clean_str = date_str_from_web.strip()
+        date_part = clean_str.split(' ')[0]
+        year, month, day = map(int, date_part.split('/'))
+        article_date = datetime(year, month, day).date()
+        today_date = datetime.now().date()
+        return article_date == today_date
+    except Exception:
+        return False
+
+
+class CNASource(NewsSource):
+    name = "cna"
+    label = "中央社"
+    script = "crawl CNA.py"
+    base_url = "https://www.cna.com.tw"
+    language = 'zh-TW'
+
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Referer": "https://www.cna.com.tw/",
+        "Accept-Language": "zh-TW,zh;q=0.9,en-US;q=0.8,en;q=0.7"
+    }
+    # 限速每秒 1 次、最多連發 4 次
+    rate = 1.0
+    burst = 4
+    # 同時抓取的文章數 (也是流水線佇列容量，遇到連續舊新聞時最多多抓這麼多篇)
+    fetch_workers = 5
+    queue_size = 5
+    stop_after_rejects = 5
+    # 即時新聞更新頻繁，常駐排程每 5 分鐘看一次列表
+    poll_interval = 5 * 60
+    min_poll_interval = 2 * 60
+    max_poll_interval = 30 * 60
+
+    listings = {None: "https://www.cna.com.tw/list/aall.aspx"}
+    link_selector = '.mainList li a'
+    link_pattern = r'/news/'
+    # 列表項目內的發布時間 (2024/05/01 12:30)
+    listing_date_selector = '.date'
+    listing_sorted = True
+    # 排除清單
+    excluded_keywords = (
+        "/news/ahel/", "/news/asoc/", "/news/aloc/", "/news/acul/", 
+        "/news/aspt/", "/news/amov/", "/video", "postwrite", 
+        "/business/", "/information/"
+    )
+
+    article_selectors = {
+        'published': '.updatetime span',
+        'title': '.centralContent h1 span',
+        'content': '.paragraph',
+    }
+    defaults = {'title': "未知標題", 'content': ""}
+    required = ('published',)
+    paragraphs = True
+
+    # 當日 JSONL 累積了今天每次執行的結果，輸出檔包含今天全部新聞
+    file_prefix = "cna_news"
+    daily_file = True
+    write_json = True
+    fields = {
+        "日期": "published", "作者": "author", "標題": "title", "副標題": "subtitle",
+        "內文": "content", "網址": "url", "下載時間": "fetched_at",
+    }
+    sheet_name = '今日新聞'
+    # 欄寬、內文換行、網址超連結都依欄設定
+    excel_columns = [
+        ExcelColumn("日期", 20), ExcelColumn("作者", 15), ExcelColumn("標題", 50),
+        ExcelColumn("副標題", 30), ExcelColumn("內文", 80, wrap=True),
+        ExcelColumn("網址", 60, link=True), ExcelColumn("下載時間", 20),
+    ]
+
+    def earliest(self):
+        return datetime.combine(datetime.now().date(), datetime.min.time())
+
+    def finish_record(self, record, soup):
+        content_div = soup.select_one('.paragraph')
+        strong_tag = content_div.find('strong') if content_div else None
+        record['subtitle'] = strong_tag.text.strip() if strong_tag else None
+
+    def normalize_frame(self, df):
+        df = super().normalize_frame(df)
+        df['author'] = extract_authors(df['content'])
+        return df
+
+    def accept(self, record):
+        if check_is_today(record['published']):
+            self.log(f"發現今日新聞！日期: {record['published']}")
+            return True
+        self.log(f"非今日新聞 ({record['published']})，跳過。")
+        return False
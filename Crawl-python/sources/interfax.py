@@ -0,0 +1,55 @@
+"""
+Interfax Ukraine (俄文)
+"""
+from scraper_core.excel import ExcelColumn
+from scraper_core.source import NewsSource
+
+
+class InterfaxSource(NewsSource):
+    name = "interfax"
+    label = "Interfax Ukraine"
+    script = "Interfax-Ukraine.py"
+    base_url = "https://ru.interfax.com.ua"
+    language = 'ru'
+
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+        "Referer": "https://ru.interfax.com.ua/"
+    }
+    # 限速每秒 1 次、最多連發 3 次
+    rate = 1.0
+    burst = 3
+    # 常駐排程每 15 分鐘看一次
+    poll_interval = 15 * 60
+
+    listings = {
+        "政治": "https://ru.interfax.com.ua/news/political.html",
+        "外交": "https://ru.interfax.com.ua/news/diplomats.html",
+        "經濟": "https://ru.interfax.com.ua/news/economic.html",
+    }
+    # 每個欄目讀幾頁列表 (回補時用 --pages 調大)
+    pages_to_scrape = 1
+    link_selector = '.cat_news_item a'
+    link_pattern = r'^/news/'
+    # 測試抓取前 5 篇 (可自行調整數量)
+    max_per_listing = 5
+
+    article_selectors = {
+        'title': '.article_title',
+        'published': '.article_date',
+        'content': '.article_content',
+    }
+    required = ('title',)
+
+    file_prefix = "Interfax_Ukraine"
+    fields = {
+        "分類": "category", "日期": "published", "標題_中文": "title_zh", "標題_俄文": "title",
+        "內文_中文": "content_zh", "內文_俄文": "content", "網址": "url", "下載時間": "fetched_at",
+    }
+    sheet_name = 'Interfax新聞'
+    excel_columns = [
+        ExcelColumn("分類", 10), ExcelColumn("日期", 20),
+        ExcelColumn("標題_中文", 40), ExcelColumn("標題_俄文", 40),
+        ExcelColumn("內文_中文", 60, wrap=True), ExcelColumn("內文_俄文", 60, wrap=True),
+        ExcelColumn("網址", 40), ExcelColumn("下載時間", 20),
+    ]
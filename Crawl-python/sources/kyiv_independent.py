@@ -0,0 +1,59 @@
+"""
+Kyiv Independent (英文)
+"""
+from scraper_core.excel import ExcelColumn
+from scraper_core.source import NewsSource
+
+
+class KyivIndependentSource(NewsSource):
+    name = "kyiv_independent"
+    label = "Kyiv Independent"
+    script = "kiev_independent.py"
+    base_url = "https://kyivindependent.com"
+    language = 'en'
+
+    # 模擬人類 Headers 避免被封鎖
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36",
+        "Accept-Language": "en-US,en;q=0.9",
+        "Referer": "https://kyivindependent.com/"
+    }
+    # 限速每秒 1 次、最多連發 3 次
+    rate = 1.0
+    burst = 3
+
+    # 您指定的六個欄目 (分類顯示為大寫)
+    listings = {
+        section.upper(): f"https://kyivindependent.com/{section}/"
+        for section in ["war", "politics", "business", "russia", "europe", "opinion"]
+    }
+    link_selector = '.article-title a, .post-title a'
+    # 文章卡片上的 <time datetime="...">
+    listing_date_selector = 'time'
+    # 測試模式：每個欄目抓 3 篇即可，避免跑太久
+    max_per_listing = 3
+
+    # 標題取列表頁的連結文字
+    article_selectors = {
+        'published': '.article-date, time',
+        'author': '.article-author, .author-name',
+        'content': '.article-content, .post-content',
+    }
+    defaults = {'published': "未知日期", 'author': "Kyiv Independent"}
+    required = ('content',)
+    paragraphs = True
+    paragraph_separator = "\n\n"
+
+    file_prefix = "KyivIndependent"
+    # 英文內文只存在 JSONL / Parquet，Excel 維持原本的欄位
+    fields = {
+        "欄目": "category", "日期": "published", "作者": "author", "標題_英文": "title",
+        "標題_中文": "title_zh", "內文_中文": "content_zh", "網址": "url", "下載時間": "fetched_at",
+        "內文_英文": "content",
+    }
+    sheet_name = 'KyivIndependent'
+    excel_columns = [
+        ExcelColumn("欄目", 12), ExcelColumn("日期", 15), ExcelColumn("作者", 15),
+        ExcelColumn("標題_英文", 40), ExcelColumn("標題_中文", 40),
+        ExcelColumn("內文_中文", 60, wrap=True), ExcelColumn("網址", 40), ExcelColumn("下載時間"),
+    ]
@@ -0,0 +1,60 @@
+"""
+NG 俄羅斯獨立報 (俄文)
+"""
+from scraper_core.excel import ExcelColumn
+from scraper_core.source import NewsSource
+
+
+class NGSource(NewsSource):
+    name = "ng"
+    label = "NG (俄羅斯獨立報)"
+    script = "NG full scrape.py"
+    base_url = "https://www.ng.ru"
+    language = 'ru'
+
+    headers = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36",
+        "Referer": "https://www.ng.ru/",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8"
+    }
+    # 限速每秒 0.5 次、最多連發 2 次
+    rate = 0.5
+    burst = 2
+    # 更新較慢，常駐排程每小時看一次
+    poll_interval = 3600
+    min_poll_interval = 1800
+
+    listings = {
+        "news": "https://www.ng.ru/news/",
+        "armies": "https://www.ng.ru/armies/",
+        "politics": "https://www.ng.ru/politics/",
+        "economics": "https://www.ng.ru/economics/",
+        "world": "https://www.ng.ru/world/",
+    }
+    # 每個欄目讀幾頁列表 (回補時用 --pages 調大)
+    pages_to_scrape = 1
+    link_selector = '.news-list h2 a, .list-item a'
+    link_pattern = r'^/'
+    # 測試抓取每個欄目前 3 篇
+    max_per_listing = 3
+
+    article_selectors = {
+        'title': 'h1',
+        'published': '.date, .article-date',
+        'content': '.article-content, .text',
+    }
+    defaults = {'title': "無標題", 'published': "未知日期", 'content': ""}
+
+    file_prefix = "ng_news"
+    write_json = True
+    fields = {
+        "分類": "category", "日期": "published", "標題_中文": "title_zh", "標題_俄文": "title",
+        "內文_中文": "content_zh", "內文_俄文": "content", "網址": "url", "下載時間": "fetched_at",
+    }
+    sheet_name = 'NG新聞'
+    excel_columns = [
+        ExcelColumn("分類", 10), ExcelColumn("日期", 20),
+        ExcelColumn("標題_中文", 40), ExcelColumn("標題_俄文", 40),
+        ExcelColumn("內文_中文", 60, wrap=True), ExcelColumn("內文_俄文", 60, wrap=True),
+        ExcelColumn("網址", 40), ExcelColumn("下載時間", 20),
+    ]
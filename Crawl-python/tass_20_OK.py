@@ -1,83 +1,174 @@
 """
-TASS 新聞爬蟲 - 改進版（雙翻譯引擎）
-支援 googletrans 和 deep-translator 雙引擎，並修正路徑接收邏輯
+TASS 新聞爬蟲 - 改進版（可切換翻譯引擎）
+翻譯引擎由 scraper_core.backends 提供 (google / argos 離線 / stub)，
+以環境變數 TRANSLATOR_BACKEND 切換，並修正路徑接收邏輯
+預設為混合模式: 瀏覽器只開首頁取列表與 Cookie，文章改用一般 HTTP 抓取 (優先讀內嵌 JSON)，
+靜態頁面抓不到內文時才逐篇改用瀏覽器；環境變數 TASS_FETCH_MODE=browser 可改回全程瀏覽器
+每篇文章的進度記在工作記錄，Chrome 當掉或翻譯被限流而中斷時，加上 --resume 從上次的進度續跑:
+python tass_20_OK.py [輸出資料夾] [--resume]
+run_all.py --daemon 常駐時透過 open_session() 重複執行，瀏覽器與快取不必每次重開
 """
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from bs4 import BeautifulSoup
-import pandas as pd
 from datetime import datetime
-import time
-import random
-from typing import List, Dict
-import re
-from openpyxl import load_workbook
-from openpyxl.styles import Alignment
+from typing import List, Dict, Iterable
 import sys  # <--- 新增
 import os   # <--- 新增
+import threading
+from scraper_core.ratelimit import DomainRateLimiter
+from scraper_core.parsing import make_soup, embedded_article_body
+from scraper_core.fetcher import AsyncFetcher
+from scraper_core.metrics import METRICS, record_cache_stats, write_env_report
+from scraper_core.neardup import NearDuplicateIndex, NEAR_DUP_DB_FILENAME
+from scraper_core.seen import SeenIndex, SEEN_DB_FILENAME
+from scraper_core.source import ArticleJob
+from scraper_core.worklog import WorkLog, WORKLOG_DB_FILENAME, DONE, PARSED, TRANSLATED, WRITTEN
+from scraper_core.translate import CachedTranslator, TranslationCache, TRANSLATION_CACHE_FILENAME
+from scraper_core.backends import get_backend
+from scraper_core.pipeline import Pipeline
+from scraper_core.sink import JsonlWriter, read_jsonl
+from scraper_core.store import open_store, excel_enabled
+from scraper_core.excel import ExcelColumn, write_excel
+from scraper_core.browser import BrowserPool, wait_for, session_headers
+
+# ================= 設定區 =================
+
+# 抓文章的方式: hybrid (HTTP 為主，瀏覽器備援) / browser (全部用瀏覽器)
+FETCH_MODE = os.environ.get('TASS_FETCH_MODE', 'hybrid').lower()
+# 同時開幾個瀏覽器抓文章 (browser 模式)
+BROWSER_POOL_SIZE = 3
+# 同時幾個 HTTP 請求抓文章 (hybrid 模式)
+HTTP_WORKERS = 6
+# 每次最多抓幾篇 (測試先抓 5 篇)
+ARTICLE_LIMIT = 5
+# 常駐排程 (run_all.py --daemon) 的輪詢間隔 (秒)，依新文章出現的速度在最短 / 最長之間調整
+POLL_INTERVAL = 15 * 60
+MIN_POLL_INTERVAL = 5 * 60
+MAX_POLL_INTERVAL = 3 * 3600
+
+LIST_SELECTOR = 'a[class*="news-list__item"], a[class*="card"]'
+CONTENT_SELECTOR = 'div[class*="article__text"], .text-block'
+# 翻譯請求的限速網域 (被 Google 限流時依 429 退避)
+TRANSLATE_DOMAIN = "translate.google.com"
+
+# Parquet 保存區的網站名稱與欄位對照 (原欄位: 共用欄位)，順序即 Excel 欄位順序
+STORE_SITE = "tass"
+STORE_FIELDS = {
+    'title_ru': 'title', 'content_ru': 'content', 'url': 'url', 'time': 'fetched_at',
+    'title_zh': 'title_zh', 'content_zh': 'content_zh',
+}
+
+# Excel 欄位 (內文欄位自動換行)
+EXCEL_COLUMNS = [
+    ExcelColumn('title_ru', 40), ExcelColumn('content_ru', 80, wrap=True), ExcelColumn('url', 30),
+    ExcelColumn('time'), ExcelColumn('title_zh', 40), ExcelColumn('content_zh', 80, wrap=True),
+]
+
+HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'ru-RU,ru;q=0.9,en;q=0.8',
+    'Referer': 'https://tass.ru/',
+}
+
+
+def extract_content(page_source: str) -> str:
+    """從文章頁 HTML 取出內文段落"""
+    soup = make_soup(page_source, [CONTENT_SELECTOR])
+    # 塔斯社內文通常在特定 class 的 div 內
+    content_divs = soup.select(CONTENT_SELECTOR)
+
+    full_text = ""
+    for div in content_divs:
+        paragraphs = div.find_all('p')
+        full_text += "\n".join([p.get_text().strip() for p in paragraphs])
+
+    return full_text.strip()
 
 class TASSNewsScraper:
-    def __init__(self, headless=True):
-        """初始化爬蟲，使用 Selenium"""
-        print("正在啟動瀏覽器...")
-        
-        chrome_options = Options()
-        if headless:
-            chrome_options.add_argument('--headless')  # 無頭模式
-        
-        # 隱藏警告訊息
-        chrome_options.add_argument('--log-level=3')
-        chrome_options.add_argument('--disable-logging')
-        chrome_options.add_experimental_option('excludeSwitches', ['enable-logging'])
-        
-        # 模擬真實瀏覽器設定
-        chrome_options.add_argument('--no-sandbox')
-        chrome_options.add_argument('--disable-dev-shm-usage')
-        chrome_options.add_argument('--disable-blink-features=AutomationControlled')
-        
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.wait = WebDriverWait(self.driver, 15)
+    def __init__(self, headless=True, seen: SeenIndex = None, pool_size=BROWSER_POOL_SIZE, mode=FETCH_MODE):
+        """
+        初始化爬蟲；seen 為跨執行的已抓網址索引 (可省略)
+        mode: hybrid 時瀏覽器只用來讀列表與備援，文章以 HTTP 抓取；browser 時全部用瀏覽器池
+        """
+        self.seen = seen
+        self.mode = mode
+        # 文章頁的請求速率 (取代每篇固定的隨機等待)，HTTP 與瀏覽器共用
+        self.limiter = DomainRateLimiter(rate=0.7, burst=2)
+        if mode == 'hybrid':
+            # 瀏覽器只剩列表頁與少數備援要用，開一個就夠
+            pool_size = 1
+            self.fetcher = AsyncFetcher(headers=HEADERS, per_host=4, limiter=self.limiter, timeout=15)
+        else:
+            self.fetcher = None
+        self.pool = BrowserPool(size=pool_size, headless=headless)
+        self.fetch_workers = HTTP_WORKERS if self.fetcher is not None else self.pool.size
+        # 內文來源統計
+        self.static_count = 0
+        self.browser_count = 0
+        self._count_lock = threading.Lock()
 
-    def get_article_content(self, url: str) -> str:
-        """進入文章頁面抓取完整內文"""
+    def get_static_content(self, url: str) -> str:
+        """以一般 HTTP 抓文章頁: 先讀內嵌 JSON，沒有再解析 HTML；抓不到回傳空字串"""
+        response = self.fetcher.fetch(url)
+        if not response.ok:
+            print(f"  [HTTP 抓取失敗] {url}: {response.error or response.status}")
+            return ""
+        return embedded_article_body(response.text) or extract_content(response.text)
+
+    def get_browser_content(self, url: str) -> str:
+        """借一個瀏覽器進入文章頁面抓取完整內文"""
         try:
-            self.driver.get(url)
-            # 等待內文區塊載入
-            self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, 'div[class*="article__text"]')))
-            
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            # 塔斯社內文通常在特定 class 的 div 內
-            content_divs = soup.select('div[class*="article__text"], .text-block')
-            
-            full_text = ""
-            for div in content_divs:
-                paragraphs = div.find_all('p')
-                full_text += "\n".join([p.get_text().strip() for p in paragraphs])
-            
-            return full_text.strip()
+            self.limiter.acquire("tass.ru")
+            with self.pool.driver() as driver:
+                driver.get(url)
+                # 等待內文區塊載入
+                wait_for(driver, 'div[class*="article__text"]')
+                page_source = driver.page_source
+            return extract_content(page_source)
         except Exception as e:
             print(f"  [抓取內文失敗] {url}: {e}")
             return ""
 
-    def scrape_top_news(self, limit=20) -> List[Dict]:
-        """抓取首頁最新的新聞列表"""
+    def get_article_content(self, url: str) -> str:
+        """抓取文章內文；hybrid 模式下靜態頁面沒有內文才改用瀏覽器"""
+        if self.fetcher is not None:
+            content = self.get_static_content(url)
+            if content:
+                with self._count_lock:
+                    self.static_count += 1
+                return content
+            print(f"  [改用瀏覽器] {url}")
+        content = self.get_browser_content(url)
+        with self._count_lock:
+            self.browser_count += 1
+        return content
+
+    def report(self) -> str:
+        return f"TASS 內文來源: HTTP {self.static_count} 篇，瀏覽器 {self.browser_count} 篇"
+
+    def get_top_news_links(self, limit=20) -> List[Dict]:
+        """讀取首頁最新的新聞列表，回傳標題與網址 (不進入文章頁)"""
+        from selenium.common.exceptions import TimeoutException
         url = "https://tass.ru/"
         print(f"進入塔斯社首頁: {url}")
         
         try:
-            self.driver.get(url)
-            time.sleep(3) # 等待渲染
+            with self.pool.driver() as driver:
+                driver.get(url)
+                # 等到列表連結出現即可，不再固定等 3 秒
+                try:
+                    wait_for(driver, LIST_SELECTOR)
+                except TimeoutException:
+                    print("  等待列表逾時，以目前頁面內容繼續")
+                page_source = driver.page_source
+                if self.fetcher is not None:
+                    # 之後的 HTTP 請求沿用瀏覽器的 Cookie 與 User-Agent
+                    self.fetcher.headers.update(session_headers(driver))
             
-            soup = BeautifulSoup(self.driver.page_source, 'html.parser')
-            news_items = soup.select('a[class*="news-list__item"], a[class*="card"]')
+            soup = make_soup(page_source, [LIST_SELECTOR])
+            news_items = soup.select(LIST_SELECTOR)
             
-            articles = []
+            links = []
             for item in news_items:
-                if len(articles) >= limit:
+                if len(links) >= limit:
                     break
                     
                 link = item.get('href')
@@ -86,90 +177,206 @@ class TASSNewsScraper:
                 
                 full_url = "https://tass.ru" + link
                 title = item.get_text().strip()
+
+                # 上次執行已抓過的文章直接略過
+                if self.seen is not None and full_url in self.seen:
+                    continue
                 
-                print(f"[{len(articles)+1}] 發現文章: {title[:20]}...")
-                
-                # 進入文章抓內文
-                content_ru = self.get_article_content(full_url)
-                
-                articles.append({
-                    'title_ru': title,
-                    'content_ru': content_ru,
-                    'url': full_url,
-                    'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                })
-                
-                time.sleep(random.uniform(1, 2))
+                print(f"[{len(links)+1}] 發現文章: {title[:20]}...")
+                links.append({'title_ru': title, 'url': full_url})
                 
-            return articles
+            return links
         except Exception as e:
             print(f"抓取列表出錯: {e}")
             return []
 
-    def save_to_excel(self, articles: List[Dict], full_path: str):
-        """將結果儲存至 Excel 並美化"""
-        df = pd.DataFrame(articles)
-        df.to_excel(full_path, index=False)
-        
-        # 使用 openpyxl 進行簡易格式調整
-        wb = load_workbook(full_path)
-        ws = wb.active
-        
-        # 設定欄寬與換行
-        for cell in ws[1]: # 標題列
-            cell.alignment = Alignment(horizontal='center')
-            
-        ws.column_dimensions['A'].width = 40
-        ws.column_dimensions['B'].width = 80
-        ws.column_dimensions['C'].width = 30
-        
-        # 內文欄位設定自動換行
-        for row in range(2, ws.max_row + 1):
-            ws.cell(row=row, column=2).alignment = Alignment(wrap_text=True, vertical='top')
-            
-        wb.save(full_path)
+    def fetch_article(self, item: Dict) -> Dict:
+        """進入文章頁抓內文，組成一筆記錄"""
+        content_ru = self.get_article_content(item['url'])
+        return {
+            'title_ru': item['title_ru'],
+            'content_ru': content_ru,
+            'url': item['url'],
+            'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+
+    def scrape_top_news(self, limit=20) -> List[Dict]:
+        """抓取首頁最新的新聞 (含內文)"""
+        return [self.fetch_article(item) for item in self.get_top_news_links(limit)]
+
+    def translate_articles(self, articles: List[Dict], translator: CachedTranslator,
+                           near_duplicates: NearDuplicateIndex):
+        """標題與內文一起批次翻譯成中文 (與其他來源重複的稿件沿用已有的內文譯文)"""
+        if not articles:
+            return articles
+        print(f"正在批次翻譯 {len(articles)} 篇文章...")
+        translated = near_duplicates.translate_unique(
+            translator, [(a['url'], a['title_ru'], a['content_ru']) for a in articles],
+            source=STORE_SITE, language='ru')
+        for article, (title_zh, content_zh) in zip(articles, translated):
+            article['title_zh'] = title_zh
+            article['content_zh'] = content_zh
+        return articles
+
+    def save_to_excel(self, articles: Iterable[Dict], full_path: str):
+        """將結果逐筆串流寫入 Excel (欄寬、內文換行依欄設定，只寫一次檔)"""
+        write_excel(full_path, 'Sheet1', EXCEL_COLUMNS, articles)
         print(f"Excel 存檔成功: {full_path}")
 
     def close(self):
-        self.driver.quit()
+        if self.fetcher is not None:
+            self.fetcher.close()
+        self.pool.close()
 
 # ================= 主程式邏輯 =================
 
+def resume_links(worklog: WorkLog, run_id: int, seen: SeenIndex) -> List[Dict]:
+    """上次沒完成的文章: 已抓到內文 (或已翻譯) 的直接帶著記錄往下做，其餘重新抓取"""
+    links, written = [], []
+    for url, state, _, _, title, _, record in worklog.pending(run_id):
+        if url in seen:
+            # 上次已寫出，只是還沒記下進度就停止了
+            written.append((url, WRITTEN, None))
+        else:
+            links.append(record or {'title_ru': title, 'url': url})
+    worklog.update_many(run_id, written)
+    return links
+
+class TassSession:
+    """
+    一次開好瀏覽器、已抓網址索引、翻譯快取與工作記錄，可以連續執行多次
+    (run_all.py --daemon 常駐時重複使用，不必每次重開 Chrome)
+    """
+    def __init__(self, save_dir):
+        self.save_dir = save_dir
+        if not os.path.exists(save_dir):
+            os.makedirs(save_dir)
+        self.seen = SeenIndex(os.path.join(save_dir, SEEN_DB_FILENAME))
+        self.translator = CachedTranslator(get_backend(source='ru', target='zh-TW'),
+                                           TranslationCache(os.path.join(save_dir, TRANSLATION_CACHE_FILENAME)),
+                                           limiter=DomainRateLimiter(rate=1.0, burst=3),
+                                           limiter_domain=TRANSLATE_DOMAIN)
+        self.near_duplicates = NearDuplicateIndex(os.path.join(save_dir, NEAR_DUP_DB_FILENAME))
+        self.worklog = WorkLog(os.path.join(save_dir, WORKLOG_DB_FILENAME))
+        self.scraper = TASSNewsScraper(headless=True, seen=self.seen)
+        # 上一次執行是否完整結束 (沒有文章處理失敗)
+        self.completed = False
+
+    def run(self, resume=False) -> int:
+        """ 執行一次: 讀列表 → 抓內文 → 翻譯 → 寫出；回傳寫出的篇數 (是否完整結束記在 completed) """
+        save_dir, seen, worklog, scraper = self.save_dir, self.seen, self.worklog, self.scraper
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # 每完成一篇就寫入 JSONL，瀏覽器中途當掉也保留已完成的文章
+        jsonl_path = os.path.join(save_dir, f'tass_news_{timestamp}.jsonl')
+        writer = JsonlWriter(jsonl_path)
+
+        previous = worklog.resumable(STORE_SITE) if resume else None
+        run_id = previous[0] if previous else worklog.start(STORE_SITE)
+        completed = self.completed = False
+
+        def fetch_article(item):
+            # 續跑: 上次已抓到內文 (或已翻譯) 的文章不再重抓
+            if 'content_ru' in item:
+                return item
+            article = scraper.fetch_article(item)
+            if article['content_ru']:
+                worklog.update(run_id, article['url'], PARSED, article)
+            return article
+
+        def translate_articles(batch):
+            pending = [a for a in batch if 'title_zh' not in a]
+            scraper.translate_articles(pending, self.translator, self.near_duplicates)
+            worklog.update_many(run_id, [(a['url'], TRANSLATED, a) for a in pending])
+            return batch
+
+        def write_article(article):
+            writer.write(article)
+            if article['content_ru']:
+                seen.mark(article['url'], article['content_ru'], source="tass")
+            worklog.update(run_id, article['url'], WRITTEN)
+
+        # 抓內文 (HTTP 或瀏覽器池) → 批次翻譯 → 寫出
+        pipeline = Pipeline("tass")
+        pipeline.add_stage("fetch", fetch_article, workers=scraper.fetch_workers)
+        pipeline.add_stage("translate", translate_articles, workers=2, batch_size=4)
+        pipeline.add_stage("write", write_article)
+
+        try:
+            # 執行抓取任務
+            if previous:
+                worklog.reopen(run_id)
+                links = resume_links(worklog, run_id, seen)
+                print(f"續跑第 {run_id} 次執行: 還有 {len(links)} 篇文章沒有完成")
+            else:
+                links = scraper.get_top_news_links(limit=ARTICLE_LIMIT)
+                worklog.discovered(run_id, [ArticleJob(link['url'], title=link['title_ru']) for link in links])
+            pipeline.run(links)
+            print(pipeline.report())
+            print(scraper.report())
+            # 有文章處理失敗 (例如翻譯被限流) 時保留進度
+            completed = self.completed = not pipeline.errors
+        finally:
+            writer.close()
+            # 中途停止時保留進度，下次加上 --resume 續跑
+            worklog.finish(run_id, DONE if completed else "failed")
+
+        if writer.count:
+            articles = list(read_jsonl(jsonl_path))
+            # 寫入依網站、日期分區的 Parquet，Excel 再從這次寫入的資料產生
+            store = open_store(save_dir)
+            run_id = store.save_run(STORE_SITE, articles, STORE_FIELDS, language='ru') if store else None
+
+            if excel_enabled():
+                if store is not None:
+                    articles = store.iter_run(STORE_SITE, run_id, STORE_FIELDS)
+                filename = f'tass_news_{timestamp}.xlsx'
+
+                # 結合路徑與檔名
+                full_output_path = os.path.join(save_dir, filename)
+
+                scraper.save_to_excel(articles, full_output_path)
+                print(f"儲存位置: {full_output_path}")
+
+            print(f"\n✅ TASS 任務完成！共 {writer.count} 篇。")
+        else:
+            os.remove(jsonl_path)
+            print("未抓取到任何文章。")
+
+        METRICS.count("source.articles", STORE_SITE, writer.count)
+        return writer.count
+
+    def close(self):
+        record_cache_stats(translation_cache=self.translator.cache)
+        self.scraper.close()
+        self.seen.close()
+        print(self.near_duplicates.report())
+        self.near_duplicates.close()
+        print(self.translator.cache.report())
+        self.translator.close()
+        self.worklog.close()
+
+
+def open_session(save_dir):
+    """ run_all.py --daemon 常駐時使用 (瀏覽器在多次執行之間保持開啟) """
+    return TassSession(save_dir)
+
+
 def main():
     # --- 處理傳入的路徑參數 ---
-    if len(sys.argv) > 1:
-        save_dir = sys.argv[1]
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    resume = '--resume' in sys.argv[1:]
+    if args:
+        save_dir = args[0]
     else:
         save_dir = "."
 
-    if not os.path.exists(save_dir):
-        os.makedirs(save_dir)
-
-    scraper = TASSNewsScraper(headless=True)
-    
+    session = TassSession(save_dir)
     try:
-        # 執行抓取任務
-        articles = scraper.scrape_top_news(limit=5) # 測試先抓 5 篇
-        
-        if articles:
-            # 這裡可以加入翻譯邏輯 (略，保持您原有的翻譯區塊即可)
-            # ...
-            
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            filename = f'tass_news_{timestamp}.xlsx'
-            
-            # 結合路徑與檔名
-            full_output_path = os.path.join(save_dir, filename)
-            
-            scraper.save_to_excel(articles, full_output_path)
-            
-            print(f"\n✅ TASS 任務完成！共 {len(articles)} 篇。")
-            print(f"儲存位置: {full_output_path}")
-        else:
-            print("未抓取到任何文章。")
-            
+        session.run(resume)
     finally:
-        scraper.close()
+        session.close()
+        # 由 run_all.py 執行時把指標寫到它指定的檔案
+        write_env_report(script=STORE_SITE)
 
 if __name__ == '__main__':
     main()